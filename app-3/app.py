@@ -13,6 +13,8 @@ import time
 import json
 import hashlib
 from database_helper import db_helper
+from async_database_helper import async_db_helper
+import asyncio
 import pickle
 from functools import wraps
 
@@ -52,6 +54,11 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 # Create upload folder if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Hand the request's pooled database connection back to the pool"""
+    db_helper.release_connection()
+
 # Initialize AI models
 ats_initialized = False
 rag_initialized = False
@@ -995,6 +1002,26 @@ def send_email_notification(to_email, subject, message):
     # Email sending logic would go here
     print(f"Email sent to {to_email}: {subject} - {message}")
 
+# Keyset pagination for admin list pages
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def get_page_args():
+    """Read page_size and cursor query parameters for keyset pagination"""
+    try:
+        page_size = int(request.args.get("page_size", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        page_size = DEFAULT_PAGE_SIZE
+    return max(1, min(page_size, MAX_PAGE_SIZE)), request.args.get("cursor") or None
+
+def pagination_context(rows, page_size, page_cursor):
+    """Template variables used by pagination.html"""
+    return {
+        "page_size": page_size,
+        "page_cursor": page_cursor,
+        "next_cursor": getattr(rows, "next_cursor", None)
+    }
+
 def add_notification(user_email, message, notification_type="info"):
     try:
         db_helper.create_notification(user_email, message, notification_type)
@@ -1132,32 +1159,33 @@ def admin_dashboard():
         flash("Access denied. Admin privileges required.", "error")
         return redirect(url_for("dashboard"))
     
-    # Get all data from database
-    db_tickets = db_helper.get_all_tickets()
-    db_feedback = db_helper.get_all_feedback()
-    db_timeoff = db_helper.get_all_timeoff_requests()
-    db_leave_requests = db_helper.get_all_leave_requests()
-    db_timesheets = db_helper.get_all_timesheets()
-    db_applications = db_helper.get_all_applications()
-    db_employees = db_helper.get_all_employees()
+    # Counts and recent items are computed in SQL so the dashboard stays flat as tables grow;
+    # the two are independent, so they run concurrently on separate pooled connections
+    stats, recent = asyncio.run(async_db_helper.gather(
+        ('get_dashboard_counts',),
+        ('get_dashboard_recent', 3)
+    ))
+    stats.update(recent)
+    counts = stats["status_counts"]
+    totals = stats["totals"]
     
     admin_data = {
-        "total_tickets": len(db_tickets),
-        "open_tickets": len([t for t in db_tickets if t["status"] == "open"]),
-        "resolved_tickets": len([t for t in db_tickets if t["status"] == "resolved"]),
-        "total_requests": len(db_timeoff) + len(db_leave_requests),
-        "pending_requests": len([r for r in db_timeoff if r["status"] == "pending"]) + len([r for r in db_leave_requests if r["status"] == "pending"]),
-        "total_timesheets": len(db_timesheets),
-        "pending_timesheets": len([t for t in db_timesheets if t["status"] == "pending"]),
-        "total_feedback": len(db_feedback),
-        "pending_feedback": len([f for f in db_feedback if f["status"] == "pending"]),
-        "total_applications": len(db_applications),
-        "pending_applications": len([a for a in db_applications if a["status"] == "pending"]),
-        "total_users": len(db_employees),
-        "recent_tickets": db_tickets[-3:] if len(db_tickets) > 3 else db_tickets,
-        "recent_requests": (db_timeoff + db_leave_requests)[-3:] if len(db_timeoff + db_leave_requests) > 3 else (db_timeoff + db_leave_requests),
-        "recent_timesheets": db_timesheets[-3:] if len(db_timesheets) > 3 else db_timesheets,
-        "recent_feedback": db_feedback[-3:] if len(db_feedback) > 3 else db_feedback,
+        "total_tickets": totals["tickets"],
+        "open_tickets": counts["tickets"].get("open", 0),
+        "resolved_tickets": counts["tickets"].get("resolved", 0),
+        "total_requests": totals["timeoff_requests"] + totals["leave_requests"],
+        "pending_requests": counts["timeoff_requests"].get("pending", 0) + counts["leave_requests"].get("pending", 0),
+        "total_timesheets": totals["timesheets"],
+        "pending_timesheets": counts["timesheets"].get("pending", 0),
+        "total_feedback": totals["feedback"],
+        "pending_feedback": counts["feedback"].get("pending", 0),
+        "total_applications": totals["job_applications"],
+        "pending_applications": counts["job_applications"].get("pending", 0),
+        "total_users": totals["employees"],
+        "recent_tickets": stats["recent_tickets"],
+        "recent_requests": stats["recent_requests"],
+        "recent_timesheets": stats["recent_timesheets"],
+        "recent_feedback": stats["recent_feedback"],
         "system_status": {
             "database": "Connected",
             "ai_services": "Available" if rag_initialized else "Unavailable",
@@ -1166,6 +1194,28 @@ def admin_dashboard():
     }
     return render_template("admin_dashboard.html", **admin_data)
 
+@app.route("/admin/db-pool-stats")
+@admin_required
+def admin_db_pool_stats():
+    return jsonify(db_helper.get_pool_stats())
+
+@app.route("/admin/query-stats")
+@admin_required
+def admin_query_stats():
+    limit = request.args.get("limit", type=int)
+    return jsonify(db_helper.get_query_stats(limit))
+
+@app.route("/admin/query-stats/reset", methods=["POST"])
+@admin_required
+def admin_query_stats_reset():
+    db_helper.query_stats.reset()
+    return jsonify({"success": True})
+
+@app.route("/admin/cache-stats")
+@admin_required
+def admin_cache_stats():
+    return jsonify(db_helper.get_cache_stats())
+
 @app.route("/admin/tickets")
 @it_required
 def admin_tickets():
@@ -1173,10 +1223,13 @@ def admin_tickets():
         flash("Access denied. Admin privileges required.", "error")
         return redirect(url_for("dashboard"))
     
-    # Get tickets from database
-    tickets = db_helper.get_all_tickets()
+    # Get one page of tickets from database
+    page_size, page_cursor = get_page_args()
+    tickets = db_helper.get_all_tickets(page_size=page_size, page_cursor=page_cursor)
+    status_counts = db_helper.get_status_counts('tickets')
     
-    return render_template('admin_tickets.html', tickets=tickets, now=datetime.now())
+    return render_template('admin_tickets.html', tickets=tickets, status_counts=status_counts, now=datetime.now(),
+                           **pagination_context(tickets, page_size, page_cursor))
 
 @app.route("/admin/requests")
 @hr_required
@@ -1212,19 +1265,15 @@ def update_ticket_status(ticket_id):
     
     new_status = request.form["status"]
     
-    # Update ticket status in database
-    if db_helper.update_ticket_status(ticket_id, new_status):
-        # Get ticket details for notification
-        tickets = db_helper.get_all_tickets()
-        ticket = next((t for t in tickets if t["id"] == ticket_id), None)
+    # Update ticket status in database and get the updated ticket for notification
+    ticket = db_helper.update_ticket_status_returning(ticket_id, new_status)
+    if ticket:
+        # Add notification
+        db_helper.create_notification(ticket["user_email"], f"Your ticket '{ticket['title']}' status changed to {new_status}")
         
-        if ticket:
-            # Add notification
-            db_helper.create_notification(ticket["user_email"], f"Your ticket '{ticket['title']}' status changed to {new_status}")
-            
-            # Send email notification
-            send_email_notification(ticket["user_email"], "Ticket Status Updated", 
-                                  f"Your ticket '{ticket['title']}' status has been updated to {new_status}")
+        # Send email notification
+        send_email_notification(ticket["user_email"], "Ticket Status Updated", 
+                              f"Your ticket '{ticket['title']}' status has been updated to {new_status}")
         
         flash(f"Ticket status updated to {new_status}", "success")
     else:
@@ -1817,8 +1866,7 @@ def ticket_detail(ticket_id):
         return redirect(url_for("dashboard"))
     
     # Get ticket from database
-    tickets = db_helper.get_all_tickets()
-    ticket = next((t for t in tickets if t["id"] == ticket_id), None)
+    ticket = db_helper.get_ticket_by_id(ticket_id)
     if not ticket:
         flash("Ticket not found.", "error")
         return redirect(url_for("view_tickets"))
@@ -2932,10 +2980,14 @@ def admin_feedback():
         flash("Access denied. Admin privileges required.", "error")
         return redirect(url_for("dashboard"))
     
-    # Get feedback from database
-    feedback_list = db_helper.get_all_feedback()
+    # Get one page of feedback from database
+    page_size, page_cursor = get_page_args()
+    feedback_list = db_helper.get_all_feedback(page_size=page_size, page_cursor=page_cursor)
+    status_counts = db_helper.get_status_counts('feedback')
+    priority_counts = db_helper.get_status_counts('feedback', 'priority')
     
-    return render_template('admin_feedback.html', feedback_list=feedback_list)
+    return render_template('admin_feedback.html', feedback_list=feedback_list, status_counts=status_counts,
+                           priority_counts=priority_counts, **pagination_context(feedback_list, page_size, page_cursor))
 
 @app.route('/admin/feedback/update-status/<int:feedback_id>', methods=['POST'])
 @login_required
@@ -5268,9 +5320,11 @@ def admin_timesheets():
         flash("Access denied. Admin privileges required.", "error")
         return redirect(url_for("dashboard"))
     
-    # Get all timesheets from database
-    timesheets = db_helper.get_all_timesheets()
-    return render_template("admin_timesheets.html", timesheets=timesheets)
+    # Get one page of timesheets from database
+    page_size, page_cursor = get_page_args()
+    timesheets = db_helper.get_all_timesheets(page_size=page_size, page_cursor=page_cursor)
+    return render_template("admin_timesheets.html", timesheets=timesheets,
+                           **pagination_context(timesheets, page_size, page_cursor))
 
 @app.route('/admin/timesheets/approve/<int:timesheet_id>', methods=['POST'])
 @login_required
@@ -5337,11 +5391,12 @@ def admin_service_requests():
         flash("Access denied. Admin privileges required.", "error")
         return redirect(url_for("dashboard"))
     
-    # Get service requests from database
-    service_requests = db_helper.get_all_service_requests()
+    # Get one page of service requests from database
+    page_size, page_cursor = get_page_args()
+    service_requests = db_helper.get_all_service_requests(page_size=page_size, page_cursor=page_cursor)
     
     # If no service requests exist, create some sample ones for testing
-    if not service_requests:
+    if not service_requests and not page_cursor:
         # Create sample service requests
         sample_requests = [
             {
@@ -5377,9 +5432,11 @@ def admin_service_requests():
             )
         
         # Get the newly created requests
-        service_requests = db_helper.get_all_service_requests()
+        service_requests = db_helper.get_all_service_requests(page_size=page_size)
     
-    return render_template('admin_service_requests.html', service_requests=service_requests)
+    status_counts = db_helper.get_status_counts('service_requests')
+    return render_template('admin_service_requests.html', service_requests=service_requests, status_counts=status_counts,
+                           **pagination_context(service_requests, page_size, page_cursor))
 
 @app.route('/admin/service-requests/<int:request_id>')
 @admin_required
@@ -5389,8 +5446,7 @@ def admin_view_service_request(request_id):
         return redirect(url_for("dashboard"))
     
     # Get service request from database
-    service_requests = db_helper.get_all_service_requests()
-    service_request = next((r for r in service_requests if r["id"] == request_id), None)
+    service_request = db_helper.get_service_request_by_id(request_id)
     
     if not service_request:
         flash("Service request not found", "error")
@@ -5411,17 +5467,15 @@ def approve_service_request(request_id):
         return redirect(url_for("dashboard"))
     
     try:
-        # Get service request details for notification
-        service_requests = db_helper.get_all_service_requests()
-        service_request = next((r for r in service_requests if r["id"] == request_id), None)
+        # Update the request and get its details for notification in one step
+        service_request = db_helper.update_service_request_status_returning(request_id, 'completed')
         
-        if db_helper.update_service_request_status(request_id, 'completed'):
+        if service_request:
             flash("Service request approved successfully!", "success")
             
             # Send notification to the user who submitted the request
-            if service_request:
-                notification_message = f"Your service request '{service_request['subject']}' has been approved and completed."
-                add_notification(service_request['user_email'], notification_message, "success")
+            notification_message = f"Your service request '{service_request['subject']}' has been approved and completed."
+            add_notification(service_request['user_email'], notification_message, "success")
         else:
             flash("Error approving service request", "error")
     except Exception as e:
@@ -5438,17 +5492,15 @@ def reject_service_request(request_id):
         return redirect(url_for("dashboard"))
     
     try:
-        # Get service request details for notification
-        service_requests = db_helper.get_all_service_requests()
-        service_request = next((r for r in service_requests if r["id"] == request_id), None)
+        # Update the request and get its details for notification in one step
+        service_request = db_helper.update_service_request_status_returning(request_id, 'rejected')
         
-        if db_helper.update_service_request_status(request_id, 'rejected'):
+        if service_request:
             flash("Service request rejected.", "success")
             
             # Send notification to the user who submitted the request
-            if service_request:
-                notification_message = f"Your service request '{service_request['subject']}' has been rejected."
-                add_notification(service_request['user_email'], notification_message, "error")
+            notification_message = f"Your service request '{service_request['subject']}' has been rejected."
+            add_notification(service_request['user_email'], notification_message, "error")
         else:
             flash("Error rejecting service request", "error")
     except Exception as e:
@@ -5467,24 +5519,18 @@ def assign_service_request(request_id):
     assigned_to = request.form.get('assigned_to')
     if assigned_to:
         try:
-            # Get service request details for notification
-            service_requests = db_helper.get_all_service_requests()
-            service_request = next((r for r in service_requests if r["id"] == request_id), None)
+            # Assign the request and get its details for notification in one step
+            service_request = db_helper.assign_service_request_returning(request_id, assigned_to)
             
             if service_request:
-                service_request['assigned_to'] = assigned_to
-                service_request['assigned_date'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                service_request['assigned_by'] = session["user"]
-                
                 flash(f"Service request assigned to {assigned_to} successfully!", "success")
                 
                 # Send notification to the assigned person
                 add_notification(assigned_to, f"You have been assigned service request #{request_id}")
                 
                 # Send notification to the user who submitted the request
-                if service_request:
-                    notification_message = f"Your service request '{service_request['subject']}' has been assigned to {assigned_to}."
-                    add_notification(service_request['user_email'], notification_message, "info")
+                notification_message = f"Your service request '{service_request['subject']}' has been assigned to {assigned_to}."
+                add_notification(service_request['user_email'], notification_message, "info")
             else:
                 flash("Service request not found", "error")
         except Exception as e:
@@ -5505,17 +5551,15 @@ def update_service_request_status(request_id):
     new_status = request.form.get('status')
     if new_status:
         try:
-            # Get service request details for notification
-            service_requests = db_helper.get_all_service_requests()
-            service_request = next((r for r in service_requests if r["id"] == request_id), None)
+            # Update the request and get its details for notification in one step
+            service_request = db_helper.update_service_request_status_returning(request_id, new_status)
             
-            if db_helper.update_service_request_status(request_id, new_status):
+            if service_request:
                 flash(f"Service request status updated to {new_status}", "success")
                 
                 # Send notification to the user who submitted the request
-                if service_request:
-                    notification_message = f"Your service request '{service_request['subject']}' status has been updated to {new_status}."
-                    add_notification(service_request['user_email'], notification_message, "info")
+                notification_message = f"Your service request '{service_request['subject']}' status has been updated to {new_status}."
+                add_notification(service_request['user_email'], notification_message, "info")
             else:
                 flash("Error updating service request status", "error")
         except Exception as e:
@@ -5553,8 +5597,7 @@ def add_service_request_comment(request_id):
     if comment:
         try:
             # Get service request details for notification
-            service_requests = db_helper.get_all_service_requests()
-            service_request = next((r for r in service_requests if r["id"] == request_id), None)
+            service_request = db_helper.get_service_request_by_id(request_id)
             
             if db_helper.add_service_request_comment(request_id, comment, session["user"]):
                 flash("Comment added successfully!", "success")
@@ -5917,28 +5960,23 @@ def bulk_action_tickets():
         flash('No tickets selected for bulk action', 'error')
         return redirect(url_for('admin_tickets'))
     
-    success_count = 0
-    for ticket_id in selected_tickets:
-        ticket_id = int(ticket_id)
-        ticket = next((t for t in tickets if t['id'] == ticket_id), None)
-        
-        if ticket:
-            if action == 'approve':
-                ticket['status'] = 'resolved'
-                success_count += 1
-            elif action == 'reject':
-                ticket['status'] = 'closed'
-                success_count += 1
-            elif action == 'assign':
-                assigned_to = request.form.get('assigned_to')
-                if assigned_to:
-                    ticket['assigned_to'] = assigned_to
-                    success_count += 1
-            elif action == 'delete':
-                tickets.remove(ticket)
-                success_count += 1
-    
-    flash(f'Bulk action completed: {success_count} tickets processed', 'success')
+    # One set-based statement per action instead of one round trip per ticket
+    if action == 'approve':
+        success_count = db_helper.bulk_update_ticket_status(selected_tickets, 'resolved')
+    elif action == 'reject':
+        success_count = db_helper.bulk_update_ticket_status(selected_tickets, 'closed')
+    elif action == 'assign':
+        assigned_to = request.form.get('assigned_to')
+        success_count = db_helper.bulk_assign_tickets(selected_tickets, assigned_to) if assigned_to else 0
+    elif action == 'delete':
+        success_count = db_helper.bulk_delete_tickets(selected_tickets)
+    else:
+        success_count = 0
+    
+    if success_count is None:
+        flash('Bulk action failed, no tickets were changed', 'error')
+    else:
+        flash(f'Bulk action completed: {success_count} tickets processed', 'success')
     return redirect(url_for('admin_tickets'))
 
 # Add bulk actions for service requests
@@ -5952,25 +5990,23 @@ def bulk_action_service_requests():
         flash('No service requests selected for bulk action', 'error')
         return redirect(url_for('admin_service_requests'))
     
-    success_count = 0
-    for request_id in selected_requests:
-        request_id = int(request_id)
-        
-        if action == 'approve':
-            if db_helper.update_service_request_status(request_id, 'completed'):
-                success_count += 1
-        elif action == 'reject':
-            if db_helper.update_service_request_status(request_id, 'rejected'):
-                success_count += 1
-        elif action == 'assign':
-            assigned_to = request.form.get('assigned_to')
-            if assigned_to and db_helper.assign_service_request(request_id, assigned_to):
-                success_count += 1
-        elif action == 'delete':
-            if db_helper.delete_service_request(request_id):
-                success_count += 1
-    
-    flash(f'Bulk action completed: {success_count} service requests processed', 'success')
+    # One set-based statement per action instead of one round trip per request
+    if action == 'approve':
+        success_count = db_helper.bulk_update_service_request_status(selected_requests, 'completed')
+    elif action == 'reject':
+        success_count = db_helper.bulk_update_service_request_status(selected_requests, 'rejected')
+    elif action == 'assign':
+        assigned_to = request.form.get('assigned_to')
+        success_count = db_helper.bulk_assign_service_requests(selected_requests, assigned_to) if assigned_to else 0
+    elif action == 'delete':
+        success_count = db_helper.bulk_delete_service_requests(selected_requests)
+    else:
+        success_count = 0
+    
+    if success_count is None:
+        flash('Bulk action failed, no service requests were changed', 'error')
+    else:
+        flash(f'Bulk action completed: {success_count} service requests processed', 'success')
     return redirect(url_for('admin_service_requests'))
 
 if __name__ == "__main__":
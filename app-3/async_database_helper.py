@@ -0,0 +1,75 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from database_helper import db_helper
+
+# Methods that manage the calling thread's own connection and make no sense to await
+_SYNC_ONLY_METHODS = {'get_connection', 'release_connection', 'close_connection'}
+
+
+class AsyncDatabaseHelper:
+    """Awaitable twin of DatabaseHelper.
+
+    Every public DatabaseHelper method (get_all_tickets, create_notification,
+    get_timesheets_by_employee, ...) is available here as a coroutine with the
+    same arguments and return value. Calls run on a worker thread that borrows
+    its own pooled connection, so independent queries awaited together with
+    ``asyncio.gather`` run concurrently instead of serially.
+    """
+
+    def __init__(self, helper=None, max_workers=None):
+        self.helper = helper or db_helper
+        self._max_workers = max_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # More workers than pooled connections would only queue on checkout
+                workers = self._max_workers or self.helper.pool.size
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='async-db')
+            return self._executor
+
+    def _call(self, method, args, kwargs):
+        try:
+            return method(*args, **kwargs)
+        finally:
+            # Worker threads are reused, so hand the connection back after every call
+            self.helper.release_connection()
+
+    async def run(self, method_name, *args, **kwargs):
+        """Await a DatabaseHelper method by name"""
+        method = getattr(self.helper, method_name)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(self._call, method, args, kwargs))
+
+    async def gather(self, *calls):
+        """Run several (method_name, *args) calls concurrently and return their results in order"""
+        return await asyncio.gather(*(self.run(name, *args) for name, *args in calls))
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name == 'helper' or name in _SYNC_ONLY_METHODS:
+            raise AttributeError(name)
+        attribute = getattr(self.helper, name)
+        if not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def method(*args, **kwargs):
+            return await self.run(name, *args, **kwargs)
+        return method
+
+
+# Create a global instance
+async_db_helper = AsyncDatabaseHelper()
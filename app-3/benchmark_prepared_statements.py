@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Prepared Statement Benchmark
+Compares per-call latency of the hot helper statements sent as plain text
+(the old path) against the reused server-side prepared statements.
+
+    python benchmark_prepared_statements.py --iterations 2000
+"""
+
+import argparse
+import statistics
+import time
+
+import mysql.connector
+
+from database_config import DB_CONFIG
+from prepared_statements import PreparedStatementConnection
+
+STATEMENTS = [
+    ("user by email", "SELECT * FROM users WHERE email = %s", lambda i: (f"bench{i % 50}@example.com",)),
+    ("ticket by id", "SELECT * FROM tickets WHERE id = %s", lambda i: (i % 100 + 1,)),
+    ("notifications by user",
+     "SELECT * FROM notifications WHERE user_email = %s ORDER BY created_at DESC, id DESC LIMIT %s",
+     lambda i: (f"bench{i % 50}@example.com", 20)),
+    ("insert notification",
+     "INSERT INTO notifications (user_email, message, type) VALUES (%s, %s, %s)",
+     lambda i: (f"bench{i % 50}@example.com", "benchmark", "info")),
+]
+
+
+def time_calls(connection, sql, make_params, iterations, dictionary=True):
+    """Run one statement repeatedly and return per-call latencies in microseconds"""
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        cursor = connection.cursor(dictionary=dictionary)
+        cursor.execute(sql, make_params(i))
+        if cursor.with_rows:
+            cursor.fetchall()
+        cursor.close()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return samples
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p95": samples[int(len(samples) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prepared statements against plain text queries")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+
+    connection = mysql.connector.connect(**dict(DB_CONFIG, autocommit=False))
+    prepared = PreparedStatementConnection(connection)
+    print(f"📊 {args.iterations} calls per statement (µs per call, lower is better)\n")
+    print(f"{'statement':<24}{'text mean':>11}{'p50':>9}{'p95':>9}{'prepared mean':>15}{'p50':>9}{'p95':>9}{'change':>9}")
+
+    try:
+        for name, sql, make_params in STATEMENTS:
+            time_calls(connection, sql, make_params, args.warmup)
+            time_calls(prepared, sql, make_params, args.warmup)
+            text = summarize(time_calls(connection, sql, make_params, args.iterations))
+            reused = summarize(time_calls(prepared, sql, make_params, args.iterations))
+            change = (reused["mean"] - text["mean"]) / text["mean"] * 100
+            print(f"{name:<24}{text['mean']:>11.1f}{text['p50']:>9.1f}{text['p95']:>9.1f}"
+                  f"{reused['mean']:>15.1f}{reused['p50']:>9.1f}{reused['p95']:>9.1f}{change:>8.1f}%")
+    finally:
+        # Leave no benchmark rows behind
+        connection.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
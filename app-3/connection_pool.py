@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import deque
+
+from mysql.connector.errors import PoolError
+
+
+class PoolTimeoutError(PoolError):
+    """Raised when no pooled connection becomes available within the checkout timeout"""
+
+
+class ConnectionPool:
+    """Thread-safe pool of MySQL connections.
+
+    Connections are created lazily up to ``size``. A borrower that finds the
+    pool exhausted waits up to ``timeout`` seconds for a connection to be
+    returned. When ``health_check`` is enabled every idle connection is pinged
+    before it is handed out and replaced if the server dropped it.
+    """
+
+    def __init__(self, connect, size=10, timeout=10.0, health_check=True):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.health_check = health_check
+
+        self._idle = deque()
+        self._cond = threading.Condition()
+        self._created = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+
+        # Saturation metrics
+        self._peak_in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._health_check_failures = 0
+
+    def acquire(self, timeout=None):
+        """Borrow a connection, waiting up to ``timeout`` seconds if the pool is exhausted"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            connection = None
+            create = False
+            with self._cond:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                while not self._idle and self._created >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available within {timeout:.1f}s "
+                            f"(pool size {self.size})")
+                    waited = True
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                if self._idle:
+                    connection = self._idle.pop()
+                else:
+                    self._created += 1
+                    create = True
+
+            if create:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    self._discard()
+                    raise
+            elif self.health_check and not self._is_healthy(connection):
+                with self._cond:
+                    self._health_check_failures += 1
+                self._close_quietly(connection)
+                self._discard()
+                continue
+
+            self._checked_out(time.monotonic() - started, waited)
+            return connection
+
+    def release(self, connection):
+        """Return a borrowed connection to the pool"""
+        with self._cond:
+            self._in_use -= 1
+            if self._closed:
+                self._created -= 1
+            else:
+                self._idle.append(connection)
+                self._cond.notify()
+                return
+        self._close_quietly(connection)
+
+    def close(self):
+        """Close all idle connections and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for connection in idle:
+            self._close_quietly(connection)
+
+    def stats(self):
+        """Return a snapshot of pool usage and saturation metrics"""
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                "size": self.size,
+                "timeout": self.timeout,
+                "created": self._created,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "peak_in_use": self._peak_in_use,
+                "utilization": round(self._in_use / self.size, 3),
+                "checkouts": checkouts,
+                "waits": self._waits,
+                "wait_ratio": round(self._waits / checkouts, 3) if checkouts else 0.0,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": round(self._total_wait * 1000 / checkouts, 3) if checkouts else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+                "health_check_failures": self._health_check_failures,
+            }
+
+    def _checked_out(self, wait, waited):
+        with self._cond:
+            self._in_use += 1
+            self._checkouts += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            if waited:
+                self._waits += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+    def _discard(self):
+        """Give up a connection slot so a waiting borrower can open a new one"""
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_healthy(connection):
+        try:
+            return connection.is_connected()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -1,6 +1,9 @@
+import os
+import threading
 import mysql.connector
 from mysql.connector import Error
 import pymysql
+from connection_pool import ConnectionPool
 
 # Database Configuration
 DB_CONFIG = {
@@ -13,6 +16,29 @@ DB_CONFIG = {
     'autocommit': True
 }
 
+# Connection pool configuration (overridable through the environment)
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_TIMEOUT = 10.0
+
+_connection_pool = None
+_connection_pool_pid = None
+_connection_pool_lock = threading.Lock()
+
+def get_connection_pool():
+    """Return the process-wide MySQL connection pool, creating it on first use"""
+    global _connection_pool, _connection_pool_pid
+    with _connection_pool_lock:
+        # Forked workers must not share sockets with the parent process
+        if _connection_pool is None or _connection_pool_pid != os.getpid():
+            _connection_pool = ConnectionPool(
+                lambda: mysql.connector.connect(**DB_CONFIG),
+                size=int(os.getenv('DB_POOL_SIZE', DEFAULT_POOL_SIZE)),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT)),
+                health_check=os.getenv('DB_POOL_HEALTH_CHECK', 'true').lower() != 'false'
+            )
+            _connection_pool_pid = os.getpid()
+        return _connection_pool
+
 def get_db_connection():
     """Create and return a database connection"""
     try:
@@ -45,9 +71,10 @@ def test_connection():
         return True
     return False
 
-def create_tables():
+def create_tables(connection=None):
     """Create necessary tables if they don't exist"""
-    connection = get_db_connection()
+    own_connection = connection is None
+    connection = connection or get_db_connection()
     if not connection:
         return False
     
@@ -93,6 +120,7 @@ def create_tables():
             priority VARCHAR(50) DEFAULT 'medium',
             status VARCHAR(50) DEFAULT 'open',
             user_email VARCHAR(255) NOT NULL,
+            assigned_to VARCHAR(255),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
         )
@@ -419,14 +447,17 @@ def create_tables():
     
     connection.commit()
     cursor.close()
-    connection.close()
+    if own_connection:
+        connection.close()
     print("Database tables created successfully!")
     return True
 
 if __name__ == "__main__":
     # Test the connection
     if test_connection():
-        # Create tables
-        create_tables()
+        # Create tables, then bring indexes up to the latest migration
+        if create_tables():
+            from migrations import migrate
+            migrate()
     else:
         print("Failed to connect to database!") 
\ No newline at end of file
@@ -1,24 +1,216 @@
-from database_config import get_db_connection, get_pymysql_connection
+from database_config import get_connection_pool, get_pymysql_connection
 from mysql.connector import Error
 from datetime import datetime
+from prepared_statements import PreparedStatementConnection, get_statement_cache, statement_cache_stats
+from query_stats import InstrumentedConnection, QueryStats
+from read_cache import cached, create_cache, invalidates
+import base64
 import json
+import os
+import threading
+
+class Page(list):
+    """One keyset page of rows; next_cursor is None on the last page"""
+    def __init__(self, rows=(), next_cursor=None):
+        super().__init__(rows)
+        self.next_cursor = next_cursor
+
+def encode_cursor(sort_value, row_id):
+    """Encode the (sort value, id) position of the last row on a page"""
+    payload = json.dumps([str(sort_value), row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(page_cursor):
+    """Decode a page cursor, returning None if it is malformed"""
+    try:
+        padded = page_cursor + '=' * (-len(page_cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        return None
 
 class DatabaseHelper:
-    def __init__(self):
-        self.connection = None
+    def __init__(self, pool=None, query_stats=None, cache=None, prepared_statements=None):
+        self._pool = pool
+        self._local = threading.local()
+        self.query_stats = query_stats or QueryStats()
+        self.cache = cache
+        if prepared_statements is None:
+            prepared_statements = os.getenv('DB_PREPARED_STATEMENTS', 'true').lower() != 'false'
+        self.prepared_statements = prepared_statements
+    
+    @property
+    def pool(self):
+        """Connection pool backing this helper"""
+        # Resolved on every call so a helper created before a fork uses the child's own pool
+        return self._pool if self._pool is not None else get_connection_pool()
     
     def get_connection(self):
-        """Get database connection"""
-        if not self.connection or not self.connection.is_connected():
-            self.connection = get_db_connection()
-        return self.connection
+        """Get the pooled connection checked out for the current request/thread"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and getattr(self._local, 'pid', None) != os.getpid():
+            # Borrowed by the parent process before a fork; its socket belongs to the parent
+            connection = self._local.connection = None
+        if connection is None:
+            pooled = self.pool.acquire()
+            self._local.pooled = pooled
+            self._local.pid = os.getpid()
+            if self.prepared_statements:
+                # Parameterized statements reuse the pooled connection's server-side prepared statements
+                pooled = PreparedStatementConnection(pooled)
+            # Every cursor opened on the checked-out connection is timed into query_stats
+            connection = InstrumentedConnection(pooled, self.query_stats)
+            self._local.connection = connection
+        return connection
+    
+    def release_connection(self):
+        """Return the current request's connection to the pool"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            self._local.connection = None
+            if getattr(self._local, 'pid', None) == os.getpid():
+                if self.prepared_statements:
+                    # Rows a cursor of this request left unread must not block the next borrower
+                    get_statement_cache(self._local.pooled).clear_unread()
+                self.pool.release(self._local.pooled)
     
     def close_connection(self):
         """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        self.release_connection()
+    
+    def get_pool_stats(self):
+        """Get connection pool saturation metrics"""
+        stats = self.pool.stats()
+        stats['prepared_statements'] = statement_cache_stats()
+        return stats
+    
+    def get_query_stats(self, limit=None):
+        """Get per-query latency histograms, row counts and calling routes"""
+        return self.query_stats.snapshot(limit)
+    
+    def get_cache_stats(self):
+        """Get read cache hit/miss counters"""
+        return self.cache.stats() if self.cache is not None else None
+    
+    def _fetch_rows(self, query, where=None, params=(), sort_column='created_at', id_column='id',
+                    descending=True, page_size=None, page_cursor=None):
+        """Run a listing query ordered by sort_column.
+        
+        Without page_size every row is returned, as before. With page_size a Page of
+        at most page_size rows is returned, continuing after page_cursor using a keyset
+        on (sort_column, id_column) so deep pages cost the same as the first one.
+        """
+        connection = self.get_connection()
+        cursor = connection.cursor(dictionary=True)
+        
+        conditions = [where] if where else []
+        params = list(params)
+        order = "DESC" if descending else "ASC"
+        position = decode_cursor(page_cursor) if page_size and page_cursor else None
+        if position:
+            comparison = "<" if descending else ">"
+            conditions.append(f"({sort_column} {comparison} %s OR ({sort_column} = %s AND {id_column} {comparison} %s))")
+            params.extend([position[0], position[0], position[1]])
+        
+        sql = query
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {sort_column} {order}"
+        if page_size:
+            # Fetch one extra row to learn whether another page follows
+            sql += f", {id_column} {order} LIMIT %s"
+            params.append(page_size + 1)
+        
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        
+        if not page_size:
+            return rows
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            next_cursor = encode_cursor(last[sort_column.split('.')[-1]], last['id'])
+        return Page(rows, next_cursor)
+    
+    def get_status_counts(self, table, column='status'):
+        """Get row counts grouped by a column (table and column must come from code, not user input)"""
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor()
+            
+            cursor.execute(f"SELECT {column}, COUNT(*) FROM {table} GROUP BY {column}")
+            counts = {value: int(total) for value, total in cursor.fetchall()}
+            cursor.close()
+            return counts
+        except Error as e:
+            print(f"Error getting {table} counts: {e}")
+            return {}
+    
+    def _fetch_by_id(self, table, row_id):
+        """Fetch a single row by primary key"""
+        connection = self.get_connection()
+        cursor = connection.cursor(dictionary=True)
+        
+        cursor.execute(f"SELECT * FROM {table} WHERE id = %s", (row_id,))
+        row = cursor.fetchone()
+        cursor.close()
+        return row
+    
+    def _update_returning(self, table, assignments, params, row_id):
+        """UPDATE one row and return it as committed (MySQL has no UPDATE ... RETURNING).
+        
+        The update and the read-back run in one transaction, so the returned row
+        is exactly what this update produced. Returns None if no such row exists.
+        """
+        connection = self.get_connection()
+        cursor = connection.cursor(dictionary=True)
+        try:
+            connection.start_transaction()
+            cursor.execute(f"UPDATE {table} SET {assignments} WHERE id = %s", (*params, row_id))
+            cursor.execute(f"SELECT * FROM {table} WHERE id = %s", (row_id,))
+            row = cursor.fetchone()
+            connection.commit()
+            return row
+        except Error:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+    
+    BULK_CHUNK_SIZE = 1000
+    
+    def _bulk_by_ids(self, statement, params, row_ids):
+        """Run ``statement ... WHERE id IN (...)`` for many ids in a single transaction.
+        
+        Very large selections are split into chunks of BULK_CHUNK_SIZE ids, still
+        inside the same transaction. Returns the number of rows affected; the
+        bulk_* wrappers return None when the statement failed.
+        """
+        row_ids = sorted({int(row_id) for row_id in row_ids if str(row_id).isdigit()})
+        if not row_ids:
+            return 0
+        connection = self.get_connection()
+        cursor = connection.cursor()
+        affected = 0
+        try:
+            connection.start_transaction()
+            for start in range(0, len(row_ids), self.BULK_CHUNK_SIZE):
+                chunk = row_ids[start:start + self.BULK_CHUNK_SIZE]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"{statement} WHERE id IN ({placeholders})", (*params, *chunk))
+                affected += cursor.rowcount
+            connection.commit()
+            return affected
+        except Error:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
     
     # User Management
+    @invalidates('users')
     def create_user(self, email, password, role='employee'):
         """Create a new user"""
         try:
@@ -38,6 +230,7 @@ class DatabaseHelper:
             print(f"Error creating user: {e}")
             return None
     
+    @cached('users')
     def get_user_by_email(self, email):
         """Get user by email"""
         try:
@@ -75,16 +268,12 @@ class DatabaseHelper:
             print(f"Error creating employee: {e}")
             return None
     
-    def get_all_employees(self):
+    def get_all_employees(self, page_size=None, page_cursor=None):
         """Get all employees"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM employees ORDER BY created_at DESC")
-            employees = cursor.fetchall()
-            cursor.close()
-            return employees
+            return self._fetch_rows("SELECT * FROM employees",
+                                    sort_column='created_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting employees: {e}")
             return []
@@ -109,34 +298,43 @@ class DatabaseHelper:
             print(f"Error creating ticket: {e}")
             return None
     
-    def get_tickets_by_user(self, user_email):
+    def get_tickets_by_user(self, user_email, page_size=None, page_cursor=None):
         """Get tickets by user email"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM tickets WHERE user_email = %s ORDER BY created_at DESC", (user_email,))
-            tickets = cursor.fetchall()
-            cursor.close()
-            return tickets
+            return self._fetch_rows("SELECT * FROM tickets",
+                                    where="user_email = %s", params=(user_email,),
+                                    sort_column='created_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting tickets: {e}")
             return []
     
-    def get_all_tickets(self):
+    def get_all_tickets(self, page_size=None, page_cursor=None):
         """Get all tickets"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM tickets ORDER BY created_at DESC")
-            tickets = cursor.fetchall()
-            cursor.close()
-            return tickets
+            return self._fetch_rows("SELECT * FROM tickets",
+                                    sort_column='created_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting all tickets: {e}")
             return []
     
+    def get_ticket_by_id(self, ticket_id):
+        """Get ticket by ID"""
+        try:
+            return self._fetch_by_id("tickets", ticket_id)
+        except Error as e:
+            print(f"Error getting ticket: {e}")
+            return None
+    
+    def update_ticket_status_returning(self, ticket_id, status):
+        """Update ticket status and return the updated ticket"""
+        try:
+            return self._update_returning("tickets", "status = %s", (status,), ticket_id)
+        except Error as e:
+            print(f"Error updating ticket: {e}")
+            return None
+    
     def update_ticket_status(self, ticket_id, status):
         """Update ticket status"""
         try:
@@ -193,6 +391,30 @@ class DatabaseHelper:
             print(f"Error marking ticket done: {e}")
             return False
     
+    def bulk_update_ticket_status(self, ticket_ids, status):
+        """Update the status of many tickets at once"""
+        try:
+            return self._bulk_by_ids("UPDATE tickets SET status = %s", (status,), ticket_ids)
+        except Error as e:
+            print(f"Error bulk updating tickets: {e}")
+            return None
+    
+    def bulk_assign_tickets(self, ticket_ids, assignee):
+        """Assign many tickets to a user at once"""
+        try:
+            return self._bulk_by_ids("UPDATE tickets SET assigned_to = %s", (assignee,), ticket_ids)
+        except Error as e:
+            print(f"Error bulk assigning tickets: {e}")
+            return None
+    
+    def bulk_delete_tickets(self, ticket_ids):
+        """Delete many tickets at once"""
+        try:
+            return self._bulk_by_ids("DELETE FROM tickets", (), ticket_ids)
+        except Error as e:
+            print(f"Error bulk deleting tickets: {e}")
+            return None
+    
     def add_ticket_comment(self, ticket_id, comment, admin_name):
         """Add admin comment to ticket"""
         try:
@@ -250,16 +472,12 @@ class DatabaseHelper:
             print(f"Error creating timeoff request: {e}")
             return None
     
-    def get_all_timeoff_requests(self):
+    def get_all_timeoff_requests(self, page_size=None, page_cursor=None):
         """Get all timeoff requests"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM timeoff_requests ORDER BY submitted_at DESC")
-            requests = cursor.fetchall()
-            cursor.close()
-            return requests
+            return self._fetch_rows("SELECT * FROM timeoff_requests",
+                                    sort_column='submitted_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting timeoff requests: {e}")
             return []
@@ -303,30 +521,23 @@ class DatabaseHelper:
             print(f"Error creating leave request: {e}")
             return None
     
-    def get_leave_requests_by_employee(self, employee_id):
+    def get_leave_requests_by_employee(self, employee_id, page_size=None, page_cursor=None):
         """Get leave requests by employee"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM leave_requests WHERE employee_id = %s ORDER BY submitted_at DESC", (employee_id,))
-            requests = cursor.fetchall()
-            cursor.close()
-            return requests
+            return self._fetch_rows("SELECT * FROM leave_requests",
+                                    where="employee_id = %s", params=(employee_id,),
+                                    sort_column='submitted_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting leave requests: {e}")
             return []
     
-    def get_all_leave_requests(self):
+    def get_all_leave_requests(self, page_size=None, page_cursor=None):
         """Get all leave requests"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM leave_requests ORDER BY submitted_at DESC")
-            requests = cursor.fetchall()
-            cursor.close()
-            return requests
+            return self._fetch_rows("SELECT * FROM leave_requests",
+                                    sort_column='submitted_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting all leave requests: {e}")
             return []
@@ -372,16 +583,12 @@ class DatabaseHelper:
             print(f"Error creating feedback: {e}")
             return None
     
-    def get_all_feedback(self):
+    def get_all_feedback(self, page_size=None, page_cursor=None):
         """Get all feedback"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM feedback ORDER BY submitted_at DESC")
-            feedback_list = cursor.fetchall()
-            cursor.close()
-            return feedback_list
+            return self._fetch_rows("SELECT * FROM feedback",
+                                    sort_column='submitted_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting feedback: {e}")
             return []
@@ -466,16 +673,12 @@ class DatabaseHelper:
             print(f"Error creating job application: {e}")
             return None
     
-    def get_all_applications(self):
+    def get_all_applications(self, page_size=None, page_cursor=None):
         """Get all job applications"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM job_applications ORDER BY applied_at DESC")
-            applications = cursor.fetchall()
-            cursor.close()
-            return applications
+            return self._fetch_rows("SELECT * FROM job_applications",
+                                    sort_column='applied_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting applications: {e}")
             return []
@@ -521,16 +724,13 @@ class DatabaseHelper:
             print(f"Error creating notification: {e}")
             return None
     
-    def get_notifications_by_user(self, user_email):
+    def get_notifications_by_user(self, user_email, page_size=None, page_cursor=None):
         """Get notifications by user"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM notifications WHERE user_email = %s ORDER BY created_at DESC", (user_email,))
-            notifications = cursor.fetchall()
-            cursor.close()
-            return notifications
+            return self._fetch_rows("SELECT * FROM notifications",
+                                    where="user_email = %s", params=(user_email,),
+                                    sort_column='created_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting notifications: {e}")
             return []
@@ -569,16 +769,12 @@ class DatabaseHelper:
             print(f"Error creating group: {e}")
             return None
     
-    def get_all_groups(self):
+    def get_all_groups(self, page_size=None, page_cursor=None):
         """Get all groups"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM user_groups ORDER BY created_at DESC")
-            groups = cursor.fetchall()
-            cursor.close()
-            return groups
+            return self._fetch_rows("SELECT * FROM user_groups",
+                                    sort_column='created_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting groups: {e}")
             return []
@@ -635,16 +831,14 @@ class DatabaseHelper:
             print(f"Error adding chat message: {e}")
             return None
     
-    def get_group_messages(self, group_id):
+    def get_group_messages(self, group_id, page_size=None, page_cursor=None):
         """Get group messages"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM chat_messages WHERE group_id = %s ORDER BY sent_at ASC", (group_id,))
-            messages = cursor.fetchall()
-            cursor.close()
-            return messages
+            return self._fetch_rows("SELECT * FROM chat_messages",
+                                    where="group_id = %s", params=(group_id,),
+                                    sort_column='sent_at',
+                                    descending=False,
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting group messages: {e}")
             return []
@@ -673,30 +867,23 @@ class DatabaseHelper:
             print(f"Error creating timesheet: {e}")
             return None
     
-    def get_timesheets_by_employee(self, employee_id):
+    def get_timesheets_by_employee(self, employee_id, page_size=None, page_cursor=None):
         """Get timesheets by employee"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM timesheets WHERE user_id = %s ORDER BY date DESC", (employee_id,))
-            timesheets = cursor.fetchall()
-            cursor.close()
-            return timesheets
+            return self._fetch_rows("SELECT * FROM timesheets",
+                                    where="user_id = %s", params=(employee_id,),
+                                    sort_column='date',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting timesheets: {e}")
             return []
     
-    def get_all_timesheets(self):
+    def get_all_timesheets(self, page_size=None, page_cursor=None):
         """Get all timesheets"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM timesheets ORDER BY date DESC")
-            timesheets = cursor.fetchall()
-            cursor.close()
-            return timesheets
+            return self._fetch_rows("SELECT * FROM timesheets",
+                                    sort_column='date',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting all timesheets: {e}")
             return []
@@ -769,6 +956,7 @@ class DatabaseHelper:
             return []
     
     # Badge Management
+    @invalidates('badges')
     def create_badge(self, name, description, icon=None, category=None):
         """Create a new badge"""
         try:
@@ -788,16 +976,13 @@ class DatabaseHelper:
             print(f"Error creating badge: {e}")
             return None
     
-    def get_all_badges(self):
+    @cached('badges')
+    def get_all_badges(self, page_size=None, page_cursor=None):
         """Get all badges"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM badges ORDER BY created_at DESC")
-            badges = cursor.fetchall()
-            cursor.close()
-            return badges
+            return self._fetch_rows("SELECT * FROM badges",
+                                    sort_column='created_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting badges: {e}")
             return []
@@ -841,21 +1026,17 @@ class DatabaseHelper:
             print(f"Error getting user badges: {e}")
             return []
     
-    def get_all_user_badges(self):
+    def get_all_user_badges(self, page_size=None, page_cursor=None):
         """Get all user badge assignments"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("""
+            return self._fetch_rows("""
                 SELECT ub.*, b.name as badge_name, b.description, b.icon
                 FROM user_badges ub
                 JOIN badges b ON ub.badge_id = b.id
-                ORDER BY ub.awarded_at DESC
-            """)
-            assignments = cursor.fetchall()
-            cursor.close()
-            return assignments
+            """,
+                                    sort_column='ub.awarded_at',
+                                    id_column='ub.id',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting all user badges: {e}")
             return []
@@ -880,30 +1061,31 @@ class DatabaseHelper:
             print(f"Error creating service request: {e}")
             return None
     
-    def get_all_service_requests(self):
+    def get_all_service_requests(self, page_size=None, page_cursor=None):
         """Get all service requests"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM service_requests ORDER BY created_at DESC")
-            requests = cursor.fetchall()
-            cursor.close()
-            return requests
+            return self._fetch_rows("SELECT * FROM service_requests",
+                                    sort_column='created_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting service requests: {e}")
             return []
     
-    def get_service_requests_by_user(self, user_email):
+    def get_service_request_by_id(self, request_id):
+        """Get service request by ID"""
+        try:
+            return self._fetch_by_id("service_requests", request_id)
+        except Error as e:
+            print(f"Error getting service request: {e}")
+            return None
+    
+    def get_service_requests_by_user(self, user_email, page_size=None, page_cursor=None):
         """Get service requests by user"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM service_requests WHERE user_email = %s ORDER BY created_at DESC", (user_email,))
-            requests = cursor.fetchall()
-            cursor.close()
-            return requests
+            return self._fetch_rows("SELECT * FROM service_requests",
+                                    where="user_email = %s", params=(user_email,),
+                                    sort_column='created_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting user service requests: {e}")
             return []
@@ -929,6 +1111,23 @@ class DatabaseHelper:
             print(f"Error updating service request: {e}")
             return False
     
+    def update_service_request_status_returning(self, request_id, status):
+        """Update service request status and return the updated request"""
+        try:
+            return self._update_returning("service_requests", "status = %s, updated_at = NOW()", (status,), request_id)
+        except Error as e:
+            print(f"Error updating service request: {e}")
+            return None
+    
+    def assign_service_request_returning(self, request_id, assigned_to):
+        """Assign service request to someone and return the updated request"""
+        try:
+            return self._update_returning("service_requests", "assigned_to = %s, status = 'assigned', updated_at = NOW()",
+                                          (assigned_to,), request_id)
+        except Error as e:
+            print(f"Error assigning service request: {e}")
+            return None
+    
     def assign_service_request(self, request_id, assigned_to):
         """Assign service request to someone"""
         try:
@@ -961,6 +1160,31 @@ class DatabaseHelper:
             print(f"Error deleting service request: {e}")
             return False
     
+    def bulk_update_service_request_status(self, request_ids, status):
+        """Update the status of many service requests at once"""
+        try:
+            return self._bulk_by_ids("UPDATE service_requests SET status = %s, updated_at = NOW()", (status,), request_ids)
+        except Error as e:
+            print(f"Error bulk updating service requests: {e}")
+            return None
+    
+    def bulk_assign_service_requests(self, request_ids, assigned_to):
+        """Assign many service requests at once"""
+        try:
+            return self._bulk_by_ids("UPDATE service_requests SET assigned_to = %s, status = 'assigned', updated_at = NOW()",
+                                     (assigned_to,), request_ids)
+        except Error as e:
+            print(f"Error bulk assigning service requests: {e}")
+            return None
+    
+    def bulk_delete_service_requests(self, request_ids):
+        """Delete many service requests at once"""
+        try:
+            return self._bulk_by_ids("DELETE FROM service_requests", (), request_ids)
+        except Error as e:
+            print(f"Error bulk deleting service requests: {e}")
+            return None
+    
     def add_service_request_comment(self, request_id, comment, admin_name):
         """Add admin comment to service request"""
         try:
@@ -995,6 +1219,7 @@ class DatabaseHelper:
             return []
     
     # Career Portal Management
+    @invalidates('internal_jobs')
     def create_internal_job(self, title, department, location, job_type, description, requirements, salary_range, posted_date, deadline_date):
         """Create a new internal job posting"""
         try:
@@ -1014,20 +1239,18 @@ class DatabaseHelper:
             print(f"Error creating internal job: {e}")
             return None
     
-    def get_all_internal_jobs(self):
+    @cached('internal_jobs')
+    def get_all_internal_jobs(self, page_size=None, page_cursor=None):
         """Get all internal job postings"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM internal_jobs ORDER BY posted_date DESC")
-            jobs = cursor.fetchall()
-            cursor.close()
-            return jobs
+            return self._fetch_rows("SELECT * FROM internal_jobs",
+                                    sort_column='posted_date',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting internal jobs: {e}")
             return []
     
+    @cached('internal_jobs')
     def get_internal_job_by_id(self, job_id):
         """Get specific internal job by ID"""
         try:
@@ -1061,41 +1284,33 @@ class DatabaseHelper:
             print(f"Error applying for internal job: {e}")
             return None
     
-    def get_user_internal_applications(self, user_email):
+    def get_user_internal_applications(self, user_email, page_size=None, page_cursor=None):
         """Get user's internal job applications"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("""
+            return self._fetch_rows("""
                 SELECT ia.*, ij.title as job_title, ij.department, ij.location
                 FROM internal_job_applications ia
                 JOIN internal_jobs ij ON ia.job_id = ij.id
-                WHERE ia.user_email = %s
-                ORDER BY ia.applied_date DESC
-            """, (user_email,))
-            applications = cursor.fetchall()
-            cursor.close()
-            return applications
+            """,
+                                    where="ia.user_email = %s", params=(user_email,),
+                                    sort_column='ia.applied_date',
+                                    id_column='ia.id',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting user internal applications: {e}")
             return []
     
-    def get_all_internal_applications(self):
+    def get_all_internal_applications(self, page_size=None, page_cursor=None):
         """Get all internal job applications"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("""
+            return self._fetch_rows("""
                 SELECT ia.*, ij.title as job_title, ij.department, ij.location
                 FROM internal_job_applications ia
                 JOIN internal_jobs ij ON ia.job_id = ij.id
-                ORDER BY ia.applied_date DESC
-            """)
-            applications = cursor.fetchall()
-            cursor.close()
-            return applications
+            """,
+                                    sort_column='ia.applied_date',
+                                    id_column='ia.id',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting all internal applications: {e}")
             return []
@@ -1120,16 +1335,13 @@ class DatabaseHelper:
             print(f"Error creating skills assessment: {e}")
             return None
     
-    def get_user_skills_assessments(self, user_email):
+    def get_user_skills_assessments(self, user_email, page_size=None, page_cursor=None):
         """Get user's skills assessments"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM skills_assessments WHERE user_email = %s ORDER BY completed_at DESC", (user_email,))
-            assessments = cursor.fetchall()
-            cursor.close()
-            return assessments
+            return self._fetch_rows("SELECT * FROM skills_assessments",
+                                    where="user_email = %s", params=(user_email,),
+                                    sort_column='completed_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting user skills assessments: {e}")
             return []
@@ -1195,6 +1407,7 @@ class DatabaseHelper:
             return None
 
     # Course Management
+    @cached('courses')
     def get_course_by_id(self, course_id):
         """Get course by ID"""
         try:
@@ -1209,20 +1422,18 @@ class DatabaseHelper:
             print(f"Error getting course: {e}")
             return None
     
-    def get_all_courses(self):
+    @cached('courses')
+    def get_all_courses(self, page_size=None, page_cursor=None):
         """Get all courses"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM courses ORDER BY created_at DESC")
-            courses = cursor.fetchall()
-            cursor.close()
-            return courses
+            return self._fetch_rows("SELECT * FROM courses",
+                                    sort_column='created_at',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting courses: {e}")
             return []
     
+    @invalidates('courses')
     def create_course(self, title, description, content, questions, passing_score, badge=None):
         """Create a new course"""
         try:
@@ -1261,25 +1472,106 @@ class DatabaseHelper:
             print(f"Error saving quiz result: {e}")
             return None
     
-    def get_user_quiz_results(self, user_email):
+    def get_user_quiz_results(self, user_email, page_size=None, page_cursor=None):
         """Get user's quiz results"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute("""
+            return self._fetch_rows("""
                 SELECT qr.*, c.title as course_title
                 FROM quiz_results qr
                 LEFT JOIN courses c ON qr.course_id = c.id
-                WHERE qr.user_email = %s
-                ORDER BY qr.completed_at DESC
-            """, (user_email,))
-            results = cursor.fetchall()
-            cursor.close()
-            return results
+            """,
+                                    where="qr.user_email = %s", params=(user_email,),
+                                    sort_column='qr.completed_at',
+                                    id_column='qr.id',
+                                    page_size=page_size, page_cursor=page_cursor)
         except Error as e:
             print(f"Error getting user quiz results: {e}")
             return []
 
+    # Dashboard Statistics
+    DASHBOARD_TABLES = ('tickets', 'feedback', 'timeoff_requests', 'leave_requests',
+                        'timesheets', 'job_applications', 'employees')
+    
+    def get_dashboard_counts(self):
+        """Get per-status and total row counts for the admin dashboard tables"""
+        counts = {
+            'status_counts': {table: {} for table in self.DASHBOARD_TABLES},
+            'totals': {table: 0 for table in self.DASHBOARD_TABLES}
+        }
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor(dictionary=True)
+            
+            # One round trip for every per-status count
+            cursor.execute("""
+                SELECT 'tickets' AS source, status, COUNT(*) AS total FROM tickets GROUP BY status
+                UNION ALL
+                SELECT 'feedback', status, COUNT(*) FROM feedback GROUP BY status
+                UNION ALL
+                SELECT 'timeoff_requests', status, COUNT(*) FROM timeoff_requests GROUP BY status
+                UNION ALL
+                SELECT 'leave_requests', status, COUNT(*) FROM leave_requests GROUP BY status
+                UNION ALL
+                SELECT 'timesheets', status, COUNT(*) FROM timesheets GROUP BY status
+                UNION ALL
+                SELECT 'job_applications', status, COUNT(*) FROM job_applications GROUP BY status
+                UNION ALL
+                SELECT 'employees', NULL, COUNT(*) FROM employees
+            """)
+            for row in cursor.fetchall():
+                counts['status_counts'][row['source']][row['status']] = int(row['total'])
+                counts['totals'][row['source']] += int(row['total'])
+            cursor.close()
+        except Error as e:
+            print(f"Error getting dashboard counts: {e}")
+        return counts
+    
+    def get_dashboard_recent(self, recent_limit=3):
+        """Get the newest tickets, leave/time-off requests, timesheets and feedback for the admin dashboard"""
+        recent = {
+            'recent_tickets': [],
+            'recent_requests': [],
+            'recent_timesheets': [],
+            'recent_feedback': []
+        }
+        try:
+            connection = self.get_connection()
+            cursor = connection.cursor(dictionary=True)
+            
+            cursor.execute("SELECT * FROM tickets ORDER BY created_at DESC LIMIT %s", (recent_limit,))
+            recent['recent_tickets'] = cursor.fetchall()
+            
+            cursor.execute("""
+                SELECT * FROM (
+                    SELECT id, employee_name, NULL AS leave_type, start_date, end_date, status, submitted_at
+                    FROM timeoff_requests ORDER BY submitted_at DESC LIMIT %s
+                ) AS recent_timeoff
+                UNION ALL
+                SELECT * FROM (
+                    SELECT id, employee_name, leave_type, start_date, end_date, status, submitted_at
+                    FROM leave_requests ORDER BY submitted_at DESC LIMIT %s
+                ) AS recent_leave
+                ORDER BY submitted_at DESC
+                LIMIT %s
+            """, (recent_limit, recent_limit, recent_limit))
+            recent['recent_requests'] = cursor.fetchall()
+            
+            cursor.execute("SELECT * FROM timesheets ORDER BY date DESC LIMIT %s", (recent_limit,))
+            recent['recent_timesheets'] = cursor.fetchall()
+            
+            cursor.execute("SELECT * FROM feedback ORDER BY submitted_at DESC LIMIT %s", (recent_limit,))
+            recent['recent_feedback'] = cursor.fetchall()
+            
+            cursor.close()
+        except Error as e:
+            print(f"Error getting recent dashboard items: {e}")
+        return recent
+    
+    def get_dashboard_stats(self, recent_limit=3):
+        """Get admin dashboard counters and recent items without loading whole tables"""
+        stats = self.get_dashboard_counts()
+        stats.update(self.get_dashboard_recent(recent_limit))
+        return stats
+
 # Create a global instance
-db_helper = DatabaseHelper() 
\ No newline at end of file
+db_helper = DatabaseHelper(cache=create_cache()) 
\ No newline at end of file
@@ -2,6 +2,7 @@
 """
 Database Fix Script
 Fixes schema issues and creates missing tables
+Index and other schema changes now go in migrations.py (python migrations.py)
 """
 
 from database_config import get_db_connection
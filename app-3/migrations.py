@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Versioned Schema Migrations
+Applies pending schema changes in order and records them in schema_migrations.
+Run at deploy time instead of the ad-hoc fix scripts:
+
+    python migrations.py            # apply pending migrations
+    python migrations.py status     # list applied and pending versions
+"""
+
+import argparse
+import sys
+from collections import namedtuple
+
+from mysql.connector import Error
+
+from database_config import get_db_connection
+
+Migration = namedtuple('Migration', ['version', 'description', 'steps'])
+
+# A step is a raw SQL statement, an AddIndex or an AddColumn. AddIndex is
+# idempotent: it is a no-op when the index already exists, and it is skipped
+# when the live table does not have the columns (the schema has drifted from
+# create_tables() over time). AddColumn is a no-op when the column exists and
+# is skipped when the table does not. Skipped steps are recorded in
+# schema_migration_skips and retried on every later run until they apply.
+AddIndex = namedtuple('AddIndex', ['table', 'name', 'columns'])
+AddColumn = namedtuple('AddColumn', ['table', 'name', 'definition'])
+
+# Append new migrations with the next version number; never edit applied ones.
+# InnoDB appends the primary key to every secondary index, so an index on
+# (user_email, created_at) also serves the keyset ORDER BY created_at, id.
+MIGRATIONS = [
+    Migration(1, 'Composite indexes for per-user listings', [
+        AddIndex('tickets', 'idx_tickets_user_created', ['user_email', 'created_at']),
+        AddIndex('notifications', 'idx_notifications_user_created', ['user_email', 'created_at']),
+        AddIndex('leave_requests', 'idx_leave_requests_employee_submitted', ['employee_id', 'submitted_at']),
+        AddIndex('timesheets', 'idx_timesheets_employee_date', ['employee_id', 'date']),
+        AddIndex('timesheets', 'idx_timesheets_user_date', ['user_id', 'date']),
+        AddIndex('service_requests', 'idx_service_requests_user_created', ['user_email', 'created_at']),
+        AddIndex('skills_assessments', 'idx_skills_assessments_user_completed', ['user_email', 'completed_at']),
+        AddIndex('quiz_results', 'idx_quiz_results_user_completed', ['user_email', 'completed_at']),
+        AddIndex('internal_job_applications', 'idx_internal_job_applications_user_applied',
+                 ['user_email', 'applied_date']),
+        AddIndex('chat_messages', 'idx_chat_messages_group_sent', ['group_id', 'sent_at']),
+    ]),
+    Migration(2, 'Sort indexes for admin listings', [
+        AddIndex('tickets', 'idx_tickets_created', ['created_at']),
+        AddIndex('service_requests', 'idx_service_requests_created', ['created_at']),
+        AddIndex('timeoff_requests', 'idx_timeoff_requests_submitted', ['submitted_at']),
+        AddIndex('leave_requests', 'idx_leave_requests_submitted', ['submitted_at']),
+        AddIndex('feedback', 'idx_feedback_submitted', ['submitted_at']),
+        AddIndex('job_applications', 'idx_job_applications_applied', ['applied_at']),
+        AddIndex('timesheets', 'idx_timesheets_date', ['date']),
+        AddIndex('internal_jobs', 'idx_internal_jobs_posted', ['posted_date']),
+        AddIndex('internal_job_applications', 'idx_internal_job_applications_applied', ['applied_date']),
+        AddIndex('user_badges', 'idx_user_badges_awarded', ['awarded_at']),
+    ]),
+    Migration(3, 'Status indexes for dashboard counters', [
+        AddIndex('tickets', 'idx_tickets_status', ['status']),
+        AddIndex('feedback', 'idx_feedback_status', ['status']),
+        AddIndex('timeoff_requests', 'idx_timeoff_requests_status', ['status']),
+        AddIndex('leave_requests', 'idx_leave_requests_status', ['status']),
+        AddIndex('timesheets', 'idx_timesheets_status', ['status']),
+        AddIndex('job_applications', 'idx_job_applications_status', ['status']),
+        AddIndex('service_requests', 'idx_service_requests_status', ['status']),
+    ]),
+    Migration(4, 'Ticket assignee for the bulk assign action', [
+        AddColumn('tickets', 'assigned_to', 'VARCHAR(255)'),
+    ]),
+]
+
+
+def ensure_migrations_table(cursor):
+    """Create the schema_migrations bookkeeping table if it doesn't exist"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migration_skips (
+            version INT NOT NULL,
+            step VARCHAR(255) NOT NULL,
+            reason VARCHAR(255) NOT NULL,
+            PRIMARY KEY (version, step)
+        )
+    """)
+
+
+def get_applied_versions(cursor):
+    """Get applied migration versions mapped to when they were applied"""
+    cursor.execute("SELECT version, applied_at FROM schema_migrations ORDER BY version")
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def table_columns(cursor, table):
+    """Get the column names of a table (empty if the table doesn't exist)"""
+    cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s
+    """, (table,))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def index_exists(cursor, table, name):
+    """Check whether an index is already defined on a table"""
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    """, (table, name))
+    return cursor.fetchone()[0] > 0
+
+
+def apply_step(cursor, step):
+    """Apply a single migration step; returns why an AddIndex or AddColumn was skipped, or None"""
+    if not isinstance(step, (AddIndex, AddColumn)):
+        cursor.execute(step)
+        return None
+
+    columns = table_columns(cursor, step.table)
+    if not columns:
+        reason = f"table {step.table} does not exist"
+        print(f"   ⚠️  Skipping {step.name}: {reason}")
+        return reason
+    if isinstance(step, AddColumn):
+        if step.name in columns:
+            print(f"   ✅ {step.table}.{step.name} already exists")
+            return None
+        cursor.execute(f"ALTER TABLE {step.table} ADD COLUMN {step.name} {step.definition}")
+        print(f"   ✅ Added {step.table}.{step.name} {step.definition}")
+        return None
+    missing = [column for column in step.columns if column not in columns]
+    if missing:
+        reason = f"{step.table} has no column {', '.join(missing)}"
+        print(f"   ⚠️  Skipping {step.name}: {reason}")
+        return reason
+    if index_exists(cursor, step.table, step.name):
+        print(f"   ✅ {step.name} already exists")
+        return None
+
+    cursor.execute(f"CREATE INDEX {step.name} ON {step.table} ({', '.join(step.columns)})")
+    print(f"   ✅ Created {step.name} on {step.table} ({', '.join(step.columns)})")
+    return None
+
+
+def get_skipped_steps(cursor):
+    """Get (version, step, reason) for every skipped step still waiting for its table or column"""
+    cursor.execute("SELECT version, step, reason FROM schema_migration_skips ORDER BY version, step")
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def retry_skipped_steps(cursor, migrations):
+    """Retry AddIndex and AddColumn steps of applied migrations that were skipped on an earlier run"""
+    steps = {(m.version, step.name): step for m in migrations for step in m.steps
+             if isinstance(step, (AddIndex, AddColumn))}
+    for version, name, _ in get_skipped_steps(cursor):
+        step = steps.get((version, name))
+        if step is None:
+            continue
+        print(f"🔁 Retrying {name} from migration {version}")
+        reason = apply_step(cursor, step)
+        if reason is None:
+            cursor.execute("DELETE FROM schema_migration_skips WHERE version = %s AND step = %s", (version, name))
+        else:
+            cursor.execute("UPDATE schema_migration_skips SET reason = %s WHERE version = %s AND step = %s",
+                           (reason, version, name))
+
+
+def migrate(connection=None, target=None, migrations=None):
+    """Apply pending migrations up to target (all by default)"""
+    own_connection = connection is None
+    connection = connection or get_db_connection()
+    if not connection:
+        return False
+
+    cursor = connection.cursor()
+    try:
+        ensure_migrations_table(cursor)
+        applied = get_applied_versions(cursor)
+        migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+        retry_skipped_steps(cursor, [m for m in migrations if m.version in applied])
+        connection.commit()
+        pending = [m for m in migrations
+                   if m.version not in applied and (target is None or m.version <= target)]
+        if not pending:
+            print("✅ Schema is up to date")
+
+        for migration in pending:
+            print(f"🔧 Applying migration {migration.version}: {migration.description}")
+            skipped = []
+            for step in migration.steps:
+                reason = apply_step(cursor, step)
+                if reason is not None:
+                    skipped.append((migration.version, step.name, reason))
+            # MySQL commits DDL implicitly, so a version is recorded only after all
+            # of its steps succeeded; a rerun resumes through the idempotent steps
+            cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                           (migration.version, migration.description))
+            if skipped:
+                cursor.executemany("INSERT INTO schema_migration_skips (version, step, reason) VALUES (%s, %s, %s)",
+                                   skipped)
+            connection.commit()
+        return True
+    except Error as e:
+        print(f"Error applying migrations: {e}")
+        connection.rollback()
+        return False
+    finally:
+        cursor.close()
+        if own_connection:
+            connection.close()
+
+
+def get_migration_status(connection=None, migrations=None):
+    """Get (version, description, applied_at) for every migration, applied_at is None when pending"""
+    own_connection = connection is None
+    connection = connection or get_db_connection()
+    if not connection:
+        return None
+
+    cursor = connection.cursor()
+    try:
+        ensure_migrations_table(cursor)
+        applied = get_applied_versions(cursor)
+        return [(m.version, m.description, applied.get(m.version))
+                for m in sorted(migrations or MIGRATIONS, key=lambda m: m.version)]
+    except Error as e:
+        print(f"Error reading migration status: {e}")
+        return None
+    finally:
+        cursor.close()
+        if own_connection:
+            connection.close()
+
+
+def get_skipped_step_status(connection=None):
+    """Get (version, step, reason) for skipped steps still to be retried"""
+    own_connection = connection is None
+    connection = connection or get_db_connection()
+    if not connection:
+        return None
+
+    cursor = connection.cursor()
+    try:
+        ensure_migrations_table(cursor)
+        return get_skipped_steps(cursor)
+    except Error as e:
+        print(f"Error reading skipped migration steps: {e}")
+        return None
+    finally:
+        cursor.close()
+        if own_connection:
+            connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    parser.add_argument('command', nargs='?', default='migrate', choices=['migrate', 'status'])
+    parser.add_argument('--target', type=int, help="Only apply migrations up to this version")
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        status = get_migration_status()
+        if status is None:
+            return 1
+        for version, description, applied_at in status:
+            state = f"applied {applied_at}" if applied_at else "pending"
+            print(f"{version:>4}  {description:<45} {state}")
+        for version, step, reason in get_skipped_step_status() or []:
+            print(f"   ⚠️  {step} (migration {version}) skipped, retried on the next run: {reason}")
+        return 0
+
+    return 0 if migrate(target=args.target) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+from mysql.connector import Error
+from mysql.connector.constants import FieldType
+
+# Prepared statements kept per pooled connection; the least recently used one is deallocated
+DEFAULT_STATEMENT_CACHE_SIZE = 64
+
+# Statements with more parameters than this (bulk IN lists) are one-offs, run them as plain text
+MAX_PREPARED_PARAMS = 32
+
+# Server lost the statement, e.g. after a reconnect
+ER_UNKNOWN_STMT_HANDLER = 1243
+
+
+class StatementCache:
+    """Prepared cursors of one connection, keyed by statement text"""
+
+    def __init__(self, connection, size=DEFAULT_STATEMENT_CACHE_SIZE):
+        self.connection = connection
+        self.size = size
+        self._entries = OrderedDict()
+        self._last_cursor = None
+        self._last_owner = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def checkout(self, sql, dictionary, owner):
+        """Return (statement, cursor) for sql, preparing it on first use.
+
+        mysql.connector re-prepares whenever a cursor is given a different string
+        object, so the cached statement string must be passed back to execute().
+        """
+        self.drain(owner)
+        key = (sql, dictionary)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self._entries[key] = (sql, self.connection.cursor(prepared=True, dictionary=dictionary))
+            while len(self._entries) > self.size:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.evictions += 1
+                self._close_quietly(evicted)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        self.track(entry[1], owner)
+        return entry
+
+    def track(self, cursor, owner):
+        """Remember the cursor that last ran a statement on the connection, and whose statement it was"""
+        self._last_cursor = cursor
+        self._last_owner = owner
+
+    def discard(self, sql, dictionary):
+        entry = self._entries.pop((sql, dictionary), None)
+        if entry is not None:
+            self._close_quietly(entry[1])
+
+    def drain(self, owner):
+        """Read the rows owner's last statement left unread so the connection accepts a new command.
+
+        Rows another cursor has not read yet are not discarded; like a plain
+        mysql.connector connection, running a statement over them is an error.
+        """
+        if self._last_cursor is None or not getattr(self.connection, 'unread_result', False):
+            return
+        if self._last_owner is not owner:
+            raise Error(msg="Unread result found: another cursor on this connection has rows left to read")
+        try:
+            self._last_cursor.fetchall()
+        except Error:
+            pass
+
+    def release(self, owner):
+        """Read what owner left unread when it is closed; other cursors' rows are left alone"""
+        if self._last_owner is owner:
+            self.drain(owner)
+            self._last_cursor = self._last_owner = None
+
+    def clear_unread(self):
+        """Read rows a finished request left unread, so the next borrower of the connection starts clean"""
+        self.drain(self._last_owner)
+        self._last_cursor = self._last_owner = None
+
+    def stats(self):
+        return {'statements': len(self._entries), 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+    @staticmethod
+    def _close_quietly(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def get_statement_cache(connection, size=DEFAULT_STATEMENT_CACHE_SIZE):
+    """Get the statement cache that lives as long as a pooled connection"""
+    with _caches_lock:
+        cache = _caches.get(connection)
+        if cache is None:
+            cache = _caches[connection] = StatementCache(connection, size)
+        return cache
+
+
+def statement_cache_stats():
+    """Get hit/miss totals across the statement caches of this process"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    totals = {'connections': len(caches), 'statements': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
+    for cache in caches:
+        for name, value in cache.stats().items():
+            totals[name] += value
+    return totals
+
+
+class PreparedCursor:
+    """Cursor that runs parameterized statements on the connection's cached prepared cursors"""
+
+    def __init__(self, connection, cache, dictionary=False):
+        self._connection = connection
+        self._cache = cache
+        self.dictionary = dictionary
+        self._cursor = None
+        self._text_cursor = None
+
+    def execute(self, sql, params=None):
+        if not params or len(params) > MAX_PREPARED_PARAMS:
+            self._cache.drain(self)
+            if self._text_cursor is None:
+                self._text_cursor = self._connection.cursor(dictionary=self.dictionary)
+            self._cursor = self._text_cursor
+            self._cache.track(self._text_cursor, self)
+            return self._cursor.execute(sql, params)
+
+        statement, self._cursor = self._cache.checkout(sql, self.dictionary, self)
+        try:
+            return self._cursor.execute(statement, tuple(params))
+        except Error as e:
+            if e.errno != ER_UNKNOWN_STMT_HANDLER:
+                raise
+            self._cache.discard(sql, self.dictionary)
+            statement, self._cursor = self._cache.checkout(sql, self.dictionary, self)
+            return self._cursor.execute(statement, tuple(params))
+
+    def _json_columns(self):
+        # The binary protocol returns JSON as bytes where the text protocol returns str
+        if self._cursor is self._text_cursor:
+            return []
+        return [column[0] for column in self._cursor.description or () if column[1] == FieldType.JSON]
+
+    def _convert(self, row, json_columns):
+        if row is None or not json_columns:
+            return row
+        if self.dictionary:
+            return {key: value.decode() if key in json_columns and isinstance(value, bytes) else value
+                    for key, value in row.items()}
+        names = [column[0] for column in self._cursor.description]
+        return tuple(value.decode() if name in json_columns and isinstance(value, bytes) else value
+                     for name, value in zip(names, row))
+
+    def fetchone(self):
+        return self._convert(self._cursor.fetchone(), self._json_columns())
+
+    def fetchmany(self, size=1):
+        json_columns = self._json_columns()
+        return [self._convert(row, json_columns) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        json_columns = self._json_columns()
+        return [self._convert(row, json_columns) for row in self._cursor.fetchall()]
+
+    def close(self):
+        # Cached prepared cursors stay open for the next caller; only this cursor's leftovers are read
+        self._cache.release(self)
+        if self._text_cursor is not None:
+            self._text_cursor.close()
+            self._text_cursor = None
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __getattr__(self, name):
+        if self._cursor is None:
+            raise AttributeError(name)
+        return getattr(self._cursor, name)
+
+
+class PreparedStatementConnection:
+    """Connection wrapper whose cursors reuse server-side prepared statements"""
+
+    def __init__(self, connection, cache_size=DEFAULT_STATEMENT_CACHE_SIZE):
+        self.connection = connection
+        self._cache = get_statement_cache(connection, cache_size)
+
+    def cursor(self, dictionary=False, **kwargs):
+        if kwargs:
+            return self.connection.cursor(dictionary=dictionary, **kwargs)
+        return PreparedCursor(self.connection, self._cache, dictionary)
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
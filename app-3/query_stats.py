@@ -0,0 +1,234 @@
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from flask import g, has_request_context, request
+
+# Statements slower than this are written to the slow-query log
+DEFAULT_SLOW_QUERY_MS = 200.0
+
+# Upper bounds (ms) of the latency histogram buckets; slower calls land in the overflow bucket
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# One JSON object per line; goes to SLOW_QUERY_LOG when set, stderr otherwise
+slow_query_logger = logging.getLogger('slow_queries')
+if os.getenv('SLOW_QUERY_LOG') and not slow_query_logger.handlers:
+    _handler = logging.FileHandler(os.getenv('SLOW_QUERY_LOG'))
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    slow_query_logger.addHandler(_handler)
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """Normalize a statement so calls that differ only in their values group together"""
+    sql = ' '.join(sql.split())
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    return _PLACEHOLDER_LIST.sub('(?+)', sql)
+
+
+def current_route():
+    """Get the route of the Flask request issuing a query, or None outside a request"""
+    if not has_request_context():
+        return None
+    rule = request.url_rule.rule if request.url_rule else request.path
+    return f"{request.method} {rule}"
+
+
+class QueryStats:
+    """Per-fingerprint latency histograms, row counts and calling routes"""
+
+    def __init__(self, slow_query_ms=None):
+        if slow_query_ms is None:
+            slow_query_ms = float(os.getenv('SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS))
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def record(self, sql, elapsed_ms, rows, error=None):
+        """Record one statement execution and log it if it was slow or failed"""
+        key = fingerprint(sql)
+        route = current_route()
+        per_request = self._count_in_request(key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    'calls': 0, 'errors': 0, 'slow_calls': 0, 'rows': 0,
+                    'total_ms': 0.0, 'max_ms': 0.0,
+                    'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                    'routes': {}, 'max_calls_per_request': 0,
+                }
+            entry['calls'] += 1
+            entry['rows'] += rows
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['buckets'][self._bucket(elapsed_ms)] += 1
+            if route:
+                entry['routes'][route] = entry['routes'].get(route, 0) + 1
+            entry['max_calls_per_request'] = max(entry['max_calls_per_request'], per_request)
+            if error is not None:
+                entry['errors'] += 1
+            slow = elapsed_ms >= self.slow_query_ms
+            if slow:
+                entry['slow_calls'] += 1
+
+        if slow or error is not None:
+            slow_query_logger.log(logging.ERROR if error is not None else logging.WARNING, json.dumps({
+                'event': 'query_error' if error is not None else 'slow_query',
+                'fingerprint': key,
+                'elapsed_ms': round(elapsed_ms, 3),
+                'rows': rows,
+                'route': route,
+                'threshold_ms': self.slow_query_ms,
+                'error': error,
+            }))
+
+    def snapshot(self, limit=None):
+        """Get per-fingerprint stats, most total time first"""
+        with self._lock:
+            entries = [(key, dict(entry, buckets=list(entry['buckets']), routes=dict(entry['routes'])))
+                       for key, entry in self._entries.items()]
+
+        # le_ms None is the overflow bucket; a list keeps the buckets ordered in JSON
+        bounds = list(LATENCY_BUCKETS_MS) + [None]
+        queries = []
+        for key, entry in sorted(entries, key=lambda item: item[1]['total_ms'], reverse=True)[:limit]:
+            queries.append({
+                'fingerprint': key,
+                'calls': entry['calls'],
+                'errors': entry['errors'],
+                'slow_calls': entry['slow_calls'],
+                'rows': entry['rows'],
+                'total_ms': round(entry['total_ms'], 3),
+                'avg_ms': round(entry['total_ms'] / entry['calls'], 3),
+                'max_ms': round(entry['max_ms'], 3),
+                'max_calls_per_request': entry['max_calls_per_request'],
+                'histogram': [{'le_ms': bound, 'count': count} for bound, count in zip(bounds, entry['buckets'])],
+                'routes': entry['routes'],
+            })
+        return {'slow_query_ms': self.slow_query_ms, 'queries': queries}
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _bucket(elapsed_ms):
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                return index
+        return len(LATENCY_BUCKETS_MS)
+
+    @staticmethod
+    def _count_in_request(key):
+        # The same fingerprint many times in one request is the N+1 signature
+        if not has_request_context():
+            return 1
+        counts = g.setdefault('_query_counts', {})
+        counts[key] = counts.get(key, 0) + 1
+        return counts[key]
+
+
+class InstrumentedCursor:
+    """Cursor wrapper that times each statement including fetching its rows"""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._sql = None
+        self._elapsed = 0.0
+        self._rows = None
+
+    def _begin(self, sql):
+        self._finish()
+        self._sql = sql
+        self._elapsed = 0.0
+        self._rows = None
+
+    def _finish(self, error=None):
+        if self._sql is None:
+            return
+        rows = self._rows
+        if rows is None:
+            rows = max(self._cursor.rowcount or 0, 0) if error is None else 0
+        self._stats.record(self._sql, self._elapsed * 1000, rows, error)
+        self._sql = None
+
+    def _timed(self, method, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self._elapsed += time.perf_counter() - started
+
+    def _execute(self, method, sql, args, kwargs):
+        self._begin(sql)
+        try:
+            return self._timed(method, sql, *args, **kwargs)
+        except Exception as e:
+            self._finish(error=str(e))
+            raise
+
+    def execute(self, sql, *args, **kwargs):
+        return self._execute(self._cursor.execute, sql, args, kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._execute(self._cursor.executemany, sql, args, kwargs)
+
+    def _fetched(self, count):
+        if self._sql is not None:
+            self._rows = (self._rows or 0) + count
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        self._fetched(0 if row is None else 1)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._timed(self._cursor.fetchmany, *args, **kwargs)
+        self._fetched(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._fetched(len(rows))
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Connection wrapper whose cursors report to a QueryStats"""
+
+    def __init__(self, connection, stats):
+        self.connection = connection
+        self._stats = stats
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self.connection.cursor(*args, **kwargs), self._stats)
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
@@ -0,0 +1,224 @@
+import copy
+import functools
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_TTL = 300
+DEFAULT_CACHE_SIZE = 1024
+# Inside the app's instance directory, never a shared location like /tmp: entries are unpickled on read
+DEFAULT_SQLITE_CACHE_PATH = os.path.join('instance', 'helper_cache.db')
+
+# Returned by backends on a miss, so None and other falsy values can never be confused with one
+MISS = object()
+
+
+class LRUCache:
+    """In-process cache with least-recently-used eviction and per-entry expiry"""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return MISS
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISS
+            self._entries.move_to_end(key)
+        # Callers may modify the rows they get back, so never hand out the cached object
+        return copy.deepcopy(value)
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def open_private_file(path):
+    """Create path (and its directory, mode 0700) if needed, refusing anything another user could write.
+
+    Cache entries are unpickled, so a file or SQLite journal planted by another
+    local account would run code in the app. The directory must belong to this
+    user and not be writable by others, and so must the file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.chmod(directory, 0o700)
+    info = os.stat(directory)
+    if hasattr(os, 'getuid') and (info.st_uid != os.getuid() or info.st_mode & 0o022):
+        raise PermissionError(f"Cache directory {directory} must be owned by this user and not writable by others")
+    fd = os.open(path, os.O_CREAT | os.O_RDWR | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+    try:
+        info = os.fstat(fd)
+        if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+            raise PermissionError(f"Cache file {path} is owned by another user")
+        # Cached rows include user records, keep the file private to this account
+        if info.st_mode & 0o077:
+            os.fchmod(fd, 0o600)
+    finally:
+        os.close(fd)
+
+
+class SQLiteCache:
+    """Key-value cache in a local SQLite file, shared by every worker process on the host"""
+
+    def __init__(self, path=None, max_entries=DEFAULT_CACHE_SIZE):
+        self.path = path or DEFAULT_SQLITE_CACHE_PATH
+        self.max_entries = max_entries
+        self._local = threading.local()
+        open_private_file(self.path)
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        connection = self._connect()
+        row = connection.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None:
+            return MISS
+        if row[1] <= now:
+            connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+            return MISS
+        connection.execute("UPDATE cache SET used_at = ? WHERE key = ?", (now, key))
+        return pickle.loads(row[0])
+
+    def set(self, key, value, ttl):
+        connection = self._connect()
+        now = time.time()
+        connection.execute("INSERT OR REPLACE INTO cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                           (key, pickle.dumps(value), now + ttl, now))
+        connection.execute("""
+            DELETE FROM cache WHERE key IN (
+                SELECT key FROM cache ORDER BY used_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def delete_prefix(self, prefix):
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        self._connect().execute("DELETE FROM cache WHERE key LIKE ? ESCAPE '\\'", (escaped + '%',))
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache")
+
+
+class ReadThroughCache:
+    """Namespaced read-through cache with hit/miss counters"""
+
+    def __init__(self, backend, ttl=DEFAULT_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def _count(self, namespace, counter):
+        with self._lock:
+            counters = self._counters.setdefault(namespace, {'hits': 0, 'misses': 0, 'invalidations': 0})
+            counters[counter] += 1
+
+    def get_or_load(self, namespace, key, load, ttl=None):
+        """Return the cached value for key, calling load() and caching its result on a miss"""
+        full_key = f"{namespace}:{key}"
+        value = self.backend.get(full_key)
+        if value is not MISS:
+            self._count(namespace, 'hits')
+            return value
+
+        self._count(namespace, 'misses')
+        value = load()
+        # Helper reads return None / [] on errors too, so only real results are cached
+        if value:
+            self.backend.set(full_key, value, self.ttl if ttl is None else ttl)
+        return value
+
+    def invalidate(self, namespace):
+        """Drop every cached entry in a namespace"""
+        self.backend.delete_prefix(f"{namespace}:")
+        self._count(namespace, 'invalidations')
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """Get hit/miss/invalidation counters per namespace"""
+        with self._lock:
+            namespaces = {namespace: dict(counters) for namespace, counters in self._counters.items()}
+        for counters in namespaces.values():
+            lookups = counters['hits'] + counters['misses']
+            counters['hit_ratio'] = round(counters['hits'] / lookups, 3) if lookups else 0.0
+        return {'backend': type(self.backend).__name__, 'ttl': self.ttl, 'namespaces': namespaces}
+
+
+def create_cache():
+    """Build the cache configured by HELPER_CACHE_BACKEND (memory, sqlite or none)"""
+    backend = os.getenv('HELPER_CACHE_BACKEND', 'memory').lower()
+    ttl = float(os.getenv('HELPER_CACHE_TTL', DEFAULT_CACHE_TTL))
+    size = int(os.getenv('HELPER_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+    if backend == 'none':
+        return None
+    if backend == 'sqlite':
+        return ReadThroughCache(SQLiteCache(os.getenv('HELPER_CACHE_PATH'), size), ttl)
+    return ReadThroughCache(LRUCache(size), ttl)
+
+
+def cached(namespace, ttl=None):
+    """Serve a DatabaseHelper read from self.cache, keyed by its arguments"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.cache is None:
+                return method(self, *args, **kwargs)
+            key = repr((args, sorted(kwargs.items())))
+            return self.cache.get_or_load(namespace, key, lambda: method(self, *args, **kwargs), ttl)
+        return wrapper
+    return decorator
+
+
+def invalidates(*namespaces):
+    """Drop the given cache namespaces after a DatabaseHelper write"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                if self.cache is not None:
+                    for namespace in namespaces:
+                        self.cache.invalidate(namespace)
+        return wrapper
+    return decorator
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+SQLite stand-in for the MySQL connection pool, used by the DatabaseHelper tests
+"""
+
+import re
+import sqlite3
+from datetime import datetime
+
+from mysql.connector import Error
+
+# Store and return TIMESTAMP columns as datetimes, like mysql.connector does
+sqlite3.register_adapter(datetime, lambda value: value.strftime('%Y-%m-%d %H:%M:%S'))
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+
+
+class StandInCursor:
+    """Translates mysql.connector style calls (%s placeholders, dictionary rows) to sqlite3"""
+
+    def __init__(self, connection, dictionary=False):
+        self._cursor = connection.cursor()
+        self.dictionary = dictionary
+
+    def execute(self, sql, params=()):
+        try:
+            self._cursor.execute(sql.replace('%s', '?'), tuple(params or ()))
+        except sqlite3.Error as e:
+            raise Error(msg=str(e))
+
+    def executemany(self, sql, seq_params):
+        try:
+            self._cursor.executemany(sql.replace('%s', '?'), [tuple(p) for p in seq_params])
+        except sqlite3.Error as e:
+            raise Error(msg=str(e))
+
+    def _convert(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._convert(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._convert(row) for row in self._cursor.fetchall()]
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class StandInConnection:
+    def __init__(self, path=':memory:'):
+        self._connection = sqlite3.connect(path, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        self._connection.create_function('NOW', 0, lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    def cursor(self, dictionary=False, **kwargs):
+        return StandInCursor(self._connection, dictionary)
+
+    def executescript(self, script):
+        self._connection.executescript(script)
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def start_transaction(self):
+        self._connection.commit()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._connection.close()
+
+
+class StandInPool:
+    """Hands out a single shared SQLite connection"""
+
+    size = 1
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def acquire(self, timeout=None):
+        return self.connection
+
+    def release(self, connection):
+        pass
+
+    def stats(self):
+        return {"size": self.size}
+
+
+def sqlite_ddl(sql):
+    """Rewrite the MySQL-only column syntax create_tables() uses into SQLite"""
+    sql = sql.replace('INT AUTO_INCREMENT PRIMARY KEY', 'INTEGER PRIMARY KEY AUTOINCREMENT')
+    sql = sql.replace(' ON UPDATE CURRENT_TIMESTAMP', '')
+    return re.sub(r"ENUM\([^)]*\)", 'TEXT', sql)
+
+
+class SchemaCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(sqlite_ddl(sql), params)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SchemaConnection:
+    """Passes database_config.create_tables() statements to a stand-in connection"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self):
+        return SchemaCursor(self._connection.cursor())
+
+    def commit(self):
+        self._connection.commit()
+
+
+def create_schema(connection):
+    """Create the application's tables on a stand-in connection, as create_tables() does on MySQL"""
+    from database_config import create_tables
+    return create_tables(SchemaConnection(connection))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test the async data access layer against a SQLite stand-in for MySQL
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+
+from async_database_helper import AsyncDatabaseHelper
+
+
+class StandInPool:
+    size = 4
+
+
+class SQLiteStandInHelper:
+    """Mimics the DatabaseHelper surface with one SQLite connection per thread"""
+
+    def __init__(self, path):
+        self.path = path
+        self.pool = StandInPool()
+        self._local = threading.local()
+        self.released = 0
+        # Set by the concurrency test: each query waits here until the other one is running too
+        self.meeting_point = None
+
+    def get_connection(self):
+        if getattr(self._local, 'connection', None) is None:
+            self._local.connection = sqlite3.connect(self.path)
+            self._local.connection.row_factory = sqlite3.Row
+        return self._local.connection
+
+    def release_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+            self.released += 1
+
+    def create_notification(self, user_email, message, notification_type='info'):
+        connection = self.get_connection()
+        cursor = connection.execute(
+            "INSERT INTO notifications (user_email, message, type) VALUES (?, ?, ?)",
+            (user_email, message, notification_type))
+        connection.commit()
+        return cursor.lastrowid
+
+    def wait_for_other_query(self):
+        if self.meeting_point is not None:
+            # Raises BrokenBarrierError if the two queries run one after the other
+            self.meeting_point.wait(timeout=5)
+
+    def get_all_tickets(self):
+        self.wait_for_other_query()
+        rows = self.get_connection().execute("SELECT * FROM tickets ORDER BY id DESC").fetchall()
+        return [dict(row) for row in rows]
+
+    def get_notifications_by_user(self, user_email):
+        self.wait_for_other_query()
+        rows = self.get_connection().execute(
+            "SELECT * FROM notifications WHERE user_email = ? ORDER BY id DESC", (user_email,)).fetchall()
+        return [dict(row) for row in rows]
+
+
+def make_helper():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE tickets (id INTEGER PRIMARY KEY, title TEXT, status TEXT)")
+    connection.execute("CREATE TABLE notifications (id INTEGER PRIMARY KEY, user_email TEXT, message TEXT, type TEXT)")
+    connection.execute("INSERT INTO tickets (title, status) VALUES ('VPN down', 'open')")
+    connection.commit()
+    connection.close()
+    return SQLiteStandInHelper(path)
+
+
+def test_same_method_surface():
+    """Test that helper methods are awaitable with the same arguments and results"""
+    print("\n🔍 Testing async method surface...")
+    helper = make_helper()
+    async_helper = AsyncDatabaseHelper(helper)
+
+    async def scenario():
+        notification_id = await async_helper.create_notification('jane@example.com', 'Hello', 'info')
+        notifications = await async_helper.get_notifications_by_user('jane@example.com')
+        return notification_id, notifications
+
+    notification_id, notifications = asyncio.run(scenario())
+    async_helper.shutdown()
+
+    assert notification_id == 1
+    assert notifications[0]['message'] == 'Hello'
+    assert helper.released == 2
+    print("✅ Async methods return the same results as the sync helper")
+
+
+def test_independent_queries_run_concurrently():
+    """Test that gathered queries overlap instead of running serially"""
+    print("\n🔍 Testing concurrent gather...")
+    helper = make_helper()
+    helper.meeting_point = threading.Barrier(2)
+    async_helper = AsyncDatabaseHelper(helper)
+
+    tickets, notifications = asyncio.run(async_helper.gather(
+        ('get_all_tickets',),
+        ('get_notifications_by_user', 'jane@example.com')
+    ))
+    async_helper.shutdown()
+
+    # Each query only returns once the other one has started, so they ran at the same time
+    assert tickets[0]['title'] == 'VPN down'
+    assert notifications == []
+    assert not helper.meeting_point.broken
+    print("✅ Both queries were in flight at once")
+
+
+if __name__ == "__main__":
+    test_same_method_surface()
+    test_independent_queries_run_concurrently()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test set-based bulk actions for tickets and service requests against the SQLite stand-in
+"""
+
+from database_helper import DatabaseHelper
+from sqlite_stand_in import StandInConnection, StandInPool, create_schema
+from test_point_lookups import make_helper
+
+
+def test_bulk_ticket_actions():
+    """Test that bulk ticket updates and deletes touch exactly the selected rows"""
+    print("\n🔍 Testing bulk ticket actions...")
+    helper = make_helper()
+    ids = [helper.create_ticket(f"Ticket {i}", "", "low", "jane@example.com") for i in range(5)]
+
+    assert helper.bulk_update_ticket_status([str(i) for i in ids[:3]], "resolved") == 3
+    assert helper.get_status_counts("tickets") == {"resolved": 3, "open": 2}
+
+    assert helper.bulk_delete_tickets([ids[0], ids[0], ids[4]]) == 2
+    assert helper.get_ticket_by_id(ids[0]) is None
+    assert helper.bulk_update_ticket_status([], "closed") == 0
+    print("✅ Bulk ticket actions work")
+
+
+def test_bulk_service_request_actions_are_chunked():
+    """Test that selections larger than one IN list are applied in chunks"""
+    print("\n🔍 Testing chunked bulk service request actions...")
+    helper = make_helper()
+    helper.BULK_CHUNK_SIZE = 4
+    ids = [helper.create_service_request("john@example.com", "IT", f"Request {i}", "Details") for i in range(10)]
+
+    assert helper.bulk_assign_service_requests(ids, "it@example.com") == 10
+    assert helper.get_status_counts("service_requests") == {"assigned": 10}
+    assert helper.bulk_delete_service_requests(ids[:9]) == 9
+    assert helper.get_status_counts("service_requests") == {"assigned": 1}
+    print("✅ Chunked bulk actions work")
+
+
+def test_bulk_assign_tickets_on_the_real_schema():
+    """Test the bulk assign action against the tables create_tables() builds"""
+    print("\n🔍 Testing bulk ticket assignment on the application schema...")
+    connection = StandInConnection()
+    assert create_schema(connection)
+    helper = DatabaseHelper(pool=StandInPool(connection), prepared_statements=False)
+    ids = [helper.create_ticket(f"Ticket {i}", "", "low", "jane@example.com") for i in range(3)]
+
+    assert helper.bulk_assign_tickets([str(i) for i in ids[:2]], "it@example.com") == 2
+    assert [helper.get_ticket_by_id(i)["assigned_to"] for i in ids] == ["it@example.com", "it@example.com", None]
+    print("✅ Bulk ticket assignment works")
+
+
+def test_failed_bulk_action_is_not_reported_as_zero_rows():
+    """Test that a failing bulk statement returns None instead of a count"""
+    print("\n🔍 Testing a failing bulk action...")
+    connection = StandInConnection()
+    connection.executescript("CREATE TABLE tickets (id INTEGER PRIMARY KEY, title TEXT);")
+    connection.executescript("INSERT INTO tickets (title) VALUES ('VPN down');")
+    helper = DatabaseHelper(pool=StandInPool(connection), prepared_statements=False)
+
+    assert helper.bulk_assign_tickets([1], "it@example.com") is None
+    print("✅ Failures are reported")
+
+
+if __name__ == "__main__":
+    test_bulk_ticket_actions()
+    test_bulk_service_request_actions_are_chunked()
+    test_bulk_assign_tickets_on_the_real_schema()
+    test_failed_bulk_action_is_not_reported_as_zero_rows()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the grouped admin dashboard counters against the SQLite stand-in
+"""
+
+import asyncio
+
+from async_database_helper import AsyncDatabaseHelper
+from database_helper import DatabaseHelper
+from sqlite_stand_in import StandInConnection, StandInPool
+
+
+def make_helper():
+    connection = StandInConnection()
+    connection.executescript("""
+        CREATE TABLE tickets (id INTEGER PRIMARY KEY, title TEXT, status TEXT, created_at TIMESTAMP);
+        CREATE TABLE feedback (id INTEGER PRIMARY KEY, subject TEXT, status TEXT, submitted_at TIMESTAMP);
+        CREATE TABLE timeoff_requests (id INTEGER PRIMARY KEY, employee_name TEXT, start_date TEXT,
+                                       end_date TEXT, status TEXT, submitted_at TIMESTAMP);
+        CREATE TABLE leave_requests (id INTEGER PRIMARY KEY, employee_name TEXT, leave_type TEXT, start_date TEXT,
+                                     end_date TEXT, status TEXT, submitted_at TIMESTAMP);
+        CREATE TABLE timesheets (id INTEGER PRIMARY KEY, employee_email TEXT, date TEXT, status TEXT);
+        CREATE TABLE job_applications (id INTEGER PRIMARY KEY, name TEXT, status TEXT);
+        CREATE TABLE employees (id INTEGER PRIMARY KEY, email TEXT);
+
+        INSERT INTO tickets VALUES
+            (1, 'oldest', 'open', '2025-01-01 09:00:00'),
+            (2, 'printer', 'resolved', '2025-01-02 09:00:00'),
+            (3, 'vpn', 'open', '2025-01-03 09:00:00'),
+            (4, 'newest', 'open', '2025-01-04 09:00:00');
+        INSERT INTO feedback VALUES (1, 'canteen', 'pending', '2025-01-01 09:00:00'),
+                                    (2, 'parking', 'reviewed', '2025-01-05 09:00:00');
+        INSERT INTO timeoff_requests VALUES (1, 'Ann', '2025-02-01', '2025-02-02', 'pending', '2025-01-01 09:00:00'),
+                                            (2, 'Bob', '2025-02-03', '2025-02-04', 'approved', '2025-01-06 09:00:00');
+        INSERT INTO leave_requests VALUES (1, 'Cid', 'sick', '2025-02-05', '2025-02-06', 'pending', '2025-01-04 09:00:00'),
+                                          (2, 'Dee', 'annual', '2025-02-07', '2025-02-08', 'pending', '2025-01-02 09:00:00');
+        INSERT INTO timesheets VALUES (1, 'ann@example.com', '2025-01-01', 'pending'),
+                                      (2, 'bob@example.com', '2025-01-08', 'approved');
+        INSERT INTO job_applications VALUES (1, 'Eve', 'pending'), (2, 'Fay', 'pending'), (3, 'Gus', 'rejected');
+        INSERT INTO employees VALUES (1, 'ann@example.com'), (2, 'bob@example.com'), (3, 'cid@example.com');
+    """)
+    return DatabaseHelper(pool=StandInPool(connection))
+
+
+def test_counts_by_status_and_totals():
+    """Test that every dashboard counter comes from the grouped counts"""
+    print("\n🔍 Testing dashboard counts...")
+    stats = make_helper().get_dashboard_stats()
+
+    assert stats["status_counts"]["tickets"] == {"open": 3, "resolved": 1}
+    assert stats["status_counts"]["leave_requests"] == {"pending": 2}
+    assert stats["status_counts"]["job_applications"] == {"pending": 2, "rejected": 1}
+    assert stats["totals"] == {"tickets": 4, "feedback": 2, "timeoff_requests": 2, "leave_requests": 2,
+                               "timesheets": 2, "job_applications": 3, "employees": 3}
+    print("✅ Dashboard counts match")
+
+
+def test_recent_lists_are_newest_first():
+    """Test that recent items are the newest rows, newest first, across both request tables"""
+    print("\n🔍 Testing dashboard recent items...")
+    stats = make_helper().get_dashboard_stats(recent_limit=3)
+
+    assert [t["title"] for t in stats["recent_tickets"]] == ["newest", "vpn", "printer"]
+    assert [r["employee_name"] for r in stats["recent_requests"]] == ["Bob", "Cid", "Dee"]
+    assert stats["recent_requests"][0]["leave_type"] is None
+    assert [t["employee_email"] for t in stats["recent_timesheets"]] == ["bob@example.com", "ann@example.com"]
+    assert [f["subject"] for f in stats["recent_feedback"]] == ["parking", "canteen"]
+    print("✅ Recent items are newest first")
+
+
+def test_counts_and_recent_items_load_concurrently():
+    """Test the admin dashboard's gathered calls return the same data as the synchronous helper"""
+    helper = make_helper()
+    async_helper = AsyncDatabaseHelper(helper, max_workers=2)
+    try:
+        counts, recent = asyncio.run(async_helper.gather(('get_dashboard_counts',), ('get_dashboard_recent', 3)))
+    finally:
+        async_helper.shutdown()
+
+    assert dict(counts, **recent) == helper.get_dashboard_stats(recent_limit=3)
+
+
+if __name__ == "__main__":
+    test_counts_by_status_and_totals()
+    test_recent_lists_are_newest_first()
+    test_counts_and_recent_items_load_concurrently()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test that a DatabaseHelper created before a fork borrows from the child's own pool
+"""
+
+import os
+
+import database_helper
+from database_helper import DatabaseHelper
+from sqlite_stand_in import StandInConnection
+
+
+class RecordingPool:
+    """Stand-in pool that remembers what was borrowed and returned"""
+
+    size = 1
+
+    def __init__(self):
+        self.connection = StandInConnection()
+        self.acquired = 0
+        self.released = []
+
+    def acquire(self, timeout=None):
+        self.acquired += 1
+        return self.connection
+
+    def release(self, connection):
+        self.released.append(connection)
+
+    def stats(self):
+        return {"size": self.size}
+
+
+def forked(pool):
+    """Make the helper module see a new pid and a new process-wide pool, as a forked worker does"""
+    parent_pid = os.getpid()
+    database_helper.get_connection_pool = lambda: pool
+    database_helper.os.getpid = lambda: parent_pid + 1
+
+
+def restore():
+    database_helper.get_connection_pool = ORIGINAL_GET_POOL
+    database_helper.os.getpid = ORIGINAL_GETPID
+
+
+ORIGINAL_GET_POOL = database_helper.get_connection_pool
+ORIGINAL_GETPID = os.getpid
+
+
+def test_forked_worker_uses_its_own_pool():
+    """Test that the parent's checked-out connection is neither reused nor returned in the child"""
+    print("\n🔍 Testing helper after a fork...")
+    parent_pool, child_pool = RecordingPool(), RecordingPool()
+    database_helper.get_connection_pool = lambda: parent_pool
+    try:
+        helper = DatabaseHelper(prepared_statements=False)
+        helper.get_connection()
+        forked(child_pool)
+        helper.get_connection()
+        helper.release_connection()
+    finally:
+        restore()
+
+    assert parent_pool.acquired == 1 and parent_pool.released == []
+    assert child_pool.acquired == 1 and child_pool.released == [child_pool.connection]
+    print("✅ The child borrows from and returns to its own pool")
+
+
+def test_parent_connection_is_not_returned_from_the_child():
+    """Test that releasing in the child drops a connection the parent checked out"""
+    print("\n🔍 Testing release after a fork...")
+    parent_pool = RecordingPool()
+    database_helper.get_connection_pool = lambda: parent_pool
+    try:
+        helper = DatabaseHelper(prepared_statements=False)
+        helper.get_connection()
+        forked(RecordingPool())
+        helper.release_connection()
+    finally:
+        restore()
+
+    assert parent_pool.released == []
+    print("✅ The parent's connection stays with the parent")
+
+
+if __name__ == "__main__":
+    test_forked_worker_uses_its_own_pool()
+    test_parent_connection_is_not_returned_from_the_child()
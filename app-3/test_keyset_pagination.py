@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test keyset pagination in DatabaseHelper against the SQLite stand-in
+"""
+
+from database_helper import DatabaseHelper, Page, decode_cursor, encode_cursor
+from sqlite_stand_in import StandInConnection, StandInPool
+
+
+def make_helper(ticket_count):
+    connection = StandInConnection()
+    connection.executescript("""
+        CREATE TABLE tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT, description TEXT, priority TEXT,
+            status TEXT DEFAULT 'open', user_email TEXT, created_at TIMESTAMP
+        );
+    """)
+    cursor = connection.cursor()
+    for i in range(ticket_count):
+        # Pairs of tickets share a timestamp so the id tie-breaker is exercised
+        cursor.execute(
+            "INSERT INTO tickets (title, description, user_email, status, created_at) VALUES (%s, %s, %s, %s, %s)",
+            (f"Ticket {i}", "Details", 'jane@example.com' if i % 2 else 'john@example.com',
+             'open' if i % 3 else 'closed', f"2024-01-{i // 2 + 1:02d} 09:00:00"))
+    connection.commit()
+    return DatabaseHelper(pool=StandInPool(connection))
+
+
+def test_cursor_round_trip():
+    """Test that cursors decode to the encoded position and garbage is ignored"""
+    print("\n🔍 Testing cursor encoding...")
+    assert decode_cursor(encode_cursor('2024-01-30 09:00:00', 42)) == ('2024-01-30 09:00:00', 42)
+    assert decode_cursor('not-a-cursor') is None
+    print("✅ Cursor encoding works")
+
+
+def test_pages_cover_every_row_once():
+    """Test that walking all pages returns each row exactly once in order"""
+    print("\n🔍 Testing keyset page walk...")
+    helper = make_helper(23)
+    unpaginated = helper.get_all_tickets()
+
+    seen, page_cursor = [], None
+    while True:
+        page = helper.get_all_tickets(page_size=5, page_cursor=page_cursor)
+        assert isinstance(page, Page)
+        assert len(page) <= 5
+        seen.extend(row['id'] for row in page)
+        page_cursor = page.next_cursor
+        if not page_cursor:
+            break
+
+    assert len(seen) == len(set(seen)) == 23
+    assert [row['created_at'] for row in unpaginated] == sorted((row['created_at'] for row in unpaginated), reverse=True)
+    print(f"✅ Walked 23 tickets in {(23 + 4) // 5} pages")
+
+
+def test_filtered_listing_paginates():
+    """Test that per-user listings combine their filter with the keyset"""
+    print("\n🔍 Testing filtered pagination...")
+    helper = make_helper(10)
+    first = helper.get_tickets_by_user('jane@example.com', page_size=3)
+    second = helper.get_tickets_by_user('jane@example.com', page_size=3, page_cursor=first.next_cursor)
+
+    assert len(first) == 3 and len(second) == 2
+    assert second.next_cursor is None
+    assert all(row['user_email'] == 'jane@example.com' for row in first + second)
+    print("✅ Filtered pagination works")
+
+
+def test_status_counts():
+    """Test grouped status counts used by the list page statistics"""
+    print("\n🔍 Testing status counts...")
+    helper = make_helper(9)
+    assert helper.get_status_counts('tickets') == {'open': 6, 'closed': 3}
+    print("✅ Status counts match")
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    test_pages_cover_every_row_once()
+    test_filtered_listing_paginates()
+    test_status_counts()
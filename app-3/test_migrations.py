@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test the versioned schema migrations against a SQLite stand-in for MySQL
+"""
+
+import migrations
+from migrations import AddColumn, AddIndex, Migration
+from sqlite_stand_in import StandInConnection, create_schema
+
+
+def sqlite_table_columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def sqlite_index_exists(cursor, table, name):
+    cursor.execute(f"PRAGMA index_list({table})")
+    return any(row[1] == name for row in cursor.fetchall())
+
+
+# information_schema is MySQL-only, answer the same questions from SQLite pragmas
+migrations.table_columns = sqlite_table_columns
+migrations.index_exists = sqlite_index_exists
+
+
+def make_connection():
+    connection = StandInConnection()
+    connection.executescript("""
+        CREATE TABLE tickets (id INTEGER PRIMARY KEY, user_email TEXT, status TEXT, created_at TIMESTAMP);
+        CREATE TABLE timesheets (id INTEGER PRIMARY KEY, user_id TEXT, date TEXT, status TEXT);
+    """)
+    return connection
+
+
+def index_names(connection, table):
+    cursor = connection.cursor()
+    cursor.execute(f"PRAGMA index_list({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def test_migrate_creates_indexes_and_records_versions():
+    """Test that pending migrations create their indexes and are recorded once"""
+    print("\n🔍 Testing migrate...")
+    connection = make_connection()
+
+    assert migrations.migrate(connection)
+
+    assert {'idx_tickets_user_created', 'idx_tickets_created', 'idx_tickets_status'} <= index_names(connection, 'tickets')
+    # Live timesheets rows are keyed by user_id, the employee_id variant is skipped
+    assert 'idx_timesheets_user_date' in index_names(connection, 'timesheets')
+    assert 'idx_timesheets_employee_date' not in index_names(connection, 'timesheets')
+    status = migrations.get_migration_status(connection)
+    assert [version for version, _, applied_at in status if applied_at] == [1, 2, 3, 4]
+    assert 'assigned_to' in sqlite_table_columns(connection.cursor(), 'tickets')
+    print("✅ Indexes and columns created and versions 1-4 recorded")
+
+
+def test_migrate_is_idempotent():
+    """Test that a second run applies nothing and an existing index is left alone"""
+    print("\n🔍 Testing repeated migrate...")
+    connection = make_connection()
+    connection.executescript("CREATE INDEX idx_tickets_created ON tickets (created_at);")
+
+    assert migrations.migrate(connection)
+    assert migrations.migrate(connection)
+
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM schema_migrations")
+    assert cursor.fetchone()[0] == len(migrations.MIGRATIONS)
+    print("✅ Rerunning migrations is a no-op")
+
+
+def test_target_and_failed_migration():
+    """Test that target stops early and a failing migration is not recorded"""
+    print("\n🔍 Testing target version and failures...")
+    connection = make_connection()
+    steps = [
+        Migration(1, 'Index tickets', [AddIndex('tickets', 'idx_a', ['user_email'])]),
+        Migration(2, 'Broken', ["CREATE INDEX idx_b ON no_such_table (id)"]),
+    ]
+
+    assert migrations.migrate(connection, target=1, migrations=steps)
+    assert [applied_at is not None for _, _, applied_at in
+            migrations.get_migration_status(connection, migrations=steps)] == [True, False]
+
+    assert not migrations.migrate(connection, migrations=steps)
+    assert [applied_at is not None for _, _, applied_at in
+            migrations.get_migration_status(connection, migrations=steps)] == [True, False]
+    print("✅ Target respected and failed migration left pending")
+
+
+def test_skipped_index_is_retried_once_the_column_exists():
+    """Test that an index skipped for a missing column is recorded and created by a later run"""
+    print("\n🔍 Testing skipped index retry...")
+    connection = make_connection()
+
+    assert migrations.migrate(connection)
+    assert 'idx_timesheets_employee_date' not in index_names(connection, 'timesheets')
+    skipped = {step for _, step, _ in migrations.get_skipped_step_status(connection)}
+    assert {'idx_timesheets_employee_date', 'idx_notifications_user_created'} <= skipped
+
+    connection.executescript("ALTER TABLE timesheets ADD COLUMN employee_id INTEGER;")
+    assert migrations.migrate(connection)
+
+    assert 'idx_timesheets_employee_date' in index_names(connection, 'timesheets')
+    skipped = {step for _, step, _ in migrations.get_skipped_step_status(connection)}
+    assert 'idx_timesheets_employee_date' not in skipped
+    assert 'idx_notifications_user_created' in skipped
+    print("✅ Skipped index created on retry")
+
+
+def test_added_column_is_left_alone_when_it_exists():
+    """Test that AddColumn is a no-op on a schema created with the column"""
+    print("\n🔍 Testing AddColumn on the application schema...")
+    connection = StandInConnection()
+    assert create_schema(connection)
+    steps = [Migration(1, 'Ticket assignee', [AddColumn('tickets', 'assigned_to', 'VARCHAR(255)')]),
+             Migration(2, 'Missing table', [AddColumn('no_such_table', 'assigned_to', 'VARCHAR(255)')])]
+
+    assert migrations.migrate(connection, migrations=steps)
+    assert [step for _, step, _ in migrations.get_skipped_step_status(connection)] == ['assigned_to']
+    print("✅ Existing column kept and missing table recorded as skipped")
+
+
+if __name__ == "__main__":
+    test_migrate_creates_indexes_and_records_versions()
+    test_migrate_is_idempotent()
+    test_target_and_failed_migration()
+    test_skipped_index_is_retried_once_the_column_exists()
+    test_added_column_is_left_alone_when_it_exists()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test primary-key lookups and update-returning flows against the SQLite stand-in
+"""
+
+from database_helper import DatabaseHelper
+from sqlite_stand_in import StandInConnection, StandInPool
+
+
+def make_helper():
+    connection = StandInConnection()
+    connection.executescript("""
+        CREATE TABLE tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT, description TEXT, priority TEXT,
+            status TEXT DEFAULT 'open', user_email TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE service_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT, request_type TEXT, subject TEXT, description TEXT,
+            priority TEXT DEFAULT 'medium', status TEXT DEFAULT 'pending', assigned_to TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP
+        );
+    """)
+    return DatabaseHelper(pool=StandInPool(connection))
+
+
+def test_ticket_lookup_and_status_update():
+    """Test fetching a ticket by id and getting the updated row back"""
+    print("\n🔍 Testing ticket point lookup...")
+    helper = make_helper()
+    ticket_id = helper.create_ticket("VPN down", "Cannot connect", "high", "jane@example.com")
+
+    assert helper.get_ticket_by_id(ticket_id)["title"] == "VPN down"
+    assert helper.get_ticket_by_id(ticket_id + 1) is None
+
+    updated = helper.update_ticket_status_returning(ticket_id, "resolved")
+    assert updated["status"] == "resolved"
+    assert updated["user_email"] == "jane@example.com"
+    assert helper.update_ticket_status_returning(ticket_id + 1, "resolved") is None
+    print("✅ Ticket lookups work")
+
+
+def test_service_request_update_returning():
+    """Test service request status and assignment flows return the updated row"""
+    print("\n🔍 Testing service request update-returning...")
+    helper = make_helper()
+    request_id = helper.create_service_request("john@example.com", "IT Support", "Laptop", "Broken screen", "high")
+
+    assert helper.get_service_request_by_id(request_id)["subject"] == "Laptop"
+
+    assigned = helper.assign_service_request_returning(request_id, "it@example.com")
+    assert assigned["status"] == "assigned"
+    assert assigned["assigned_to"] == "it@example.com"
+
+    completed = helper.update_service_request_status_returning(request_id, "completed")
+    assert completed["status"] == "completed"
+    assert completed["updated_at"] is not None
+    print("✅ Service request flows work")
+
+
+if __name__ == "__main__":
+    test_ticket_lookup_and_status_update()
+    test_service_request_update_returning()
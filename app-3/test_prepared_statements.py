@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test prepared-statement reuse with a fake connection that mimics mysql.connector
+"""
+
+from mysql.connector import Error
+from mysql.connector.constants import FieldType
+
+import prepared_statements
+from prepared_statements import PreparedStatementConnection
+
+
+class FakeCursor:
+    """Prepares like mysql.connector: only when handed a different string object"""
+
+    def __init__(self, connection, prepared, dictionary):
+        self.connection = connection
+        self.prepared = prepared
+        self.dictionary = dictionary
+        self._executed = None
+        self._rows = []
+        self.description = [('id', FieldType.LONG), ('answers', FieldType.JSON)]
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        if self.connection.unread_result:
+            raise Error(msg="Unread result found")
+        if self.prepared and sql is not self._executed:
+            if self.connection.forget_statements:
+                self.connection.forget_statements = False
+                raise Error(msg="Unknown prepared statement handler", errno=1243)
+            self.connection.prepares += 1
+            self._executed = sql
+        self.connection.executes += 1
+        self._rows = [(1, b'{"q1": "a"}'), (2, b'{"q1": "b"}')]
+        self.connection.unread_result = True
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        self.connection.unread_result = False
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.prepares = 0
+        self.executes = 0
+        self.unread_result = False
+        self.forget_statements = False
+        self.cursors = []
+
+    def cursor(self, prepared=False, dictionary=False):
+        cursor = FakeCursor(self, prepared, dictionary)
+        self.cursors.append(cursor)
+        return cursor
+
+
+def run(connection, sql, params):
+    cursor = PreparedStatementConnection(connection).cursor()
+    cursor.execute(sql, params)
+    row = cursor.fetchone()
+    cursor.close()
+    return row
+
+
+def test_statements_are_prepared_once_per_connection():
+    """Test that equal statement text reuses one prepared statement across calls"""
+    print("\n🔍 Testing prepared statement reuse...")
+    connection = FakeConnection()
+    for email in ("a@example.com", "b@example.com", "c@example.com"):
+        # A fresh string object each call, like an f-string built per request
+        run(connection, "".join(["SELECT * FROM users ", "WHERE email = %s"]), (email,))
+
+    assert connection.prepares == 1
+    assert connection.executes == 3
+    print("✅ One prepare, three executions")
+
+
+def test_leftover_rows_are_drained():
+    """Test that a caller reading only one row does not block the next statement"""
+    print("\n🔍 Testing unread result handling...")
+    connection = FakeConnection()
+    run(connection, "SELECT * FROM tickets WHERE user_email = %s", ("a@example.com",))
+    run(connection, "SELECT * FROM notifications WHERE user_email = %s", ("a@example.com",))
+
+    assert connection.executes == 2
+    assert not connection.unread_result
+    print("✅ Leftover rows are read before the next command")
+
+
+def test_rows_of_another_open_cursor_are_not_discarded():
+    """Test that a statement over another cursor's unread rows fails instead of reading them away"""
+    print("\n🔍 Testing unread rows of another cursor...")
+    connection = FakeConnection()
+    wrapper = PreparedStatementConnection(connection)
+    first, second = wrapper.cursor(), wrapper.cursor()
+    first.execute("SELECT * FROM tickets WHERE user_email = %s", ("a@example.com",))
+
+    try:
+        second.execute("SELECT * FROM notifications WHERE user_email = %s", ("a@example.com",))
+        assert False, "expected an unread result error"
+    except Error as e:
+        assert "Unread result" in str(e)
+    second.close()
+    assert first.fetchall() == [(1, '{"q1": "a"}'), (2, '{"q1": "b"}')]
+    first.close()
+
+    second.execute("SELECT * FROM notifications WHERE user_email = %s", ("a@example.com",))
+    assert second.fetchone() is not None
+    second.close()
+    assert not connection.unread_result
+    print("✅ Another cursor's rows stay readable")
+
+
+def test_unread_rows_are_cleared_when_the_request_ends():
+    """Test that rows of a cursor that was never closed do not reach the next borrower"""
+    print("\n🔍 Testing unread rows at the end of a request...")
+    connection = FakeConnection()
+    abandoned = PreparedStatementConnection(connection).cursor()
+    abandoned.execute("SELECT * FROM tickets WHERE user_email = %s", ("a@example.com",))
+
+    prepared_statements.get_statement_cache(connection).clear_unread()
+
+    assert not connection.unread_result
+    assert run(connection, "SELECT * FROM notifications WHERE user_email = %s", ("a@example.com",)) is not None
+    print("✅ Next borrower starts clean")
+
+
+def test_json_columns_are_returned_as_text():
+    """Test that JSON values from the binary protocol match the text protocol"""
+    print("\n🔍 Testing JSON conversion...")
+    connection = FakeConnection()
+    assert run(connection, "SELECT * FROM skills_assessments WHERE id = %s", (1,)) == (1, '{"q1": "a"}')
+    print("✅ JSON decoded to str")
+
+
+def test_lost_statement_is_prepared_again():
+    """Test that a statement dropped by the server is re-prepared transparently"""
+    print("\n🔍 Testing reconnect recovery...")
+    connection = FakeConnection()
+    run(connection, "SELECT * FROM users WHERE email = %s", ("a@example.com",))
+    connection.forget_statements = True
+    connection.cursors[0]._executed = None
+
+    assert run(connection, "SELECT * FROM users WHERE email = %s", ("a@example.com",)) is not None
+    assert connection.prepares == 2
+    print("✅ Statement re-prepared after the server forgot it")
+
+
+def test_cache_is_bounded():
+    """Test that the least recently used prepared statement is closed past the limit"""
+    print("\n🔍 Testing statement cache bound...")
+    connection = FakeConnection()
+    cache = prepared_statements.get_statement_cache(connection, size=2)
+    for table in ("users", "tickets", "courses"):
+        run(connection, f"SELECT * FROM {table} WHERE id = %s", (1,))
+
+    assert cache.stats() == {'statements': 2, 'hits': 0, 'misses': 3, 'evictions': 1}
+    assert connection.cursors[0].closed
+    print("✅ Oldest statement deallocated")
+
+
+if __name__ == "__main__":
+    test_statements_are_prepared_once_per_connection()
+    test_leftover_rows_are_drained()
+    test_rows_of_another_open_cursor_are_not_discarded()
+    test_unread_rows_are_cleared_when_the_request_ends()
+    test_json_columns_are_returned_as_text()
+    test_lost_statement_is_prepared_again()
+    test_cache_is_bounded()
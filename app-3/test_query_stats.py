@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test query instrumentation and the slow-query log against the SQLite stand-in
+"""
+
+import json
+import logging
+
+from flask import Flask
+
+from database_helper import DatabaseHelper
+from query_stats import QueryStats, fingerprint, slow_query_logger
+from sqlite_stand_in import StandInConnection, StandInPool
+
+
+class CapturingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+def make_helper(slow_query_ms=200.0):
+    connection = StandInConnection()
+    connection.executescript("""
+        CREATE TABLE tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT, description TEXT, priority TEXT,
+            status TEXT DEFAULT 'open', user_email TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    return DatabaseHelper(pool=StandInPool(connection), query_stats=QueryStats(slow_query_ms))
+
+
+def test_fingerprint_groups_by_shape():
+    """Test that statements differing only in values share a fingerprint"""
+    print("\n🔍 Testing SQL fingerprints...")
+    assert fingerprint("SELECT * FROM tickets WHERE id = 7") == fingerprint("SELECT *  FROM tickets\n WHERE id = %s")
+    assert fingerprint("DELETE FROM tickets WHERE id IN (%s, %s, %s)") == "DELETE FROM tickets WHERE id IN (?+)"
+    assert fingerprint("SELECT * FROM tickets WHERE status = 'open'") == "SELECT * FROM tickets WHERE status = ?"
+    print("✅ Literals, placeholders and IN lists are normalized")
+
+
+def test_helper_calls_are_recorded_per_route():
+    """Test that helper queries report latency, rows and the calling route"""
+    print("\n🔍 Testing per-fingerprint stats...")
+    helper = make_helper()
+    app = Flask(__name__)
+    for title in ("VPN down", "Printer jam", "Email bounce"):
+        helper.create_ticket(title, "details", "low", "jane@example.com")
+
+    with app.test_request_context("/admin/tickets/42"):
+        for ticket_id in (1, 2, 3):
+            helper.get_ticket_by_id(ticket_id)
+    helper.get_all_tickets()
+
+    stats = helper.get_query_stats()
+    lookup = next(q for q in stats['queries'] if q['fingerprint'] == "SELECT * FROM tickets WHERE id = ?")
+    assert lookup['calls'] == 3
+    assert lookup['rows'] == 3
+    assert lookup['routes'] == {"GET /admin/tickets/42": 3}
+    assert lookup['max_calls_per_request'] == 3
+    assert sum(bucket['count'] for bucket in lookup['histogram']) == 3
+    listing = next(q for q in stats['queries'] if q['fingerprint'].startswith("SELECT * FROM tickets ORDER BY"))
+    assert listing['rows'] == 3
+    assert listing['routes'] == {}
+    print("✅ Calls, rows, routes and per-request counts recorded")
+
+
+def test_slow_and_failed_queries_are_logged():
+    """Test that statements over the threshold and errors go to the structured slow log"""
+    print("\n🔍 Testing slow-query log...")
+    handler = CapturingHandler()
+    slow_query_logger.addHandler(handler)
+    try:
+        helper = make_helper(slow_query_ms=0.0)
+        helper.get_ticket_by_id(1)
+        cursor = helper.get_connection().cursor()
+        try:
+            cursor.execute("SELECT * FROM no_such_table")
+        except Exception:
+            pass
+    finally:
+        slow_query_logger.removeHandler(handler)
+
+    events = [record['event'] for record in handler.records]
+    assert 'slow_query' in events
+    error = next(record for record in handler.records if record['event'] == 'query_error')
+    assert error['fingerprint'] == "SELECT * FROM no_such_table"
+    assert "no_such_table" in error['error']
+    assert helper.get_query_stats()['queries'][0]['slow_calls'] >= 1
+    print("✅ Slow and failed statements written as JSON lines")
+
+
+if __name__ == "__main__":
+    test_fingerprint_groups_by_shape()
+    test_helper_calls_are_recorded_per_route()
+    test_slow_and_failed_queries_are_logged()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test the read-through helper cache against the SQLite stand-in
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from database_helper import DatabaseHelper
+from read_cache import MISS, LRUCache, ReadThroughCache, SQLiteCache
+from sqlite_stand_in import StandInConnection, StandInPool
+
+
+def make_helper(cache):
+    connection = StandInConnection()
+    connection.executescript("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE, password TEXT, role TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE courses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT, description TEXT, content TEXT, questions TEXT,
+            passing_score INTEGER, badge TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    return DatabaseHelper(pool=StandInPool(connection), cache=cache)
+
+
+def select_count(helper, table):
+    return sum(q['calls'] for q in helper.get_query_stats()['queries']
+               if q['fingerprint'].startswith(f"SELECT * FROM {table}"))
+
+
+def test_reads_are_served_from_cache_until_a_write():
+    """Test that repeated reads skip the database and creates invalidate them"""
+    print("\n🔍 Testing read-through and invalidation...")
+    helper = make_helper(ReadThroughCache(LRUCache()))
+    helper.create_user("jane@example.com", "hash", "employee")
+    helper.create_course("Security 101", "Basics", "...", "[]", 70)
+
+    for _ in range(3):
+        assert helper.get_user_by_email("jane@example.com")["role"] == "employee"
+        assert len(helper.get_all_courses()) == 1
+    assert select_count(helper, "users") == 1
+    assert select_count(helper, "courses") == 1
+
+    helper.create_course("Phishing", "Spot it", "...", "[]", 80)
+    assert len(helper.get_all_courses()) == 2
+    assert select_count(helper, "courses") == 2
+
+    stats = helper.get_cache_stats()['namespaces']
+    assert stats['users'] == {'hits': 2, 'misses': 1, 'invalidations': 1, 'hit_ratio': 0.667}
+    assert stats['courses']['invalidations'] == 2
+    print("✅ Cached reads hit, writes invalidate")
+
+
+def test_missing_rows_are_not_cached():
+    """Test that None results (not found or an error) are looked up again"""
+    print("\n🔍 Testing negative lookups...")
+    helper = make_helper(ReadThroughCache(LRUCache()))
+
+    assert helper.get_user_by_email("ghost@example.com") is None
+    assert helper.get_user_by_email("ghost@example.com") is None
+    assert select_count(helper, "users") == 2
+    print("✅ Empty results always go to the database")
+
+
+def test_cached_rows_are_copies():
+    """Test that modifying a returned row does not change the cached one"""
+    print("\n🔍 Testing cached value isolation...")
+    helper = make_helper(ReadThroughCache(LRUCache()))
+    helper.create_user("jane@example.com", "hash", "employee")
+
+    helper.get_user_by_email("jane@example.com")["role"] = "admin"
+    assert helper.get_user_by_email("jane@example.com")["role"] == "employee"
+    print("✅ Callers get their own copy")
+
+
+def test_lru_eviction_and_ttl():
+    """Test that the LRU backend evicts the oldest entry and expires stale ones"""
+    print("\n🔍 Testing LRU eviction and TTL...")
+    backend = LRUCache(max_entries=2)
+    backend.set("a", 1, ttl=60)
+    backend.set("b", 2, ttl=60)
+    backend.get("a")
+    backend.set("c", 3, ttl=60)
+    assert backend.get("b") is MISS
+    assert backend.get("a") == 1
+
+    backend.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert backend.get("d") is MISS
+    print("✅ Least recently used and expired entries dropped")
+
+
+def test_sqlite_backend_is_shared_between_instances():
+    """Test that two caches on one file (two workers) see each other's writes and invalidations"""
+    print("\n🔍 Testing shared SQLite backend...")
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'cache.db')
+    worker_a = ReadThroughCache(SQLiteCache(path))
+    worker_b = ReadThroughCache(SQLiteCache(path))
+
+    assert worker_a.get_or_load("courses", "all", lambda: [{"id": 1}]) == [{"id": 1}]
+    assert worker_b.get_or_load("courses", "all", lambda: []) == [{"id": 1}]
+    worker_b.invalidate("courses")
+    assert worker_a.get_or_load("courses", "all", lambda: [{"id": 2}]) == [{"id": 2}]
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    shutil.rmtree(directory)
+    print("✅ Workers share entries and invalidations")
+
+
+def test_sqlite_backend_refuses_a_shared_directory():
+    """Test that the pickled cache is never opened where another user could plant the file"""
+    print("\n🔍 Testing SQLite cache location checks...")
+    directory = tempfile.mkdtemp()
+    os.chmod(directory, 0o777)
+    try:
+        SQLiteCache(os.path.join(directory, 'cache.db'))
+        assert False, "a world-writable cache directory was accepted"
+    except PermissionError:
+        pass
+    finally:
+        shutil.rmtree(directory)
+
+    parent = tempfile.mkdtemp()
+    created = os.path.join(parent, 'instance')
+    SQLiteCache(os.path.join(created, 'cache.db'))
+    assert os.stat(created).st_mode & 0o777 == 0o700
+    shutil.rmtree(parent)
+    print("✅ Shared directories refused, new ones created private")
+
+
+if __name__ == "__main__":
+    test_reads_are_served_from_cache_until_a_write()
+    test_missing_rows_are_not_cached()
+    test_cached_rows_are_copies()
+    test_lru_eviction_and_ttl()
+    test_sqlite_backend_is_shared_between_instances()
+    test_sqlite_backend_refuses_a_shared_directory()
@@ -12,19 +12,25 @@ from dotenv import load_dotenv
 import time
 import json
 from database_helper import db_helper
+from ats_jobs import AtsJobQueue, job_status
+from rag_memory import get_conversation_memory, new_conversation_id
+from resume_uploads import UploadSpool
 
-# Conditional imports for AI features
+# Conditional imports for AI features; the ATS and RAG modules need numpy
 try:
     import fitz
-    import pandas as pd
-    from pdfminer.high_level import extract_text
-    from sentence_transformers import SentenceTransformer
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    import numpy as np
-    from langchain.schema import Document
-    from langchain.text_splitter import CharacterTextSplitter
-    from langchain_openai import AzureOpenAIEmbeddings, AzureChatOpenAI
+    from ats_scoring import DEFAULT_CHUNKING, encode_texts, resume_vector_name, score_resumes
+    from candidate_index import DEFAULT_CANDIDATE_TOP_K, get_candidate_index
+    from rag_answer_cache import ANSWER_CACHE_ENABLED, get_answer_cache, knowledge_version
+    from rag_index import DEFAULT_RAG_CSV, RagIndex, azure_embedding_name, azure_embeddings
+    from rag_hybrid import (DEFAULT_RAG_RERANK, HybridRetriever, azure_dense_search, get_reranker,
+                            latency_budget_ms, local_dense_search)
+    from rag_retriever import DEFAULT_RAG_RETRIEVER, chunk_retriever, get_local_vector_store, query_embeddings
+    from resume_cache import get_resume_cache
+    from resume_extraction import extract_resumes, get_extraction_pool
+    from resume_tfidf import get_tfidf_model
+    from sbert_backends import DEFAULT_SBERT_BACKEND, embedding_model_name, load_sbert_model
+    from langchain_openai import AzureChatOpenAI
     from langchain_community.vectorstores import AzureSearch
     from langchain.chains import ConversationalRetrievalChain
     from langchain.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
@@ -93,23 +99,39 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 # Create upload folder if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Hand the request's pooled database connection back to the pool"""
+    db_helper.release_connection()
+
 # Initialize AI Models
-if AI_DEPENDENCIES_AVAILABLE:
+SBERT_MODEL_NAME = 'all-MiniLM-L6-v2'
+# Extraction workers started with spawn or forkserver import this file as __mp_main__;
+# they only parse PDFs, so they skip loading the models
+if AI_DEPENDENCIES_AVAILABLE and __name__ != '__mp_main__':
+    # torch (fp32), int8, onnx or onnx-int8; cached embeddings are kept apart per backend
+    SBERT_BACKEND = DEFAULT_SBERT_BACKEND
+    SBERT_EMBEDDING_NAME = embedding_model_name(SBERT_MODEL_NAME, SBERT_BACKEND)
+    # The candidate index starts over when SBERT_CHUNKING changes what a resume vector is
+    CANDIDATE_VECTOR_NAME = resume_vector_name(SBERT_EMBEDDING_NAME, DEFAULT_CHUNKING)
+    # azure (Azure Cognitive Search) or local (in-process search over the built RAG index)
+    RAG_RETRIEVER = DEFAULT_RAG_RETRIEVER
     try:
+        # Start the PDF extraction workers now rather than on the first upload
+        get_extraction_pool().start()
+
         # ATS Model
-        sbert_model = SentenceTransformer('all-MiniLM-L6-v2')
-        tfidf_vectorizer = TfidfVectorizer(stop_words="english")
+        sbert_model = load_sbert_model(SBERT_MODEL_NAME, SBERT_BACKEND)
         ats_initialized = True
         
         # RAG Setup
         try:
-            df = pd.read_csv("rag.csv")
-            documents = [
-                Document(page_content=f"Topic: {row['ki_topic']}\n{row['ki_text']}")
-                for _, row in df.iterrows()
-            ]
-            splitter = CharacterTextSplitter(chunk_size=800, chunk_overlap=100)
-            chunks = splitter.split_documents(documents)
+            # rag.csv is chunked and embedded offline by `python rag_index.py build`; attach to that build
+            rag_index = RagIndex.load()
+            if rag_index is None:
+                print("RAG index not built - run: python rag_index.py build")
+            elif rag_index.is_stale():
+                print("RAG index is older than rag.csv - run: python rag_index.py build")
             
             # Azure credentials for RAG
             chat_api_key = os.getenv("AZURE_OPENAI_API_KEY_CHAT")
@@ -122,23 +144,43 @@ if AI_DEPENDENCIES_AVAILABLE:
             azure_search_key = os.getenv("AZURE_SEARCH_ADMIN_KEY")
             azure_index_name = os.getenv("AZURE_SEARCH_INDEX_NAME")
             
+            chat_configured = all([chat_api_key, chat_endpoint, chat_deployment])
+            embed_configured = all([embed_api_key, embed_endpoint, embed_deployment])
+            search_configured = all([azure_search_endpoint, azure_search_key, azure_index_name])
+            if RAG_RETRIEVER == 'local':
+                # Retrieval runs in-process over the built index; Azure Search is not needed, and an
+                # index built with the hashing stand-in needs no embedding deployment either
+                retrieval_configured = rag_index is not None and (
+                    embed_configured or not rag_index.embedding_name.startswith('azure:'))
+            else:
+                retrieval_configured = rag_index is not None and embed_configured and search_configured
+            
             # Initialize RAG components if credentials are available
-            if all([chat_api_key, chat_endpoint, chat_deployment, embed_api_key, embed_endpoint, embed_deployment, azure_search_endpoint, azure_search_key, azure_index_name]):
-                embedding_model = AzureOpenAIEmbeddings(
-                    azure_endpoint=embed_endpoint,
-                    api_key=embed_api_key,
-                    deployment=embed_deployment,
-                    api_version="2025-01-01-preview",
-                    chunk_size=1000
-                )
+            if chat_configured and retrieval_configured:
+                if rag_index.embedding_name.startswith('azure:') and rag_index.embedding_name != azure_embedding_name():
+                    print(f"RAG index was embedded with {rag_index.embedding_name} - run: python rag_index.py build")
                 
-                vectorstore = AzureSearch.from_documents(
-                    documents=chunks,
-                    embedding=embedding_model,
-                    azure_search_endpoint=azure_search_endpoint,
-                    azure_search_key=azure_search_key,
-                    index_name=azure_index_name
-                )
+                if RAG_RETRIEVER == 'local':
+                    dense_search = local_dense_search(get_local_vector_store(), query_embeddings(rag_index.embedding_name))
+                else:
+                    embedding_model = azure_embeddings()
+                    
+                    # The build command already uploaded the chunks; the stub embedding only sizes the
+                    # schema AzureSearch declares, so attaching makes no embedding call
+                    vectorstore = AzureSearch(
+                        azure_search_endpoint=azure_search_endpoint,
+                        azure_search_key=azure_search_key,
+                        index_name=azure_index_name,
+                        embedding_function=lambda text: [0.0] * rag_index.dim
+                    )
+                    vectorstore.embedding_function = embedding_model.embed_query
+                    dense_search = azure_dense_search(vectorstore, rag_index)
+                
+                # Vector hits fused with BM25 over the same chunks, reranked when RAG_RERANK is on
+                hybrid_retriever = HybridRetriever(rag_index, dense_search,
+                                                   reranker=get_reranker() if DEFAULT_RAG_RERANK else None,
+                                                   budget_ms=latency_budget_ms(RAG_RETRIEVER))
+                retriever = chunk_retriever(hybrid_retriever.retrieve)
                 
                 system_prompt = (
                     "You are Enplify Assistant, a helpful AI that responds only with information available in the provided documents. "
@@ -161,15 +203,17 @@ if AI_DEPENDENCIES_AVAILABLE:
                 
                 qa_chain = ConversationalRetrievalChain.from_llm(
                     llm=llm,
-                    retriever=vectorstore.as_retriever(),
+                    retriever=retriever,
                     condense_question_prompt=prompt
                 )
                 
+                # Embeds questions for the answer cache, in the same space as the index
+                answer_embeddings = query_embeddings(rag_index.embedding_name)
+                
                 rag_initialized = True
-                chat_history = []
             else:
                 rag_initialized = False
-                print("RAG not initialized - missing Azure credentials")
+                print(f"RAG not initialized - missing Azure credentials or RAG index for the {RAG_RETRIEVER} retriever")
         except Exception as rag_error:
             rag_initialized = False
             print(f"RAG initialization error: {rag_error}")
@@ -375,41 +419,60 @@ job_applications = [
 ]
 
 # ATS Functions
-def pdf_contains_large_images(pdf_path, min_pixel_area=10000): 
-    if not AI_DEPENDENCIES_AVAILABLE:
-        raise Exception("AI dependencies not available")
-    doc = fitz.open(pdf_path)
-    for page in doc:
-        for img in page.get_images(full=True):
-            xref = img[0]
-            base_image = doc.extract_image(xref)
-            if base_image["width"] * base_image["height"] > min_pixel_area:
-                return True
-    return False
-
-def extract_resume_text(pdf_path):
-    if not AI_DEPENDENCIES_AVAILABLE:
-        raise Exception("AI dependencies not available")
-    if pdf_contains_large_images(pdf_path):
-        return None
-    text = extract_text(pdf_path)
-    return text.strip() if len(text.strip()) > 100 else None
-
 def compute_sbert_similarity(resume_text, job_description):
+    return compute_sbert_similarities([resume_text], job_description)[0]
+
+def compute_sbert_similarities(resume_texts, job_description, keys=None, filenames=None):
     if not ats_initialized:
         raise Exception("ATS system not initialized")
-    embeddings = sbert_model.encode([resume_text, job_description], convert_to_tensor=True)
-    score = cosine_similarity([embeddings[0].cpu().numpy()], [embeddings[1].cpu().numpy()])[0][0]
-    return round(float(score) * 100, 2)
+    # keys are the PDF hashes; their embeddings are reused from the resume cache
+    keys = list(keys) if keys else None
+    # Long resumes are scored by their best matching window rather than only their first 256 word pieces
+    scores, resume_vectors = score_resumes(sbert_model, list(resume_texts), job_description,
+                                           embedding_cache=get_resume_cache() if keys else None, keys=keys,
+                                           model_name=SBERT_EMBEDDING_NAME, chunking=DEFAULT_CHUNKING)
+    if keys and filenames:
+        index_candidates(keys, resume_vectors, filenames)
+    return scores
+
+def index_candidates(keys, resume_vectors, filenames):
+    """Add validated resumes to the candidate index used for job-to-resume search"""
+    candidate_index = get_candidate_index()
+    if candidate_index is None:
+        return
+    try:
+        candidate_index.add(list(keys), resume_vectors, list(filenames), CANDIDATE_VECTOR_NAME)
+    except Exception as e:
+        print(f"Error indexing candidates: {e}")
+
+def find_candidates(job_text, k=None):
+    """Top-k previously scored resumes for a job posting"""
+    candidate_index = get_candidate_index()
+    if not ats_initialized or candidate_index is None:
+        return []
+    try:
+        job_vector = encode_texts(sbert_model, [job_text])[0]
+        return candidate_index.search(job_vector, k or DEFAULT_CANDIDATE_TOP_K, model_name=CANDIDATE_VECTOR_NAME)
+    except Exception as e:
+        print(f"Error searching candidates: {e}")
+        return []
+
+def job_posting_text(job):
+    return "\n".join([job.get('title', ''), job.get('description', ''), *job.get('requirements', [])])
 
 def compute_tfidf_similarity(resume_texts, job_description):
     if not ats_initialized:
         raise Exception("ATS system not initialized")
-    documents = resume_texts + [job_description]
-    matrix = tfidf_vectorizer.fit_transform(documents)
-    job_vector = matrix[-1]
-    resume_vectors = matrix[:-1]
-    return [round(float(score) * 100, 2) for score in cosine_similarity(resume_vectors, job_vector).flatten()]
+    # IDF comes from every resume seen so far; only the job description is vectorized here
+    return get_tfidf_model().similarities(resume_texts, job_description)
+
+def extract_uploaded_resumes(pdf_paths):
+    return extract_resumes(pdf_paths, get_resume_cache())
+
+# Background ATS jobs for /api/process_resumes; unfinished jobs are resumed from the on-disk store
+ats_jobs = AtsJobQueue(extract_uploaded_resumes, compute_sbert_similarities, compute_tfidf_similarity)
+if ats_initialized:
+    ats_jobs.start()
 
 # Dummy data stores
 mock_user = {"email": "user@example.com", "password": "password"}
@@ -688,6 +751,20 @@ def admin_dashboard():
     }
     return render_template("admin_dashboard.html", **admin_data)
 
+@app.route("/admin/db-pool-stats")
+def admin_db_pool_stats():
+    if "user" not in session or session.get("role") != "admin":
+        return jsonify({"error": "Admin privileges required"}), 403
+    return jsonify(db_helper.get_pool_stats())
+
+@app.route("/admin/rag-cache-stats")
+def admin_rag_cache_stats():
+    if "user" not in session or session.get("role") != "admin":
+        return jsonify({"error": "Admin privileges required"}), 403
+    if not AI_DEPENDENCIES_AVAILABLE:
+        return jsonify({"error": "AI features are disabled"}), 503
+    return jsonify(get_answer_cache().stats())
+
 @app.route("/admin/tickets")
 def admin_tickets():
     if "user" not in session or session.get('role') != 'admin':
@@ -2106,27 +2183,30 @@ def ats_interface():
             flash("At least 3 resume files are required.", "error")
             return render_template("ats_interface.html")
 
-        valid_resumes, invalid_resumes = [], []
+        if not ats_initialized:
+            flash("ATS system not initialized", "error")
+            return render_template("ats_interface.html")
 
-        temp_dir = "temp_uploads"
-        os.makedirs(temp_dir, exist_ok=True)
+        valid_resumes, invalid_resumes = [], []
 
-        for uploaded_file in uploaded_files:
-            pdf_path = os.path.join(temp_dir, uploaded_file.filename)
-            uploaded_file.save(pdf_path)
+        # Small PDFs stay in memory, larger ones go to a private spool directory removed afterwards
+        with UploadSpool() as spool:
+            pdf_sources = [spool.add(uploaded_file) for uploaded_file in uploaded_files]
 
-            extracted = extract_resume_text(pdf_path)
-            if extracted:
-                valid_resumes.append((uploaded_file.filename, extracted))
-            else:
-                invalid_resumes.append(uploaded_file.filename)
+            # Parse new PDFs in parallel worker processes, reuse cached results for known ones;
+            # results come back in upload order
+            for uploaded_file, (digest, extracted) in zip(uploaded_files, extract_resumes(pdf_sources, get_resume_cache())):
+                if extracted:
+                    valid_resumes.append((uploaded_file.filename, digest, extracted))
+                else:
+                    invalid_resumes.append(uploaded_file.filename)
 
         if len(valid_resumes) < 3:
             flash("Not enough valid resumes after filtering.", "error")
             return render_template("ats_interface.html")
 
-        valid_files, extracted_texts = zip(*valid_resumes)
-        sbert_scores = [compute_sbert_similarity(r, job_description) for r in extracted_texts]
+        valid_files, digests, extracted_texts = zip(*valid_resumes)
+        sbert_scores = compute_sbert_similarities(extracted_texts, job_description, keys=digests, filenames=valid_files)
         tfidf_scores = compute_tfidf_similarity(list(extracted_texts), job_description)
         final_scores = [(0.2 * tfidf + 0.8 * sbert) for tfidf, sbert in zip(tfidf_scores, sbert_scores)]
 
@@ -2153,6 +2233,51 @@ def ats_interface():
     
     return render_template("ats_interface.html")
 
+def summarize_conversation(summary, turns):
+    """Fold older knowledge assistant turns into a short running summary"""
+    transcript = "\n".join(f"User: {question}\nAssistant: {answer}" for question, answer in turns)
+    return llm.predict(
+        "Summarize this Enplify.ai help conversation in a few sentences, keeping the products, devices "
+        "and problems the user mentioned so follow-up questions can refer back to them.\n\n"
+        f"Earlier summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"
+    )
+
+def answer_rag_question(question):
+    """Answer through the RAG chain, reusing a cached answer to the same or a similar question; returns (answer, cached)"""
+    # Each browser session has its own bounded conversation, shared by every worker
+    memory = get_conversation_memory(summarize_conversation)
+    conversation_id = session.setdefault("rag_conversation", new_conversation_id())
+    chat_history = memory.history(conversation_id)
+
+    # Follow-up questions are condensed with the conversation, so only first questions use the cache
+    cache = get_answer_cache() if ANSWER_CACHE_ENABLED and not chat_history else None
+    vector = None
+    if cache is not None:
+        try:
+            version = knowledge_version(rag_index, DEFAULT_RAG_CSV)
+            answer, vector = cache.get(question, version, answer_embeddings.embed_query)
+            if answer is not None:
+                memory.append(conversation_id, question, answer)
+                return answer, True
+        except Exception as e:
+            print(f"Error reading RAG answer cache: {e}")
+            cache = None
+
+    result = qa_chain({"question": question, "chat_history": chat_history})
+    answer = result["answer"].strip()
+
+    # Fallback if no useful info found
+    if answer.lower() in ["i don't know.", "i don't know"]:
+        answer = "I'm trained only to answer Enplify.ai-related questions 😊"
+    elif cache is not None:
+        try:
+            cache.put(question, answer, version, vector)
+        except Exception as e:
+            print(f"Error writing RAG answer cache: {e}")
+
+    memory.append(conversation_id, question, answer)
+    return answer, False
+
 @app.route("/ai/rag", methods=["GET", "POST"])
 def rag_interface():
     if "user" not in session:
@@ -2184,14 +2309,7 @@ def rag_interface():
 
         # Run through RAG chain
         try:
-            result = qa_chain({"question": question, "chat_history": chat_history})
-            answer = result["answer"].strip()
-
-            # Fallback if no useful info found
-            if answer.lower() in ["i don't know.", "i don't know"]:
-                answer = "I'm trained only to answer Enplify.ai-related questions 😊"
-
-            chat_history.append((question, answer))
+            answer, _ = answer_rag_question(question)
             return render_template("rag_interface.html", answer=answer, question=question)
         except Exception as e:
             return render_template("rag_interface.html", answer=f"Error: {str(e)}", question=question)
@@ -2210,49 +2328,28 @@ def process_resumes_api():
     if len(uploaded_files) < 3:
         return jsonify({"error": "At least 3 resume files are required."}), 400
 
-    valid_resumes, invalid_resumes = [], []
-
-    temp_dir = "temp_uploads"
-    os.makedirs(temp_dir, exist_ok=True)
+    if not ats_initialized:
+        return jsonify({"error": "ATS system not initialized"}), 503
 
-    for uploaded_file in uploaded_files:
-        pdf_path = os.path.join(temp_dir, uploaded_file.filename)
-        uploaded_file.save(pdf_path)
+    # Extraction and scoring run in the background; poll the status URL for progress
+    job_id = ats_jobs.submit(session["user"], job_description, threshold,
+                             [(uploaded_file.filename, uploaded_file) for uploaded_file in uploaded_files])
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": url_for("process_resumes_status", job_id=job_id)
+    }), 202
 
-        extracted = extract_resume_text(pdf_path)
-        if extracted:
-            valid_resumes.append((uploaded_file.filename, extracted))
-        else:
-            invalid_resumes.append(uploaded_file.filename)
-
-    if len(valid_resumes) < 3:
-        return jsonify({"error": "Not enough valid resumes after filtering."}), 400
-
-    valid_files, extracted_texts = zip(*valid_resumes)
-    sbert_scores = [compute_sbert_similarity(r, job_description) for r in extracted_texts]
-    tfidf_scores = compute_tfidf_similarity(list(extracted_texts), job_description)
-    final_scores = [(0.2 * tfidf + 0.8 * sbert) for tfidf, sbert in zip(tfidf_scores, sbert_scores)]
-
-    results = []
-    for i, file in enumerate(valid_files):
-        results.append({
-            "Filename": file,
-            "TF-IDF Score (%)": float(tfidf_scores[i]),
-            "SBERT Score (%)": float(sbert_scores[i]),
-            "Final Match Score (%)": round(float(final_scores[i]), 2),
-            "Label": "Selected" if final_scores[i] >= threshold else "Rejected"
-        })
+@app.route("/api/process_resumes/<job_id>", methods=["GET"])
+def process_resumes_status(job_id):
+    if "user" not in session:
+        return jsonify({"error": "Authentication required"}), 401
 
-    for file in invalid_resumes:
-        results.append({
-            "Filename": file,
-            "TF-IDF Score (%)": "N/A",
-            "SBERT Score (%)": "N/A",
-            "Final Match Score (%)": "N/A",
-            "Label": "Invalid_Resume"
-        })
+    job = ats_jobs.get(job_id)
+    if job is None or job["owner"] != session["user"]:
+        return jsonify({"error": "Job not found"}), 404
 
-    return jsonify(results), 200
+    return jsonify(job_status(job)), 200
 
 @app.route("/api/rag_ask", methods=["POST"])
 def rag_ask_api():
@@ -2283,15 +2380,8 @@ def rag_ask_api():
 
     # Run through RAG chain
     try:
-        result = qa_chain({"question": question, "chat_history": chat_history})
-        answer = result["answer"].strip()
-
-        # Fallback if no useful info found
-        if answer.lower() in ["i don't know.", "i don't know"]:
-            answer = "I'm trained only to answer Enplify.ai-related questions 😊"
-
-        chat_history.append((question, answer))
-        return jsonify({"answer": answer})
+        answer, cached = answer_rag_question(question)
+        return jsonify({"answer": answer, "cached": cached})
     except Exception as e:
         return jsonify({"answer": f"Error: {str(e)}"})
 
@@ -3310,11 +3400,42 @@ def add_job():
                 'applications_count': 0
             }
             job_postings.append(new_job)
-            flash('Job posting created successfully!', 'success')
+            # Historical resumes that already match the new posting
+            new_job['suggested_candidates'] = find_candidates(job_posting_text(new_job))
+            if new_job['suggested_candidates']:
+                flash(f"Job posting created successfully! {len(new_job['suggested_candidates'])} matching candidates found.", 'success')
+            else:
+                flash('Job posting created successfully!', 'success')
             return redirect(url_for('admin_jobs'))
     
     return render_template('admin_add_job.html')
 
+@app.route('/api/jobs/<int:job_id>/candidates', methods=['GET'])
+def job_candidates_api(job_id):
+    if 'user' not in session or session.get('role') != 'admin':
+        return jsonify({"error": "Authentication required"}), 401
+
+    job = next((j for j in job_postings if j['id'] == job_id), None)
+    if not job:
+        return jsonify({"error": "Job posting not found"}), 404
+    if not ats_initialized:
+        return jsonify({"error": "ATS system not initialized"}), 503
+
+    k = request.args.get('k', DEFAULT_CANDIDATE_TOP_K, type=int)
+    return jsonify({"job_id": job_id, "candidates": find_candidates(job_posting_text(job), k)}), 200
+
+@app.route('/api/candidates/<digest>', methods=['DELETE'])
+def delete_candidate_api(digest):
+    if 'user' not in session or session.get('role') != 'admin':
+        return jsonify({"error": "Authentication required"}), 401
+    if not ats_initialized:
+        return jsonify({"error": "ATS system not initialized"}), 503
+
+    candidate_index = get_candidate_index()
+    if candidate_index is None or not candidate_index.delete([digest]):
+        return jsonify({"error": "Candidate not found"}), 404
+    return jsonify({"deleted": digest}), 200
+
 @app.route('/admin/jobs/<int:job_id>')
 def view_job(job_id):
     if 'user' not in session or session.get('role') != 'admin':
@@ -0,0 +1,373 @@
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from resume_uploads import spool_upload
+
+DEFAULT_JOB_STORE_PATH = os.getenv('ATS_JOB_STORE_PATH', os.path.join('instance', 'ats_jobs.db'))
+DEFAULT_JOB_UPLOAD_DIR = os.getenv('ATS_JOB_UPLOAD_DIR', os.path.join('instance', 'ats_uploads'))
+DEFAULT_JOB_WORKERS = int(os.getenv('ATS_JOB_WORKERS', 2))
+# Resumes extracted and SBERT-scored between progress updates
+DEFAULT_JOB_CHUNK_SIZE = int(os.getenv('ATS_JOB_CHUNK_SIZE', 8))
+# A running job whose worker has not checked in for this long is taken over by another one
+DEFAULT_JOB_STALE_SECONDS = float(os.getenv('ATS_JOB_STALE_SECONDS', 120))
+# Finished jobs and their results are kept this long for polling
+DEFAULT_JOB_RETENTION_HOURS = float(os.getenv('ATS_JOB_RETENTION_HOURS', 24))
+
+MIN_VALID_RESUMES = 3
+FINISHED_STATUSES = ('done', 'failed')
+
+
+class JobStore:
+    """On-disk store of ATS jobs and per-file progress.
+
+    Jobs live in a local SQLite file shared by every worker process, so a job
+    submitted to one worker can be polled through any other and picked up
+    again after a restart. A worker claims a job by stamping it with its id
+    and keeps the claim alive with heartbeats.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_JOB_STORE_PATH
+        self._local = threading.local()
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = self._connect()
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                owner TEXT,
+                status TEXT NOT NULL,
+                job_description TEXT,
+                threshold REAL NOT NULL,
+                error TEXT,
+                worker TEXT,
+                heartbeat REAL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS job_files (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                path TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                digest TEXT,
+                sbert REAL,
+                tfidf REAL,
+                final REAL,
+                PRIMARY KEY (job_id, position)
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, heartbeat)")
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    def _write(self, statements):
+        """Run (sql, params) or (sql, [params, ...]) statements in one transaction"""
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in statements:
+                if isinstance(params, list):
+                    connection.executemany(sql, params)
+                else:
+                    connection.execute(sql, params)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def create_job(self, job_id, owner, job_description, threshold, files):
+        """Queue a job for (filename, path) files"""
+        now = time.time()
+        self._write([
+            ("INSERT INTO jobs (id, owner, status, job_description, threshold, created_at, updated_at) "
+             "VALUES (?, ?, 'queued', ?, ?, ?, ?)", (job_id, owner, job_description, threshold, now, now)),
+            ("INSERT INTO job_files (job_id, position, filename, path) VALUES (?, ?, ?, ?)",
+             [(job_id, position, filename, path) for position, (filename, path) in enumerate(files)]),
+        ])
+        return job_id
+
+    def get_job(self, job_id):
+        """Get a job with its files in upload order, or None"""
+        connection = self._connect()
+        job = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if job is None:
+            return None
+        files = connection.execute("SELECT * FROM job_files WHERE job_id = ? ORDER BY position", (job_id,)).fetchall()
+        return dict(job, files=[dict(f) for f in files])
+
+    def claim(self, job_id, worker, stale_after):
+        """Take a queued job, or a running one whose worker stopped sending heartbeats"""
+        now = time.time()
+        cursor = self._connect().execute("""
+            UPDATE jobs SET status = 'running', worker = ?, heartbeat = ?, updated_at = ?
+            WHERE id = ? AND (status = 'queued' OR (status = 'running' AND heartbeat < ?))
+        """, (worker, now, now, job_id, now - stale_after))
+        return cursor.rowcount == 1
+
+    def claimable(self, stale_after):
+        """Ids of jobs waiting for a worker, oldest first"""
+        rows = self._connect().execute("""
+            SELECT id FROM jobs
+            WHERE status = 'queued' OR (status = 'running' AND heartbeat < ?)
+            ORDER BY created_at
+        """, (time.time() - stale_after,)).fetchall()
+        return [row['id'] for row in rows]
+
+    def heartbeat(self, worker):
+        """Refresh the claims of every job this worker is running"""
+        self._connect().execute("UPDATE jobs SET heartbeat = ? WHERE worker = ? AND status = 'running'",
+                                (time.time(), worker))
+
+    def update_files(self, job_id, rows):
+        """Record (status, digest, sbert, position) extraction results"""
+        self._write([
+            ("UPDATE job_files SET status = ?, digest = ?, sbert = ? WHERE job_id = ? AND position = ?",
+             [(status, digest, sbert, job_id, position) for status, digest, sbert, position in rows]),
+            ("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id)),
+        ])
+
+    def set_scores(self, job_id, rows):
+        """Record (tfidf, final, position) scores and mark the job done"""
+        self._write([
+            ("UPDATE job_files SET status = 'scored', tfidf = ?, final = ? WHERE job_id = ? AND position = ?",
+             [(tfidf, final, job_id, position) for tfidf, final, position in rows]),
+            ("UPDATE jobs SET status = 'done', updated_at = ? WHERE id = ?", (time.time(), job_id)),
+        ])
+
+    def fail(self, job_id, error):
+        self._connect().execute("UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                                (error, time.time(), job_id))
+
+    def purge(self, older_than):
+        """Delete finished jobs last updated before older_than and return their ids"""
+        rows = self._connect().execute(
+            f"SELECT id FROM jobs WHERE status IN {FINISHED_STATUSES} AND updated_at < ?", (older_than,)).fetchall()
+        ids = [(row['id'],) for row in rows]
+        if ids:
+            self._write([("DELETE FROM job_files WHERE job_id = ?", ids),
+                         ("DELETE FROM jobs WHERE id = ?", ids)])
+        return [job_id for job_id, in ids]
+
+
+def process_job(store, job_id, extract, sbert_scores, tfidf_scores, chunk_size=None):
+    """Extract and score one job's resumes, saving progress after every chunk.
+
+    extract(paths) returns (digest, text) per path, sbert_scores(texts,
+    job_description, keys, filenames) and tfidf_scores(texts, job_description)
+    return a score per text. Files finished before a restart keep their verdicts; their
+    text is read again, which the resume cache answers without parsing.
+    """
+    chunk_size = chunk_size or DEFAULT_JOB_CHUNK_SIZE
+    job = store.get_job(job_id)
+    job_description = job['job_description']
+    texts = {}
+
+    extracted = [f for f in job['files'] if f['status'] == 'valid']
+    if extracted:
+        for f, (_, text) in zip(extracted, extract([f['path'] for f in extracted])):
+            if text:
+                texts[f['position']] = text
+            else:
+                store.update_files(job_id, [('invalid', f['digest'], None, f['position'])])
+
+    pending = [f for f in job['files'] if f['status'] == 'pending']
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        results = list(zip(chunk, extract([f['path'] for f in chunk])))
+        valid = [(f, digest, text) for f, (digest, text) in results if text]
+        scores = {}
+        if valid:
+            # SBERT scores do not depend on the rest of the batch, so they are partial results
+            sbert = sbert_scores([text for _, _, text in valid], job_description,
+                                 [digest for _, digest, _ in valid], [f['filename'] for f, _, _ in valid])
+            scores = {f['position']: score for (f, _, _), score in zip(valid, sbert)}
+            texts.update((f['position'], text) for f, _, text in valid)
+        store.update_files(job_id, [('valid' if f['position'] in scores else 'invalid', digest,
+                                     scores.get(f['position']), f['position']) for f, (digest, _) in results])
+
+    if len(texts) < MIN_VALID_RESUMES:
+        store.fail(job_id, "Not enough valid resumes after filtering.")
+        return
+
+    sbert = {f['position']: f['sbert'] for f in store.get_job(job_id)['files']}
+    positions = sorted(texts)
+    tfidf = tfidf_scores([texts[position] for position in positions], job_description)
+    store.set_scores(job_id, [(float(score), round(0.2 * float(score) + 0.8 * sbert[position], 2), position)
+                              for position, score in zip(positions, tfidf)])
+
+
+def result_rows(job):
+    """Rows in the /api/process_resumes result format for every file finished so far"""
+    threshold = job['threshold']
+    rows, invalid = [], []
+    for f in job['files']:
+        if f['status'] == 'scored':
+            rows.append({
+                "Filename": f['filename'],
+                "TF-IDF Score (%)": f['tfidf'],
+                "SBERT Score (%)": f['sbert'],
+                "Final Match Score (%)": f['final'],
+                "Label": "Selected" if f['final'] >= threshold else "Rejected"
+            })
+        elif f['status'] == 'valid':
+            rows.append({
+                "Filename": f['filename'],
+                "TF-IDF Score (%)": None,
+                "SBERT Score (%)": f['sbert'],
+                "Final Match Score (%)": None,
+                "Label": "Pending"
+            })
+        elif f['status'] == 'invalid':
+            invalid.append({
+                "Filename": f['filename'],
+                "TF-IDF Score (%)": "N/A",
+                "SBERT Score (%)": "N/A",
+                "Final Match Score (%)": "N/A",
+                "Label": "Invalid_Resume"
+            })
+    return rows + invalid
+
+
+def job_status(job):
+    """Progress report for polling clients"""
+    total = len(job['files'])
+    processed = sum(1 for f in job['files'] if f['status'] != 'pending')
+    return {
+        "job_id": job['id'],
+        "status": job['status'],
+        "error": job['error'],
+        "total": total,
+        "processed": processed,
+        "progress": round(processed / total * 100, 1) if total else 100.0,
+        "files": [{"filename": f['filename'], "status": f['status']} for f in job['files']],
+        "results": result_rows(job),
+    }
+
+
+class AtsJobQueue:
+    """Runs ATS jobs on background threads of this worker process.
+
+    Uploads are spooled under upload_dir so an unfinished job can be resumed by
+    any worker after a restart. A maintenance thread refreshes heartbeats,
+    adopts abandoned jobs and purges old ones.
+    """
+
+    def __init__(self, extract, sbert_scores, tfidf_scores, store=None, upload_dir=None, workers=None,
+                 chunk_size=None, stale_after=None, retention_hours=None):
+        self.extract = extract
+        self.sbert_scores = sbert_scores
+        self.tfidf_scores = tfidf_scores
+        self._store = store
+        self.upload_dir = upload_dir or DEFAULT_JOB_UPLOAD_DIR
+        self.workers = max(1, workers or DEFAULT_JOB_WORKERS)
+        self.chunk_size = chunk_size or DEFAULT_JOB_CHUNK_SIZE
+        self.stale_after = stale_after or DEFAULT_JOB_STALE_SECONDS
+        self.retention = (retention_hours or DEFAULT_JOB_RETENTION_HOURS) * 3600
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+        self._stopped = threading.Event()
+        self._active = set()
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = JobStore()
+        return self._store
+
+    def start(self):
+        """Start the worker threads, once per process"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.worker_id = f"{socket.gethostname()}:{self._pid}:{uuid.uuid4().hex[:8]}"
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='ats-job')
+            self._active = set()
+            self._stopped = threading.Event()
+            threading.Thread(target=self._maintain, name='ats-job-maintenance', daemon=True).start()
+
+    def stop(self):
+        with self._lock:
+            executor, self._executor, self._pid = self._executor, None, None
+            self._stopped.set()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def job_dir(self, job_id):
+        return os.path.join(self.upload_dir, job_id)
+
+    def submit(self, owner, job_description, threshold, uploads):
+        """Spool (filename, file) uploads and queue a job; returns the job id at once"""
+        self.start()
+        job_id = uuid.uuid4().hex
+        directory = self.job_dir(job_id)
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        try:
+            for position, (filename, upload) in enumerate(uploads):
+                # Stored under its position: client filenames may collide or contain paths
+                path = os.path.join(directory, f"{position}.pdf")
+                spool_upload(upload, path)
+                files.append((filename, path))
+            self.store.create_job(job_id, owner, job_description, threshold, files)
+        except Exception:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+        self._schedule(job_id)
+        return job_id
+
+    def get(self, job_id):
+        return self.store.get_job(job_id)
+
+    def _schedule(self, job_id):
+        with self._lock:
+            if self._executor is None or job_id in self._active:
+                return False
+            if not self.store.claim(job_id, self.worker_id, self.stale_after):
+                return False
+            self._active.add(job_id)
+            self._executor.submit(self._run, job_id)
+            return True
+
+    def _run(self, job_id):
+        try:
+            process_job(self.store, job_id, self.extract, self.sbert_scores, self.tfidf_scores, self.chunk_size)
+        except Exception as e:
+            print(f"Error processing ATS job {job_id}: {e}")
+            self.store.fail(job_id, str(e))
+        finally:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+            with self._lock:
+                self._active.discard(job_id)
+
+    def _maintain(self):
+        stopped = self._stopped
+        while True:
+            try:
+                self.store.heartbeat(self.worker_id)
+                for job_id in self.store.claimable(self.stale_after):
+                    self._schedule(job_id)
+                for job_id in self.store.purge(time.time() - self.retention):
+                    shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+            except Exception as e:
+                print(f"Error maintaining ATS jobs: {e}")
+            if stopped.wait(self.stale_after / 4):
+                return
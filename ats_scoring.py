@@ -0,0 +1,168 @@
+import os
+import re
+
+import numpy as np
+
+# Resumes per forward pass; larger batches are faster on CPU until memory runs out
+DEFAULT_SBERT_BATCH_SIZE = int(os.getenv('SBERT_BATCH_SIZE', 32))
+
+# Long resumes are embedded as overlapping windows instead of being truncated by the model.
+# Off by default: it changes every resume's score compared with the single-pass encode
+DEFAULT_CHUNKING = os.getenv('SBERT_CHUNKING', 'false').lower() == 'true'
+# How window scores become a resume score: max (best matching section) or mean
+DEFAULT_CHUNK_POOLING = os.getenv('SBERT_CHUNK_POOLING', 'max').lower()
+# Word pieces shared by neighbouring windows so no sentence is only seen cut in half
+DEFAULT_CHUNK_OVERLAP = int(os.getenv('SBERT_CHUNK_OVERLAP', 32))
+# Windows embedded per resume at most (0 for no limit)
+DEFAULT_MAX_CHUNKS = int(os.getenv('SBERT_MAX_CHUNKS', 32))
+# Word pieces per window when the model does not say; MiniLM reads 256 including [CLS] and [SEP]
+DEFAULT_WINDOW_TOKENS = 254
+
+
+def normalize_rows(matrix):
+    """Scale each row to unit length so dot products are cosine similarities"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def resume_vector_name(model_name, chunking=None):
+    """Name stored with resume vectors; window centroids and single-pass vectors are never mixed"""
+    chunking = DEFAULT_CHUNKING if chunking is None else chunking
+    return f"{model_name}:windows" if chunking else model_name
+
+
+def encode_texts(model, texts, batch_size=None):
+    """Encode texts with one batched model call and return unit-length float32 rows"""
+    embeddings = model.encode(list(texts), batch_size=batch_size or DEFAULT_SBERT_BATCH_SIZE,
+                              convert_to_numpy=True, show_progress_bar=False)
+    return normalize_rows(embeddings)
+
+
+def cosine_scores(resume_matrix, job_vector):
+    """Percent cosine similarity of unit-length resume rows against a unit-length job vector"""
+    return [round(float(score) * 100, 2) for score in np.asarray(resume_matrix) @ np.asarray(job_vector)]
+
+
+def compute_sbert_similarities(model, resume_texts, job_description, batch_size=None,
+                               embedding_cache=None, keys=None, model_name=None, chunking=False, pooling=None):
+    """Score all resumes against a job description.
+
+    The job description is encoded once, the resumes in batches of batch_size,
+    and the scores come from a single matrix-vector product. With an
+    embedding_cache, resumes whose key (PDF hash) already has a vector from
+    model_name are not encoded again. With chunking, each resume is scored
+    by pooling the scores of its windows (see embed_resume_windows).
+    """
+    return score_resumes(model, resume_texts, job_description, batch_size, embedding_cache, keys, model_name,
+                         chunking, pooling)[0]
+
+
+def score_resumes(model, resume_texts, job_description, batch_size=None, embedding_cache=None, keys=None,
+                  model_name=None, chunking=False, pooling=None):
+    """Return (scores, one unit-length vector per resume) for a job description"""
+    if not resume_texts:
+        return [], np.empty((0, 0), dtype=np.float32)
+    job_vector = encode_texts(model, [job_description])[0]
+    if not chunking:
+        resume_vectors = embed_resumes(model, resume_texts, batch_size, embedding_cache, keys, model_name)
+        return cosine_scores(resume_vectors, job_vector), resume_vectors
+    windows = embed_resume_windows(model, resume_texts, len(job_vector), batch_size, embedding_cache, keys,
+                                   model_name)
+    return pooled_scores(windows, job_vector, pooling), np.vstack([centroid(w) for w in windows])
+
+
+def embed_resumes(model, resume_texts, batch_size=None, embedding_cache=None, keys=None, model_name=None):
+    """Unit-length resume embeddings, reusing and filling the embedding cache when given"""
+    if embedding_cache is None or keys is None:
+        return encode_texts(model, resume_texts, batch_size)
+
+    cached = embedding_cache.get_embeddings(keys, model_name)
+    # Each distinct resume is encoded once, even if it was uploaded twice
+    missing = [key for key in dict.fromkeys(keys) if key not in cached]
+    if missing:
+        text_by_key = dict(zip(keys, resume_texts))
+        encoded = encode_texts(model, [text_by_key[key] for key in missing], batch_size)
+        new = dict(zip(missing, encoded))
+        embedding_cache.put_embeddings(new, model_name)
+        cached.update(new)
+    return np.vstack([cached[key] for key in keys])
+
+
+def window_size(model):
+    """Word pieces per window: the model's input length minus [CLS] and [SEP]"""
+    max_seq_length = getattr(model, 'max_seq_length', None)
+    return max_seq_length - 2 if max_seq_length else DEFAULT_WINDOW_TOKENS
+
+
+def split_windows(text, tokenizer=None, window=DEFAULT_WINDOW_TOKENS, overlap=DEFAULT_CHUNK_OVERLAP,
+                  max_windows=DEFAULT_MAX_CHUNKS):
+    """Split text into windows of at most `window` word pieces, neighbours sharing `overlap`.
+
+    With a fast tokenizer the windows are cut at exact word-piece offsets in the
+    original text; otherwise words are counted, assuming about 4 word pieces
+    per 3 words.
+    """
+    if tokenizer is not None and getattr(tokenizer, 'is_fast', False):
+        offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True,
+                            verbose=False)['offset_mapping']
+        spans = [(start, end) for start, end in offsets]
+    else:
+        spans = [(match.start(), match.end()) for match in re.finditer(r'\S+', text)]
+        window, overlap = max(1, window * 3 // 4), overlap * 3 // 4
+    if len(spans) <= window:
+        return [text]
+
+    step = max(1, window - overlap)
+    windows = []
+    for start in range(0, len(spans), step):
+        end = min(start + window, len(spans))
+        windows.append(text[spans[start][0]:spans[end - 1][1]])
+        if end == len(spans) or len(windows) == max_windows:
+            break
+    return windows
+
+
+def embed_resume_windows(model, resume_texts, dim, batch_size=None, embedding_cache=None, keys=None,
+                         model_name=None):
+    """Unit-length window embeddings per resume, as a (windows x dim) matrix each.
+
+    Windows of all resumes not in the cache go to the model in one batched
+    call. Every window is at most one model input long, so encode time grows
+    linearly with the amount of resume text.
+    """
+    window, tokenizer = window_size(model), getattr(model, 'tokenizer', None)
+    # Window geometry is part of the cache key; other settings give other vectors
+    cache_name = f"{model_name}:windows{window}-{DEFAULT_CHUNK_OVERLAP}-{DEFAULT_MAX_CHUNKS}"
+    use_cache = embedding_cache is not None and keys is not None
+    keys = list(keys) if keys is not None else list(range(len(resume_texts)))
+    found = {}
+    if use_cache:
+        found = {key: vectors.reshape(-1, dim) for key, vectors in embedding_cache.get_embeddings(keys, cache_name).items()}
+
+    text_by_key = dict(zip(keys, resume_texts))
+    missing = [key for key in dict.fromkeys(keys) if key not in found]
+    spans, windows = [], []
+    for key in missing:
+        pieces = split_windows(text_by_key[key], tokenizer, window)
+        spans.append((len(windows), len(pieces)))
+        windows.extend(pieces)
+    if windows:
+        vectors = encode_texts(model, windows, batch_size)
+        new = {key: vectors[start:start + count] for key, (start, count) in zip(missing, spans)}
+        if use_cache:
+            embedding_cache.put_embeddings(new, cache_name)
+        found.update(new)
+    return [found[key] for key in keys]
+
+
+def pooled_scores(window_matrices, job_vector, pooling=None):
+    """Percent score per resume from the cosine scores of its windows"""
+    pool = np.mean if (pooling or DEFAULT_CHUNK_POOLING) == 'mean' else np.max
+    return [round(float(pool(matrix @ job_vector)) * 100, 2) for matrix in window_matrices]
+
+
+def centroid(window_matrix):
+    """One unit-length vector standing for the whole resume, e.g. for the candidate index"""
+    return normalize_rows(window_matrix.mean(axis=0, keepdims=True))[0]
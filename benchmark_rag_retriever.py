@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+RAG Retriever Benchmark
+Runs the sample questions from rag.csv against the local vector store and,
+when Azure Search is configured, the Azure index, with the same query
+vectors. Reports search latency, how often the question's own article is in
+the top k, and the recall of the local top k against Azure's. A second table
+compares the hybrid retrieval stages end to end (query embedding included).
+
+    python benchmark_rag_retriever.py --k 4 --repeat 20 [--rerank]
+"""
+
+import argparse
+import csv
+import os
+import statistics
+import sys
+import time
+
+from rag_hybrid import HybridRetriever, get_reranker, local_dense_search
+from rag_index import DEFAULT_RAG_CSV, RagIndex, azure_document_key, azure_search_client
+from rag_retriever import LocalVectorStore, query_embeddings
+
+
+def load_questions(csv_path):
+    """(question, article row) pairs for the rows that have a sample question"""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        return [(row['sample_question'].strip().strip('"'), number)
+                for number, row in enumerate(csv.DictReader(f)) if row['sample_question'].strip()]
+
+
+def timed(search, vectors, repeat):
+    """Results of the last pass and per-query latencies in milliseconds"""
+    latencies, results = [], []
+    for _ in range(repeat):
+        results = []
+        for vector in vectors:
+            started = time.perf_counter()
+            results.append(search(vector))
+            latencies.append((time.perf_counter() - started) * 1000)
+    return results, latencies
+
+
+def azure_search(client, k):
+    from azure.search.documents.models import VectorizedQuery
+    from langchain_community.vectorstores.azuresearch import FIELDS_CONTENT_VECTOR, FIELDS_ID
+
+    def search(vector):
+        query = VectorizedQuery(vector=list(vector), k_nearest_neighbors=k, fields=FIELDS_CONTENT_VECTOR)
+        return [doc[FIELDS_ID] for doc in client.search(search_text=None, vector_queries=[query],
+                                                        select=[FIELDS_ID], top=k)]
+    return search
+
+
+def report(name, results, latencies, expected_rows, row_of):
+    hits = sum(row in {row_of[key] for key in keys if key in row_of} for keys, row in zip(results, expected_rows))
+    print(f"{name:<8}{statistics.median(latencies):>10.2f}{sorted(latencies)[int(len(latencies) * 0.95)]:>10.2f}"
+          f"{hits / len(results):>12.2f}", end='')
+
+
+def compare_stages(index, store, embeddings, questions, args):
+    """Article hit rate and end-to-end latency of each combination of retrieval stages"""
+    stages = [('dense', dict(bm25=False)), ('bm25', dict(dense=False)), ('hybrid', {})]
+    if args.rerank:
+        stages.append(('hybrid+rr', dict(rerank=True)))
+    reranker = get_reranker() if args.rerank else None
+    print(f"\n{'stages':<10}{'p50 ms':>10}{'p95 ms':>10}{'article@k':>12}{'over budget':>13}")
+    for name, options in stages:
+        retriever = HybridRetriever(index, local_dense_search(store, embeddings), reranker=reranker,
+                                    **dict(dict(dense=True, bm25=True, rerank=False), **options))
+        latencies, hits, skipped = [], 0, 0
+        for _ in range(args.repeat):
+            for question, row in questions:
+                timings = {}
+                results = retriever.retrieve(question, args.k, timings)
+                latencies.append(timings['total'])
+                hits += row in {chunk.metadata['row'] for chunk, _ in results}
+                skipped += 'dense_skipped' in timings or 'rerank_skipped' in timings
+        latencies.sort()
+        print(f"{name:<10}{statistics.median(latencies):>10.2f}{latencies[int(len(latencies) * 0.95)]:>10.2f}"
+              f"{hits / len(latencies):>12.2f}{skipped:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local RAG retriever against Azure Search")
+    parser.add_argument('--csv', default=DEFAULT_RAG_CSV)
+    parser.add_argument('--dir', default=None, help="index directory (default: RAG_INDEX_DIR or rag_index)")
+    parser.add_argument('--k', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=20, help="passes over the questions")
+    parser.add_argument('--ann', action='store_true', help="search the local index through an HNSW graph")
+    parser.add_argument('--rerank', action='store_true', help="add the cross-encoder stage to the hybrid table")
+    parser.add_argument('--no-azure-search', action='store_true')
+    args = parser.parse_args()
+
+    index = RagIndex.load(args.dir)
+    if index is None:
+        sys.exit("No RAG index built yet - run: python rag_index.py build")
+    questions = load_questions(args.csv)
+    if not questions:
+        sys.exit(f"No sample questions in {args.csv}")
+
+    embeddings = query_embeddings(index.embedding_name)
+    started = time.perf_counter()
+    vectors = [embeddings.embed_query(question) for question, _ in questions]
+    embed_ms = (time.perf_counter() - started) * 1000 / len(vectors)
+    expected_rows = [row for _, row in questions]
+    row_of = {azure_document_key(chunk.id): chunk.metadata['row'] for chunk in index.chunks}
+
+    store = LocalVectorStore(index, ann=args.ann, ann_min_rows=0)
+    local_results, local_latencies = timed(
+        lambda vector: [azure_document_key(chunk.id) for chunk, _ in store.search(vector, args.k)],
+        vectors, args.repeat)
+
+    print(f"📊 {len(questions)} questions x {args.repeat} runs over {len(index.chunks)} chunks, k={args.k}, "
+          f"{index.embedding_name} (query embedding {embed_ms:.1f} ms, not included below)\n")
+    print(f"{'backend':<8}{'p50 ms':>10}{'p95 ms':>10}{'article@k':>12}{'recall@k':>10}")
+    report('local', local_results, local_latencies, expected_rows, row_of)
+
+    configured = all(os.getenv(name) for name in ('AZURE_SEARCH_ENDPOINT', 'AZURE_SEARCH_ADMIN_KEY',
+                                                  'AZURE_SEARCH_INDEX_NAME'))
+    if args.no_azure_search or not configured or not index.embedding_name.startswith('azure:'):
+        print("\n(azure skipped: needs AZURE_SEARCH_* settings and an index built with --embeddings azure)")
+    else:
+        azure_results, azure_latencies = timed(azure_search(azure_search_client(index.dim), args.k), vectors,
+                                               args.repeat)
+        recall = statistics.mean(len(set(local) & set(azure)) / max(len(azure), 1)
+                                 for local, azure in zip(local_results, azure_results))
+        print()
+        report('azure', azure_results, azure_latencies, expected_rows, row_of)
+        print(f"{recall:>10.2f}")
+
+    compare_stages(index, store, embeddings, questions, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+SBERT Backend Benchmark
+Encodes the same resumes with each inference backend in a fresh process and
+reports throughput, peak RSS and the largest score difference from the fp32
+torch model, checked against sbert_backends.SCORE_TOLERANCE. The ONNX models
+are exported in a separate process first, so their RSS is measured the way
+the app loads them: without torch.
+
+    python benchmark_sbert_backends.py --resumes temp_uploads --backends torch int8 onnx onnx-int8
+"""
+
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from sbert_backends import SBERT_BACKENDS, SCORE_TOLERANCE
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+JOB_DESCRIPTION = ("Senior Python developer to build Flask services on Azure, "
+                   "with MySQL, REST APIs and CI/CD experience.")
+
+
+def load_resumes(directory):
+    """Resume texts from the PDFs (or .txt files) in a directory"""
+    from resume_extraction import extract_resume_text
+    texts = []
+    for path in sorted(glob.glob(os.path.join(directory, '*'))):
+        if path.lower().endswith('.pdf'):
+            text = extract_resume_text(path)
+        elif path.lower().endswith('.txt'):
+            with open(path) as f:
+                text = f.read()
+        else:
+            continue
+        if text:
+            texts.append(text)
+    return texts
+
+
+def run_backend(backend, texts, repeat, batch_size):
+    """Runs in a child process so each backend's RSS is measured on its own"""
+    from ats_scoring import cosine_scores, encode_texts
+    from sbert_backends import load_sbert_model
+
+    model = load_sbert_model(MODEL_NAME, backend)
+    encode_texts(model, texts[:batch_size], batch_size)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        vectors = encode_texts(model, texts, batch_size)
+    elapsed = time.perf_counter() - started
+    job_vector = encode_texts(model, [JOB_DESCRIPTION])[0]
+    return {
+        "backend": backend,
+        "resumes_per_second": len(texts) * repeat / elapsed,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "torch_loaded": 'torch' in sys.modules,
+        "scores": cosine_scores(vectors, job_vector),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SBERT inference backends")
+    parser.add_argument("--resumes", default="temp_uploads", help="directory of resume PDFs or .txt files")
+    parser.add_argument("--backends", nargs="+", default=list(SBERT_BACKENDS), choices=SBERT_BACKENDS)
+    parser.add_argument("--repeat", type=int, default=3, help="times to encode the whole set")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--export", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.export:
+        from sbert_backends import load_sbert_model
+        load_sbert_model(MODEL_NAME, args.export)
+        return
+
+    texts = load_resumes(args.resumes)
+    if not texts:
+        sys.exit(f"No resumes found in {args.resumes}")
+
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, texts, args.repeat, args.batch_size)))
+        return
+
+    backends = ['torch'] + [b for b in args.backends if b != 'torch']
+    results = {}
+    for backend in backends:
+        if backend.startswith('onnx'):
+            subprocess.run([sys.executable, __file__, "--resumes", args.resumes, "--export", backend],
+                           check=True, capture_output=True)
+        output = subprocess.run([sys.executable, __file__, "--resumes", args.resumes, "--repeat", str(args.repeat),
+                                 "--batch-size", str(args.batch_size), "--worker", backend],
+                                check=True, capture_output=True, text=True).stdout
+        results[backend] = json.loads(output.strip().splitlines()[-1])
+
+    reference = results['torch']['scores']
+    print(f"📊 {len(texts)} resumes x {args.repeat} runs, batch size {args.batch_size}\n")
+    print(f"{'backend':<12}{'resumes/s':>11}{'speedup':>9}{'peak RSS MB':>13}{'torch':>7}{'max Δ score':>13}"
+          f"{'tolerance':>11}")
+    failed = False
+    for backend in backends:
+        result = results[backend]
+        drift = max(abs(a - b) for a, b in zip(result['scores'], reference))
+        within = drift <= SCORE_TOLERANCE[backend]
+        failed = failed or not within
+        print(f"{backend:<12}{result['resumes_per_second']:>11.1f}"
+              f"{result['resumes_per_second'] / results['torch']['resumes_per_second']:>8.2f}x"
+              f"{result['peak_rss_mb']:>13.0f}{'yes' if result['torch_loaded'] else 'no':>7}{drift:>13.2f}{SCORE_TOLERANCE[backend]:>10.1f}{'' if within else ' ❌'}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import hnswlib
+    ANN_AVAILABLE = True
+except ImportError:
+    ANN_AVAILABLE = False
+
+DEFAULT_CANDIDATE_INDEX_DIR = os.getenv('CANDIDATE_INDEX_DIR', os.path.join('instance', 'candidate_index'))
+DEFAULT_CANDIDATE_TOP_K = int(os.getenv('CANDIDATE_TOP_K', 10))
+# Use an HNSW graph (needs hnswlib) instead of an exact scan once the index has this many live rows
+DEFAULT_ANN_MIN_ROWS = int(os.getenv('CANDIDATE_INDEX_ANN_MIN_ROWS', 50000))
+ANN_ENABLED = os.getenv('CANDIDATE_INDEX_ANN', 'false').lower() == 'true'
+# Rewrite the vector file once this share of its rows belongs to deleted candidates
+COMPACT_RATIO = 0.25
+
+
+class CandidateIndex:
+    """Persistent index of validated resume embeddings for job-to-candidate search.
+
+    Vectors are unit-length float32 rows appended to ``vectors.f32`` and read
+    back through a memory map, so a cold start costs no parsing. ``ids.json``
+    maps each row to its PDF hash and filename; deleted rows are tombstones
+    until the file is compacted. Writers from several worker processes are
+    serialized with a file lock, and readers remap when the manifest changes.
+    """
+
+    def __init__(self, directory=None, ann=None, ann_min_rows=None):
+        self.directory = directory or DEFAULT_CANDIDATE_INDEX_DIR
+        self.vectors_path = os.path.join(self.directory, 'vectors.f32')
+        self.manifest_path = os.path.join(self.directory, 'ids.json')
+        self.lock_path = os.path.join(self.directory, '.lock')
+        self.ann = (ANN_ENABLED if ann is None else ann) and ANN_AVAILABLE
+        self.ann_min_rows = DEFAULT_ANN_MIN_ROWS if ann_min_rows is None else ann_min_rows
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._loaded_version = None
+        self._manifest = self._empty_manifest(None, 0)
+        self._matrix = None
+        self._rows = {}
+        self._dead = np.empty(0, dtype=np.int64)
+        self._graph = None
+        self._writing = False
+
+    @staticmethod
+    def _empty_manifest(model_name, dim):
+        return {'model': model_name, 'dim': dim, 'ids': []}
+
+    def _file_lock(self):
+        return _FileLock(self.lock_path)
+
+    @contextmanager
+    def _write_lock(self):
+        with self._lock, self._file_lock():
+            self._writing = True
+            try:
+                self._load()
+                yield
+            finally:
+                self._writing = False
+
+    def _manifest_version(self):
+        # The manifest is replaced on every change, so a new inode means new contents
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        """Remap the index if another process (or this one) changed it"""
+        version = self._manifest_version()
+        if version == self._loaded_version and (version is not None or self._matrix is None):
+            return
+        if self._writing:
+            self._read()
+        else:
+            # Hold the writers' lock so the manifest and vector file come from the same change
+            with self._file_lock():
+                self._read()
+
+    def _read(self):
+        version = self._manifest_version()
+        if version is None:
+            manifest = self._empty_manifest(None, 0)
+        else:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        rows, dim = len(manifest['ids']), manifest['dim']
+        matrix = None
+        if rows and dim:
+            # Rows past the manifest are a write that did not finish and are ignored
+            matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(rows, dim))
+        self._manifest, self._matrix, self._loaded_version = manifest, matrix, version
+        self._rows = {entry[0]: row for row, entry in enumerate(manifest['ids']) if entry}
+        self._dead = np.array([row for row, entry in enumerate(manifest['ids']) if not entry], dtype=np.int64)
+        self._graph = None
+
+    def _save(self, manifest):
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, self.manifest_path)
+
+    def add(self, digests, vectors, filenames, model_name):
+        """Add or replace candidates; vectors from a different model reset the index"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(digests), -1)
+        with self._write_lock():
+            manifest = self._manifest
+            if manifest['model'] != model_name or manifest['dim'] != vectors.shape[1]:
+                manifest = self._empty_manifest(model_name, vectors.shape[1])
+                self._replace_vectors(np.empty((0, vectors.shape[1]), dtype=np.float32))
+            else:
+                manifest = dict(manifest, ids=list(manifest['ids']))
+
+            rows = dict(self._rows) if manifest['ids'] else {}
+            new = {}
+            for digest, vector, filename in zip(digests, vectors, filenames):
+                if digest in rows:
+                    # Re-uploads keep the latest filename without growing the matrix
+                    manifest['ids'][rows[digest]] = [digest, filename]
+                else:
+                    new[digest] = (vector, filename)
+            if new:
+                with open(self.vectors_path, 'r+b' if os.path.exists(self.vectors_path) else 'wb') as f:
+                    # Drop any tail left by an interrupted append before writing
+                    f.truncate(len(manifest['ids']) * manifest['dim'] * 4)
+                    f.seek(0, os.SEEK_END)
+                    f.write(np.vstack([vector for vector, _ in new.values()]).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                manifest['ids'].extend([digest, filename] for digest, (_, filename) in new.items())
+            self._save(manifest)
+            self._load()
+        return len(new)
+
+    def delete(self, digests):
+        """Remove candidates, compacting the vector file when many rows are dead"""
+        with self._write_lock():
+            manifest = dict(self._manifest, ids=list(self._manifest['ids']))
+            removed = 0
+            for digest in digests:
+                row = self._rows.get(digest)
+                if row is not None:
+                    manifest['ids'][row] = None
+                    removed += 1
+            if not removed:
+                return 0
+            if manifest['ids'].count(None) > COMPACT_RATIO * len(manifest['ids']):
+                manifest = self._compact(manifest)
+            self._save(manifest)
+            self._load()
+            return removed
+
+    def _compact(self, manifest):
+        keep = [row for row, entry in enumerate(manifest['ids']) if entry]
+        vectors = np.array(self._matrix[keep]) if keep else np.empty((0, manifest['dim']), dtype=np.float32)
+        self._replace_vectors(vectors)
+        return dict(manifest, ids=[manifest['ids'][row] for row in keep])
+
+    def _replace_vectors(self, vectors):
+        # A new file rather than a rewrite: readers keep their old map until they remap
+        temp_path = self.vectors_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(vectors.tobytes())
+        os.replace(temp_path, self.vectors_path)
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._rows)
+
+    def __contains__(self, digest):
+        with self._lock:
+            self._load()
+            return digest in self._rows
+
+    def search(self, query_vector, k=None, model_name=None):
+        """Top-k live candidates as [{'digest', 'filename', 'score'}] with percent cosine scores"""
+        k = k or DEFAULT_CANDIDATE_TOP_K
+        with self._lock:
+            self._load()
+            manifest, matrix = self._manifest, self._matrix
+            if matrix is None or not self._rows or (model_name and manifest['model'] != model_name):
+                return []
+            query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+            if self.ann and len(self._rows) >= self.ann_min_rows:
+                rows, scores = self._search_graph(query, k)
+            else:
+                rows, scores = self._search_exact(matrix, query, k)
+            return [{'digest': manifest['ids'][row][0], 'filename': manifest['ids'][row][1],
+                     'score': round(float(score) * 100, 2)} for row, score in zip(rows, scores)]
+
+    def _search_exact(self, matrix, query, k):
+        scores = np.asarray(matrix @ query)
+        scores[self._dead] = -np.inf
+        k = min(k, len(self._rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return top.tolist(), scores[top].tolist()
+
+    def _search_graph(self, query, k):
+        if self._graph is None:
+            # Built from the memory map on first use after each remap
+            live = np.fromiter(self._rows.values(), dtype=np.int64)
+            graph = hnswlib.Index(space='ip', dim=self._manifest['dim'])
+            graph.init_index(max_elements=len(live), ef_construction=200, M=16)
+            graph.add_items(np.asarray(self._matrix[live]), live)
+            graph.set_ef(max(64, 2 * k))
+            self._graph = graph
+        labels, distances = self._graph.knn_query(query, k=min(k, len(self._rows)))
+        # hnswlib's inner-product distance is 1 - similarity
+        return labels[0].tolist(), (1.0 - distances[0]).tolist()
+
+    def stats(self):
+        with self._lock:
+            self._load()
+            return {'candidates': len(self._rows), 'rows': len(self._manifest['ids']),
+                    'dim': self._manifest['dim'], 'model': self._manifest['model'],
+                    'ann': bool(self.ann and len(self._rows) >= self.ann_min_rows)}
+
+
+class _FileLock:
+    """Exclusive lock on a file, shared between worker processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+_candidate_index = None
+_candidate_index_lock = threading.Lock()
+
+
+def get_candidate_index():
+    """Return the process-wide candidate index, or None when CANDIDATE_INDEX_DIR is set empty"""
+    global _candidate_index
+    if not DEFAULT_CANDIDATE_INDEX_DIR:
+        return None
+    with _candidate_index_lock:
+        if _candidate_index is None:
+            _candidate_index = CandidateIndex()
+        return _candidate_index
@@ -1,6 +1,9 @@
+import os
+import threading
 import mysql.connector
 from mysql.connector import Error
 import pymysql
+from connection_pool import ConnectionPool
 
 # Database Configuration
 DB_CONFIG = {
@@ -13,6 +16,29 @@ DB_CONFIG = {
     'autocommit': True
 }
 
+# Connection pool configuration (overridable through the environment)
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_TIMEOUT = 10.0
+
+_connection_pool = None
+_connection_pool_pid = None
+_connection_pool_lock = threading.Lock()
+
+def get_connection_pool():
+    """Return the process-wide MySQL connection pool, creating it on first use"""
+    global _connection_pool, _connection_pool_pid
+    with _connection_pool_lock:
+        # Forked workers must not share sockets with the parent process
+        if _connection_pool is None or _connection_pool_pid != os.getpid():
+            _connection_pool = ConnectionPool(
+                lambda: mysql.connector.connect(**DB_CONFIG),
+                size=int(os.getenv('DB_POOL_SIZE', DEFAULT_POOL_SIZE)),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT)),
+                health_check=os.getenv('DB_POOL_HEALTH_CHECK', 'true').lower() != 'false'
+            )
+            _connection_pool_pid = os.getpid()
+        return _connection_pool
+
 def get_db_connection():
     """Create and return a database connection"""
     try:
@@ -1,22 +1,48 @@
-from database_config import get_db_connection, get_pymysql_connection
+from database_config import get_connection_pool, get_pymysql_connection
 from mysql.connector import Error
 from datetime import datetime
 import json
+import os
+import threading
 
 class DatabaseHelper:
-    def __init__(self):
-        self.connection = None
+    def __init__(self, pool=None):
+        self._pool = pool
+        self._local = threading.local()
+    
+    @property
+    def pool(self):
+        """Connection pool backing this helper"""
+        # Resolved on every call so a helper created before a fork uses the child's own pool
+        return self._pool if self._pool is not None else get_connection_pool()
     
     def get_connection(self):
-        """Get database connection"""
-        if not self.connection or not self.connection.is_connected():
-            self.connection = get_db_connection()
-        return self.connection
+        """Get the pooled connection checked out for the current request/thread"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and getattr(self._local, 'pid', None) != os.getpid():
+            # Borrowed by the parent process before a fork; its socket belongs to the parent
+            connection = self._local.connection = None
+        if connection is None:
+            connection = self.pool.acquire()
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+    
+    def release_connection(self):
+        """Return the current request's connection to the pool"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            self._local.connection = None
+            if getattr(self._local, 'pid', None) == os.getpid():
+                self.pool.release(connection)
     
     def close_connection(self):
         """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        self.release_connection()
+    
+    def get_pool_stats(self):
+        """Get connection pool saturation metrics"""
+        return self.pool.stats()
     
     # User Management
     def create_user(self, email, password, role='employee'):
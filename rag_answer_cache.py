@@ -0,0 +1,169 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from resume_cache import file_digest
+
+DEFAULT_ANSWER_CACHE_PATH = os.getenv('RAG_ANSWER_CACHE_PATH', os.path.join('instance', 'rag_answers.db'))
+DEFAULT_ANSWER_CACHE_TTL_HOURS = float(os.getenv('RAG_ANSWER_CACHE_TTL_HOURS', 24))
+# Cosine similarity above which a differently worded question gets the cached answer
+DEFAULT_ANSWER_CACHE_THRESHOLD = float(os.getenv('RAG_ANSWER_CACHE_THRESHOLD', 0.92))
+DEFAULT_ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('RAG_ANSWER_CACHE_MAX_ENTRIES', 5000))
+ANSWER_CACHE_ENABLED = os.getenv('RAG_ANSWER_CACHE', 'true').lower() == 'true'
+
+
+def normalize_question(question):
+    """Lowercase words only, so punctuation and spacing do not make a new cache key"""
+    return " ".join(re.findall(r"\w+", question.lower()))
+
+
+_csv_digests = {}
+_csv_digests_lock = threading.Lock()
+
+
+def knowledge_version(index, csv_path):
+    """Identifies the knowledge answers are based on: the index build and the current rag.csv"""
+    stat = os.stat(csv_path)
+    with _csv_digests_lock:
+        known = _csv_digests.get(csv_path)
+        if known is None or known[0] != (stat.st_mtime_ns, stat.st_size):
+            known = _csv_digests[csv_path] = ((stat.st_mtime_ns, stat.st_size), file_digest(csv_path))
+    return f"{index.embedding_name}:{index.manifest['vectors']}:{known[1][:16]}"
+
+
+class AnswerCache:
+    """Answers of the knowledge assistant, reused for repeated questions.
+
+    A question is looked up by its normalized text first, then by embedding
+    similarity to the cached questions. Entries expire after a TTL and belong
+    to one knowledge version; once the index is rebuilt or rag.csv changes,
+    older answers are dropped. The cache is a local SQLite file shared by the
+    worker processes, and so are its hit and miss counters.
+    """
+
+    def __init__(self, path=None, ttl_hours=None, threshold=None, max_entries=None):
+        self.path = path or DEFAULT_ANSWER_CACHE_PATH
+        self.ttl = (DEFAULT_ANSWER_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours) * 3600
+        self.threshold = DEFAULT_ANSWER_CACHE_THRESHOLD if threshold is None else threshold
+        self.max_entries = max_entries or DEFAULT_ANSWER_CACHE_MAX_ENTRIES
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._version = None
+        self._last_row = 0
+        self._ids = []
+        self._vectors = []
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = self._connect()
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL,
+                answer TEXT NOT NULL,
+                vector BLOB,
+                version TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        connection.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, name):
+        self._connect().execute("INSERT INTO counters (name, value) VALUES (?, 1) "
+                                "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def _sync(self, version):
+        """Load question vectors other workers cached; start over when the knowledge changed"""
+        connection = self._connect()
+        if version != self._version:
+            connection.execute("DELETE FROM answers WHERE version != ?", (version,))
+            self._version, self._last_row, self._ids, self._vectors = version, 0, [], []
+        rows = connection.execute(
+            "SELECT id, vector FROM answers WHERE id > ? AND version = ? AND vector IS NOT NULL ORDER BY id",
+            (self._last_row, version)).fetchall()
+        for row_id, vector in rows:
+            self._ids.append(row_id)
+            self._vectors.append(np.frombuffer(vector, dtype=np.float32))
+        if rows:
+            self._last_row = rows[-1][0]
+
+    def _fresh(self, where, params, version):
+        row = self._connect().execute(
+            f"SELECT answer FROM answers WHERE {where} AND version = ? AND created_at > ?",
+            (*params, version, time.time() - self.ttl)).fetchone()
+        return row[0] if row else None
+
+    def get(self, question, version, embed_query=None):
+        """(answer or None, question vector); the vector is computed only on an exact-match miss"""
+        answer = self._fresh("key = ?", (normalize_question(question),), version)
+        if answer is not None:
+            self._count('exact_hits')
+            return answer, None
+
+        vector = None
+        if embed_query is not None:
+            vector = np.asarray(embed_query(question), dtype=np.float32)
+            vector = vector / (np.linalg.norm(vector) or 1.0)
+            with self._lock:
+                self._sync(version)
+                ids, matrix = list(self._ids), np.vstack(self._vectors) if self._vectors else None
+            if matrix is not None and matrix.shape[1] == len(vector):
+                scores = matrix @ vector
+                for i in np.argsort(-scores):
+                    if scores[i] < self.threshold:
+                        break
+                    answer = self._fresh("id = ?", (ids[i],), version)
+                    if answer is not None:
+                        self._count('semantic_hits')
+                        return answer, vector
+        self._count('misses')
+        return None, vector
+
+    def put(self, question, answer, version, vector=None):
+        connection = self._connect()
+        blob = None if vector is None else np.asarray(vector, dtype=np.float32).tobytes()
+        connection.execute("INSERT OR REPLACE INTO answers (key, answer, vector, version, created_at) "
+                           "VALUES (?, ?, ?, ?, ?)",
+                           (normalize_question(question), answer, blob, version, time.time()))
+        connection.execute("DELETE FROM answers WHERE created_at <= ?", (time.time() - self.ttl,))
+        connection.execute("DELETE FROM answers WHERE id NOT IN "
+                           "(SELECT id FROM answers ORDER BY created_at DESC LIMIT ?)", (self.max_entries,))
+
+    def stats(self):
+        connection = self._connect()
+        counters = dict(connection.execute("SELECT name, value FROM counters").fetchall())
+        exact, semantic, misses = (counters.get(name, 0) for name in ('exact_hits', 'semantic_hits', 'misses'))
+        lookups = exact + semantic + misses
+        return {
+            'entries': connection.execute("SELECT COUNT(*) FROM answers").fetchone()[0],
+            'lookups': lookups,
+            'hits': exact + semantic,
+            'exact_hits': exact,
+            'semantic_hits': semantic,
+            'misses': misses,
+            'hit_rate': round((exact + semantic) / lookups, 4) if lookups else 0.0,
+        }
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """Return the process-wide answer cache"""
+    global _answer_cache
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            _answer_cache = AnswerCache()
+        return _answer_cache
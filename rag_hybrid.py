@@ -0,0 +1,238 @@
+import math
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import numpy as np
+
+from resume_tfidf import tokenize
+
+# Retrieval stages; dense is the vector search (Azure or local), bm25 the lexical index
+DEFAULT_RAG_DENSE = os.getenv('RAG_DENSE', 'true').lower() == 'true'
+DEFAULT_RAG_BM25 = os.getenv('RAG_BM25', 'true').lower() == 'true'
+DEFAULT_RAG_RERANK = os.getenv('RAG_RERANK', 'false').lower() == 'true'
+DEFAULT_RERANK_MODEL = os.getenv('RAG_RERANK_MODEL', 'cross-encoder/ms-marco-MiniLM-L-6-v2')
+# Hits each stage contributes to fusion, and at most how many of those the cross-encoder reads
+DEFAULT_RAG_CANDIDATES = int(os.getenv('RAG_CANDIDATES', 20))
+DEFAULT_RERANK_CANDIDATES = int(os.getenv('RAG_RERANK_CANDIDATES', 12))
+# Retrieval answers within this many milliseconds: a slower dense search is dropped for the
+# lexical hits, and the rerank is skipped when its expected cost does not fit what is left.
+# The local dense search embeds and scans in-process in tens of milliseconds; the Azure one is
+# two network calls (query embedding, then vector search) that often take several hundred
+DEFAULT_RAG_LATENCY_BUDGET_MS = {'local': 300.0, 'azure': 1000.0}
+# Dense searches one retriever runs at once; while all are busy, questions use the BM25 hits
+DEFAULT_RAG_DENSE_WORKERS = int(os.getenv('RAG_DENSE_WORKERS', 4))
+# Reciprocal rank fusion constant; larger values flatten the weight of the top ranks
+RRF_K = 60
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+class Bm25Index:
+    """Okapi BM25 over the chunks of a RAG index, as an in-memory inverted index.
+
+    Postings hold the chunk rows and term frequencies for each term, so a
+    query only touches the chunks that share a term with it. Tokens are the
+    ones the ATS TF-IDF uses, which keeps product terms like MDM, SSL and TLS
+    as exact matches.
+    """
+
+    def __init__(self, chunks, k1=BM25_K1, b=BM25_B):
+        self.chunks = chunks
+        postings = {}
+        lengths = []
+        for row, chunk in enumerate(chunks):
+            counts = Counter(tokenize(chunk.text))
+            lengths.append(sum(counts.values()))
+            for term, count in counts.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(row)
+                postings[term][1].append(count)
+        lengths = np.array(lengths, dtype=np.float32)
+        average = float(lengths.mean()) if len(chunks) else 0.0
+        # Per-row length normalization of the BM25 denominator, computed once
+        self._norm = k1 * (1 - b + b * lengths / (average or 1.0))
+        self._k1 = k1
+        n = len(chunks)
+        self._postings = {
+            term: (np.array(rows, dtype=np.int64), np.array(tfs, dtype=np.float32),
+                   math.log(1 + (n - len(rows) + 0.5) / (len(rows) + 0.5)))
+            for term, (rows, tfs) in postings.items()
+        }
+
+    def search(self, query, k):
+        """[(chunk, score)] best first, only chunks sharing a term with the query"""
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            rows, tfs, idf = posting
+            scores[rows] += idf * tfs * (self._k1 + 1) / (tfs + self._norm[rows])
+        matched = np.flatnonzero(scores)
+        top = matched[np.argsort(-scores[matched], kind='stable')][:k]
+        return [(self.chunks[i], float(scores[i])) for i in top]
+
+
+def latency_budget_ms(retriever='local'):
+    """RAG_LATENCY_BUDGET_MS, or the default for the local or azure dense search"""
+    return float(os.getenv('RAG_LATENCY_BUDGET_MS') or DEFAULT_RAG_LATENCY_BUDGET_MS[retriever])
+
+
+def reciprocal_rank_fusion(rankings, rrf_k=RRF_K):
+    """Merge ranked chunk lists by summed 1 / (rrf_k + rank); [(chunk, score)] best first"""
+    scores, chunks = {}, {}
+    for ranking in rankings:
+        for rank, chunk in enumerate(ranking, start=1):
+            scores[chunk.id] = scores.get(chunk.id, 0.0) + 1.0 / (rrf_k + rank)
+            chunks.setdefault(chunk.id, chunk)
+    order = sorted(scores, key=lambda chunk_id: -scores[chunk_id])
+    return [(chunks[chunk_id], scores[chunk_id]) for chunk_id in order]
+
+
+class CrossEncoderReranker:
+    """Scores (question, chunk) pairs with a small cross-encoder on CPU.
+
+    Keeps a running average of the cost per pair so the retriever can tell
+    whether a rerank still fits in its latency budget.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.ms_per_pair = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, model_name=None):
+        from sentence_transformers import CrossEncoder
+        return cls(CrossEncoder(model_name or DEFAULT_RERANK_MODEL, device='cpu'))
+
+    def expected_ms(self, pairs):
+        return 0.0 if self.ms_per_pair is None else self.ms_per_pair * pairs
+
+    def rerank(self, query, chunks):
+        """[(chunk, score)] best first"""
+        if not chunks:
+            return []
+        started = time.perf_counter()
+        scores = self.model.predict([(query, chunk.text) for chunk in chunks], show_progress_bar=False)
+        elapsed = (time.perf_counter() - started) * 1000 / len(chunks)
+        with self._lock:
+            self.ms_per_pair = elapsed if self.ms_per_pair is None else 0.8 * self.ms_per_pair + 0.2 * elapsed
+        order = np.argsort(-np.asarray(scores), kind='stable')
+        return [(chunks[i], float(scores[i])) for i in order]
+
+
+class HybridRetriever:
+    """Dense and BM25 retrieval fused by reciprocal rank, optionally reranked.
+
+    ``dense_search(query, k)`` returns ranked chunks from the vector store.
+    It runs on a worker thread while BM25 searches the inverted index, and
+    is waited on only for what is left of the latency budget. At most
+    ``dense_workers`` searches run at once, so a slow vector store cannot
+    pile up abandoned searches. Each stage can be turned off; with one
+    retrieval stage its ranking is used as is.
+    """
+
+    def __init__(self, index, dense_search=None, reranker=None, dense=None, bm25=None, rerank=None,
+                 candidates=None, rerank_candidates=None, budget_ms=None, dense_workers=None):
+        self.dense_search = dense_search
+        self.dense = (DEFAULT_RAG_DENSE if dense is None else dense) and dense_search is not None
+        self.bm25 = Bm25Index(index.chunks) if (DEFAULT_RAG_BM25 if bm25 is None else bm25) else None
+        self.reranker = reranker if (DEFAULT_RAG_RERANK if rerank is None else rerank) else None
+        if not self.dense and self.bm25 is None:
+            raise ValueError("Hybrid retrieval needs the dense or the bm25 stage")
+        self.candidates = candidates or DEFAULT_RAG_CANDIDATES
+        self.rerank_candidates = rerank_candidates or DEFAULT_RERANK_CANDIDATES
+        self.budget_ms = latency_budget_ms() if budget_ms is None else budget_ms
+        dense_workers = dense_workers or DEFAULT_RAG_DENSE_WORKERS
+        self._dense_slots = threading.BoundedSemaphore(dense_workers)
+        self._executor = ThreadPoolExecutor(dense_workers, thread_name_prefix='rag-dense') if self.dense else None
+
+    def retrieve(self, query, k, timings=None):
+        """[(chunk, score)] best first; per-stage milliseconds are added to ``timings``"""
+        timings = {} if timings is None else timings
+        started = time.perf_counter()
+
+        def elapsed():
+            return (time.perf_counter() - started) * 1000
+
+        dense_future = None
+        # Without lexical hits to fall back on, wait for a free dense worker
+        if self.dense and self._dense_slots.acquire(blocking=self.bm25 is None):
+            dense_future = self._executor.submit(self.dense_search, query, self.candidates)
+            dense_future.add_done_callback(lambda future: self._dense_slots.release())
+        elif self.dense:
+            timings['dense_skipped'] = elapsed()
+        rankings = []
+        if self.bm25 is not None:
+            rankings.append([chunk for chunk, _ in self.bm25.search(query, self.candidates)])
+            timings['bm25'] = elapsed()
+        if dense_future is not None:
+            # Without lexical hits to fall back on, wait for the dense search however long it takes
+            wait = max(self.budget_ms - elapsed(), 0) / 1000 if rankings else None
+            try:
+                rankings.append(dense_future.result(timeout=wait))
+                timings['dense'] = elapsed()
+            except TimeoutError:
+                dense_future.cancel()
+                timings['dense_skipped'] = elapsed()
+            except Exception as e:
+                if not rankings:
+                    raise
+                print(f"Error in dense retrieval: {e}")
+                timings['dense_skipped'] = elapsed()
+
+        if len(rankings) == 1:
+            fused = [(chunk, 1.0 / (RRF_K + rank)) for rank, chunk in enumerate(rankings[0], start=1)]
+        else:
+            fused = reciprocal_rank_fusion(rankings)
+            timings['fusion'] = elapsed()
+
+        if self.reranker is not None:
+            candidates = [chunk for chunk, _ in fused[:self.rerank_candidates]]
+            if elapsed() + self.reranker.expected_ms(len(candidates)) <= self.budget_ms:
+                fused = self.reranker.rerank(query, candidates)
+                timings['rerank'] = elapsed()
+            else:
+                timings['rerank_skipped'] = elapsed()
+        timings['total'] = elapsed()
+        return fused[:k]
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+
+def azure_dense_search(vectorstore, index):
+    """dense_search over Azure Search, mapping the returned documents back to the index chunks"""
+    from rag_index import Chunk, fingerprint
+    by_text = {chunk.text: chunk for chunk in index.chunks}
+
+    def search(query, k):
+        return [by_text.get(doc.page_content) or Chunk(fingerprint(doc.page_content, 'azure'), doc.page_content,
+                                                       doc.metadata)
+                for doc in vectorstore.similarity_search(query, k=k)]
+    return search
+
+
+def local_dense_search(store, embeddings):
+    """dense_search over a LocalVectorStore"""
+    def search(query, k):
+        return [chunk for chunk, _ in store.search(embeddings.embed_query(query), k)]
+    return search
+
+
+_reranker = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker():
+    """Return the process-wide cross-encoder, loaded on first use"""
+    global _reranker
+    with _reranker_lock:
+        if _reranker is None:
+            _reranker = CrossEncoderReranker.load()
+        return _reranker
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+RAG Index Build
+Splits rag.csv into chunks, embeds only chunks that are new or changed since
+the last build, and saves vectors plus a manifest under RAG_INDEX_DIR. With
+Azure Search configured it also uploads new chunks and removes stale ones, so
+the app only attaches to the index at startup.
+
+    python rag_index.py build            # after editing rag.csv
+    python rag_index.py status
+"""
+
+import argparse
+import base64
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from resume_cache import file_digest
+
+DEFAULT_RAG_CSV = os.getenv('RAG_CSV_PATH', 'rag.csv')
+DEFAULT_RAG_INDEX_DIR = os.getenv('RAG_INDEX_DIR', 'rag_index')
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 100
+AZURE_UPLOAD_BATCH = 500
+
+
+class Chunk:
+    def __init__(self, id, text, metadata):
+        self.id = id
+        self.text = text
+        self.metadata = metadata
+
+
+def split_text(text, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, separator="\n\n"):
+    """Split like langchain's CharacterTextSplitter: merge paragraphs up to chunk_size, overlapping by chunk_overlap"""
+    splits = [s for s in text.split(separator) if s]
+    chunks, current, total = [], [], 0
+    for split in splits:
+        joined = len(separator) if current else 0
+        if total + len(split) + joined > chunk_size and current:
+            chunk = separator.join(current).strip()
+            if chunk:
+                chunks.append(chunk)
+            while total > chunk_overlap or (total > 0 and total + len(split) + (len(separator) if current else 0) > chunk_size):
+                total -= len(current[0]) + (len(separator) if len(current) > 1 else 0)
+                current = current[1:]
+        current.append(split)
+        total += len(split) + (len(separator) if len(current) > 1 else 0)
+    chunk = separator.join(current).strip()
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def fingerprint(text, embedding_name):
+    """Chunk id: changes when the text or the embedding model changes"""
+    return hashlib.sha256(f"{embedding_name}\0{text}".encode()).hexdigest()
+
+
+def load_chunks(csv_path=None, embedding_name=''):
+    """Chunks of the knowledge base articles in rag.csv, in file order"""
+    chunks = []
+    with open(csv_path or DEFAULT_RAG_CSV, newline='', encoding='utf-8') as f:
+        for row_number, row in enumerate(csv.DictReader(f)):
+            text = f"Topic: {row['ki_topic']}\n{row['ki_text']}"
+            for part in split_text(text):
+                chunks.append(Chunk(fingerprint(part, embedding_name), part,
+                                    {'topic': row['ki_topic'], 'row': row_number}))
+    return chunks
+
+
+class HashingEmbeddings:
+    """Deterministic local stand-in for the Azure embedding deployment.
+
+    Hashes word unigrams into a fixed number of buckets; good enough to build
+    and query an index in tests and offline development without Azure.
+    """
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed_query(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            bucket = int.from_bytes(hashlib.md5(word.encode()).digest()[:4], 'little')
+            vector[bucket % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def azure_embedding_name():
+    return f"azure:{os.getenv('AZURE_OPENAI_DEPLOYMENT_EMBED')}"
+
+
+def azure_embeddings():
+    """The Azure OpenAI embedding deployment the app queries with"""
+    from langchain_openai import AzureOpenAIEmbeddings
+    return AzureOpenAIEmbeddings(
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT_EMBED"),
+        api_key=os.getenv("AZURE_OPENAI_API_KEY_EMBED"),
+        deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT_EMBED"),
+        api_version="2025-01-01-preview",
+        chunk_size=1000
+    )
+
+
+class RagIndex:
+    """A built index: chunk texts and metadata from the manifest, vectors memory-mapped"""
+
+    def __init__(self, directory, manifest, vectors):
+        self.directory = directory
+        self.manifest = manifest
+        self.vectors = vectors
+        self.chunks = [Chunk(c['id'], c['text'], c['metadata']) for c in manifest['chunks']]
+
+    @property
+    def embedding_name(self):
+        return self.manifest['embedding']
+
+    @property
+    def dim(self):
+        return self.manifest['dim']
+
+    @classmethod
+    def load(cls, directory=None):
+        """Attach to the last build, or None if the index was never built"""
+        directory = directory or DEFAULT_RAG_INDEX_DIR
+        try:
+            with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        vectors = np.empty((0, manifest['dim']), dtype=np.float32)
+        if manifest['chunks']:
+            vectors = np.memmap(os.path.join(directory, manifest['vectors']), dtype=np.float32, mode='r',
+                                shape=(len(manifest['chunks']), manifest['dim']))
+        return cls(directory, manifest, vectors)
+
+    def is_stale(self, csv_path=None):
+        """True when rag.csv changed after this index was built"""
+        return file_digest(csv_path or DEFAULT_RAG_CSV) != self.manifest['source_sha256']
+
+    def search(self, query_vector, k=4):
+        """Exact cosine search: [(chunk, score)] best first"""
+        if not self.chunks:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = np.asarray(self.vectors @ query)
+        top = np.argsort(-scores)[:k]
+        return [(self.chunks[i], float(scores[i])) for i in top]
+
+
+def azure_document_key(chunk_id):
+    # Same key encoding langchain's AzureSearch uses for the documents it uploads
+    return base64.urlsafe_b64encode(chunk_id.encode()).decode('ascii')
+
+
+def sync_azure_search(client, index):
+    """Make the Azure Search index hold exactly the chunks of a build; returns (uploaded, deleted)"""
+    from langchain_community.vectorstores.azuresearch import (FIELDS_CONTENT, FIELDS_CONTENT_VECTOR, FIELDS_ID,
+                                                              FIELDS_METADATA)
+    existing = {doc[FIELDS_ID] for doc in client.search(search_text="*", select=[FIELDS_ID])}
+    wanted = {azure_document_key(chunk.id): row for row, chunk in enumerate(index.chunks)}
+
+    uploads = [{
+        "@search.action": "upload",
+        FIELDS_ID: key,
+        FIELDS_CONTENT: index.chunks[row].text,
+        FIELDS_CONTENT_VECTOR: np.asarray(index.vectors[row], dtype=np.float32).tolist(),
+        FIELDS_METADATA: json.dumps(index.chunks[row].metadata),
+    } for key, row in wanted.items() if key not in existing]
+    deletes = [{FIELDS_ID: key} for key in existing if key not in wanted]
+
+    for start in range(0, len(uploads), AZURE_UPLOAD_BATCH):
+        client.upload_documents(documents=uploads[start:start + AZURE_UPLOAD_BATCH])
+    for start in range(0, len(deletes), AZURE_UPLOAD_BATCH):
+        client.delete_documents(documents=deletes[start:start + AZURE_UPLOAD_BATCH])
+    return len(uploads), len(deletes)
+
+
+def build_index(embeddings, embedding_name, csv_path=None, directory=None):
+    """Embed new or changed chunks, reuse the rest, and save the index; returns (index, stats)"""
+    csv_path = csv_path or DEFAULT_RAG_CSV
+    directory = directory or DEFAULT_RAG_INDEX_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    previous = RagIndex.load(directory)
+    known = {}
+    if previous is not None and previous.embedding_name == embedding_name:
+        known = {chunk.id: row for row, chunk in enumerate(previous.chunks)}
+
+    chunks = list({chunk.id: chunk for chunk in load_chunks(csv_path, embedding_name)}.values())
+    missing = [chunk for chunk in chunks if chunk.id not in known]
+    embedded = {}
+    if missing:
+        vectors = np.asarray(embeddings.embed_documents([chunk.text for chunk in missing]), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embedded = dict(zip((chunk.id for chunk in missing), vectors / norms))
+
+    rows = [embedded[c.id] if c.id in embedded else previous.vectors[known[c.id]] for c in chunks]
+    dim = len(rows[0]) if rows else (previous.dim if previous is not None else 0)
+    matrix = np.vstack(rows).astype(np.float32) if rows else np.empty((0, dim), dtype=np.float32)
+
+    # The manifest names its vector file, so a reader never pairs it with another build's vectors
+    vectors_name = f"vectors-{hashlib.sha256(matrix.tobytes()).hexdigest()[:16]}.f32"
+    with open(os.path.join(directory, vectors_name + '.tmp'), 'wb') as f:
+        f.write(matrix.tobytes())
+    os.replace(os.path.join(directory, vectors_name + '.tmp'), os.path.join(directory, vectors_name))
+
+    manifest = {
+        'embedding': embedding_name,
+        'dim': dim,
+        'vectors': vectors_name,
+        'source_sha256': file_digest(csv_path),
+        'built_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'chunks': [{'id': c.id, 'text': c.text, 'metadata': c.metadata} for c in chunks],
+    }
+    manifest_path = os.path.join(directory, 'manifest.json')
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    for name in os.listdir(directory):
+        if name.startswith('vectors-') and name != vectors_name:
+            os.remove(os.path.join(directory, name))
+
+    stats = {'chunks': len(chunks), 'embedded': len(missing), 'reused': len(chunks) - len(missing),
+             'removed': len(set(known) - {c.id for c in chunks})}
+    return RagIndex.load(directory), stats
+
+
+def azure_search_client(dim):
+    """Search client for the configured Azure Search index, creating the index if needed"""
+    from langchain_community.vectorstores import AzureSearch
+    vectorstore = AzureSearch(
+        azure_search_endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
+        azure_search_key=os.getenv("AZURE_SEARCH_ADMIN_KEY"),
+        index_name=os.getenv("AZURE_SEARCH_INDEX_NAME"),
+        # Only sizes the vector field when the index has to be created
+        embedding_function=lambda text: [0.0] * dim
+    )
+    return vectorstore.client
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the RAG knowledge base index")
+    parser.add_argument('command', nargs='?', default='build', choices=['build', 'status'])
+    parser.add_argument('--csv', default=None, help="knowledge base CSV (default: RAG_CSV_PATH or rag.csv)")
+    parser.add_argument('--dir', default=None, help="index directory (default: RAG_INDEX_DIR or rag_index)")
+    parser.add_argument('--embeddings', choices=['azure', 'hashing'], default='azure',
+                        help="hashing is a local stand-in for development without Azure")
+    parser.add_argument('--no-azure-search', action='store_true', help="do not sync the Azure Search index")
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        index = RagIndex.load(args.dir)
+        if index is None:
+            print("❌ No RAG index built yet")
+            return 1
+        state = "stale, rebuild" if index.is_stale(args.csv) else "up to date"
+        print(f"{len(index.chunks)} chunks, {index.embedding_name} ({index.dim}d), "
+              f"built {index.manifest['built_at']}, {state}")
+        return 0
+
+    if args.embeddings == 'hashing':
+        embeddings = HashingEmbeddings()
+        embedding_name = embeddings.name
+    else:
+        embeddings, embedding_name = azure_embeddings(), azure_embedding_name()
+
+    try:
+        index, stats = build_index(embeddings, embedding_name, args.csv, args.dir)
+        print(f"✅ {stats['chunks']} chunks: {stats['embedded']} embedded, "
+              f"{stats['reused']} reused, {stats['removed']} removed")
+        if args.embeddings == 'azure' and not args.no_azure_search:
+            uploaded, deleted = sync_azure_search(azure_search_client(index.dim), index)
+            print(f"✅ Azure Search: {uploaded} uploaded, {deleted} deleted")
+    except Exception as e:
+        print(f"❌ Error building RAG index: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
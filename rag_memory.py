@@ -0,0 +1,206 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MEMORY_PATH = os.getenv('RAG_MEMORY_PATH', os.path.join('instance', 'rag_conversations.db'))
+# Most recent turns kept word for word; older ones are folded into the summary
+DEFAULT_MEMORY_TURNS = int(os.getenv('RAG_MEMORY_TURNS', 6))
+# Estimated tokens of history (summary included) sent with a question
+DEFAULT_MEMORY_TOKENS = int(os.getenv('RAG_MEMORY_TOKENS', 1500))
+# Conversations idle for longer than this are forgotten
+DEFAULT_MEMORY_TTL_HOURS = float(os.getenv('RAG_MEMORY_TTL_HOURS', 12))
+# Longest summary kept when the summarizer is unavailable
+FALLBACK_SUMMARY_CHARS = 1200
+SUMMARY_QUESTION = "(summary of the earlier conversation)"
+
+
+def estimate_tokens(text):
+    # About four characters per token for English text with the OpenAI tokenizers
+    return len(text) // 4 + 1
+
+
+def new_conversation_id():
+    return uuid.uuid4().hex
+
+
+class ConversationMemory:
+    """Bounded per-session history for the knowledge assistant.
+
+    Each conversation keeps its last ``max_turns`` question/answer pairs
+    while they fit in ``max_tokens``; turns pushed out are compacted into a
+    running summary by ``summarize(summary, turns)``, which is sent ahead of
+    the recent turns. Compaction removes turns until half the budget is
+    used, so it runs every few questions rather than on each one, and it
+    runs on a background thread so the summarizer's LLM call is not part of
+    answering a question. Conversations live in a local SQLite file shared
+    by the worker processes.
+    """
+
+    def __init__(self, path=None, max_turns=None, max_tokens=None, ttl_hours=None, summarize=None):
+        self.path = path or DEFAULT_MEMORY_PATH
+        self.max_turns = max_turns or DEFAULT_MEMORY_TURNS
+        self.max_tokens = max_tokens or DEFAULT_MEMORY_TOKENS
+        self.ttl = (DEFAULT_MEMORY_TTL_HOURS if ttl_hours is None else ttl_hours) * 3600
+        self.summarize = summarize
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix='rag-memory')
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = self._connect()
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                id TEXT PRIMARY KEY,
+                summary TEXT NOT NULL DEFAULT '',
+                updated_at REAL NOT NULL
+            )
+        """)
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS turns (
+                id INTEGER PRIMARY KEY,
+                conversation_id TEXT NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                tokens INTEGER NOT NULL
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_turns_conversation ON turns (conversation_id, id)")
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _load(self, conversation_id):
+        connection = self._connect()
+        row = connection.execute("SELECT summary, updated_at FROM conversations WHERE id = ?",
+                                 (conversation_id,)).fetchone()
+        if row is None or row[1] < time.time() - self.ttl:
+            return '', []
+        turns = connection.execute("SELECT id, question, answer, tokens FROM turns WHERE conversation_id = ? "
+                                   "ORDER BY id", (conversation_id,)).fetchall()
+        return row[0], turns
+
+    def history(self, conversation_id):
+        """chat_history for ConversationalRetrievalChain: the summary as a first turn, then recent turns"""
+        if not conversation_id:
+            return []
+        summary, turns = self._load(conversation_id)
+        history = [(SUMMARY_QUESTION, summary)] if summary else []
+        return history + [(question, answer) for _, question, answer, _ in turns]
+
+    def append(self, conversation_id, question, answer):
+        connection = self._connect()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT updated_at FROM conversations WHERE id = ?",
+                                     (conversation_id,)).fetchone()
+            if row is not None and row[0] < now - self.ttl:
+                # Picking up an expired conversation starts it over
+                connection.execute("DELETE FROM turns WHERE conversation_id = ?", (conversation_id,))
+                connection.execute("UPDATE conversations SET summary = '' WHERE id = ?", (conversation_id,))
+            connection.execute("INSERT INTO conversations (id, updated_at) VALUES (?, ?) "
+                               "ON CONFLICT(id) DO UPDATE SET updated_at = excluded.updated_at",
+                               (conversation_id, now))
+            connection.execute("INSERT INTO turns (conversation_id, question, answer, tokens) VALUES (?, ?, ?, ?)",
+                               (conversation_id, question, answer, estimate_tokens(question + answer)))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        self._schedule_compaction(conversation_id)
+        if now - self._last_purge > 3600:
+            self._last_purge = now
+            self.purge()
+
+    def _schedule_compaction(self, conversation_id):
+        with self._lock:
+            if conversation_id in self._pending:
+                return
+            self._pending.add(conversation_id)
+        self._executor.submit(self._compact_pending, conversation_id)
+
+    def _compact_pending(self, conversation_id):
+        with self._lock:
+            self._pending.discard(conversation_id)
+        try:
+            self._compact(conversation_id)
+        except Exception as e:
+            print(f"Error compacting conversation: {e}")
+
+    def _compact(self, conversation_id):
+        summary, turns = self._load(conversation_id)
+        total = estimate_tokens(summary) + sum(turn[3] for turn in turns)
+        if len(turns) <= self.max_turns and total <= self.max_tokens:
+            return
+
+        # Fold the oldest turns into the summary until both limits hold with room to spare
+        folded = []
+        while turns and (len(turns) > self.max_turns or total > self.max_tokens // 2):
+            turn = turns.pop(0)
+            folded.append(turn)
+            total -= turn[3]
+        new_summary = self._summarize(summary, [(question, answer) for _, question, answer, _ in folded])
+
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have compacted the same turns meanwhile
+            current = connection.execute("SELECT summary FROM conversations WHERE id = ?",
+                                         (conversation_id,)).fetchone()
+            if current is not None and current[0] == summary:
+                connection.executemany("DELETE FROM turns WHERE id = ?", [(turn[0],) for turn in folded])
+                connection.execute("UPDATE conversations SET summary = ? WHERE id = ?", (new_summary, conversation_id))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _summarize(self, summary, turns):
+        if self.summarize is not None:
+            try:
+                return self.summarize(summary, turns).strip()
+            except Exception as e:
+                print(f"Error summarizing conversation: {e}")
+        # Without a summarizer keep the latest questions, which is what follow-ups refer back to
+        text = "\n".join([summary] + [f"Q: {question}" for question, _ in turns]).strip()
+        return text[-FALLBACK_SUMMARY_CHARS:]
+
+    def clear(self, conversation_id):
+        connection = self._connect()
+        connection.execute("DELETE FROM turns WHERE conversation_id = ?", (conversation_id,))
+        connection.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+
+    def close(self):
+        """Wait for scheduled compactions to finish"""
+        self._executor.shutdown()
+
+    def purge(self):
+        """Forget conversations idle for longer than the TTL"""
+        connection = self._connect()
+        cutoff = time.time() - self.ttl
+        connection.execute("DELETE FROM turns WHERE conversation_id IN "
+                           "(SELECT id FROM conversations WHERE updated_at < ?)", (cutoff,))
+        connection.execute("DELETE FROM conversations WHERE updated_at < ?", (cutoff,))
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_conversation_memory(summarize=None):
+    """Return the process-wide conversation memory; the first caller's summarizer is used"""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = ConversationMemory(summarize=summarize)
+        return _memory
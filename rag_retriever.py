@@ -0,0 +1,97 @@
+import os
+import threading
+
+import numpy as np
+
+from rag_index import HashingEmbeddings, RagIndex, azure_embeddings
+
+try:
+    import hnswlib
+    ANN_AVAILABLE = True
+except ImportError:
+    ANN_AVAILABLE = False
+
+RAG_RETRIEVERS = ('azure', 'local')
+DEFAULT_RAG_RETRIEVER = os.getenv('RAG_RETRIEVER', 'azure').lower()
+# Chunks handed to the answer chain per question; the same default as vectorstore.as_retriever()
+DEFAULT_RAG_TOP_K = int(os.getenv('RAG_TOP_K', 4))
+# Search an HNSW graph (needs hnswlib) instead of scanning every chunk once the index has this many
+DEFAULT_RAG_ANN_MIN_ROWS = int(os.getenv('RAG_ANN_MIN_ROWS', 20000))
+ANN_ENABLED = os.getenv('RAG_ANN', 'false').lower() == 'true'
+
+
+def query_embeddings(embedding_name):
+    """Embedding function matching the one an index was built with"""
+    if embedding_name.startswith('hashing-'):
+        return HashingEmbeddings(dim=int(embedding_name.split('-', 1)[1]))
+    return azure_embeddings()
+
+
+class LocalVectorStore:
+    """In-process nearest-neighbour search over a built RAG index.
+
+    The vectors stay memory-mapped from RAG_INDEX_DIR and are unit length, so
+    a query is one matrix-vector product. Large indexes can use an HNSW graph
+    built at load time. Nothing is written after construction, so one store
+    is shared by every request thread of a worker.
+    """
+
+    def __init__(self, index, ann=None, ann_min_rows=None):
+        self.index = index
+        ann = (ANN_ENABLED if ann is None else ann) and ANN_AVAILABLE
+        ann_min_rows = DEFAULT_RAG_ANN_MIN_ROWS if ann_min_rows is None else ann_min_rows
+        self._graph = None
+        if ann and len(index.chunks) >= ann_min_rows:
+            self._graph = hnswlib.Index(space='ip', dim=index.dim)
+            self._graph.init_index(max_elements=len(index.chunks), ef_construction=200, M=16)
+            self._graph.add_items(np.asarray(index.vectors), np.arange(len(index.chunks)))
+            self._graph.set_ef(100)
+
+    def search(self, query_vector, k=None):
+        """[(chunk, score)] best first"""
+        k = k or DEFAULT_RAG_TOP_K
+        if self._graph is None:
+            return self.index.search(query_vector, k)
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        labels, distances = self._graph.knn_query(query, k=min(k, len(self.index.chunks)))
+        # hnswlib's inner-product distance is 1 - similarity
+        return [(self.index.chunks[i], 1.0 - float(d)) for i, d in zip(labels[0], distances[0])]
+
+
+def chunk_retriever(retrieve, k=None):
+    """A langchain retriever for ConversationalRetrievalChain over ``retrieve(query, k)`` -> [(chunk, score)]"""
+    from typing import Any, List
+
+    from langchain.schema import BaseRetriever, Document
+
+    class ChunkRetriever(BaseRetriever):
+        retrieve: Any
+        k: int = DEFAULT_RAG_TOP_K
+
+        class Config:
+            arbitrary_types_allowed = True
+
+        def _get_relevant_documents(self, query, *, run_manager=None) -> List[Document]:
+            return [Document(page_content=chunk.text, metadata=dict(chunk.metadata, score=score))
+                    for chunk, score in self.retrieve(query, self.k)]
+
+        async def _aget_relevant_documents(self, query, *, run_manager=None) -> List[Document]:
+            return self._get_relevant_documents(query)
+
+    return ChunkRetriever(retrieve=retrieve, k=k or DEFAULT_RAG_TOP_K)
+
+
+_local_store = None
+_local_store_lock = threading.Lock()
+
+
+def get_local_vector_store():
+    """Return the process-wide local vector store, or None if the RAG index was never built"""
+    global _local_store
+    with _local_store_lock:
+        if _local_store is None:
+            index = RagIndex.load()
+            if index is not None:
+                _local_store = LocalVectorStore(index)
+        return _local_store
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_RESUME_CACHE_PATH = os.getenv('RESUME_CACHE_PATH', os.path.join('instance', 'resume_cache.db'))
+DEFAULT_RESUME_CACHE_MAX_MB = float(os.getenv('RESUME_CACHE_MAX_MB', 256))
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes, the cache key for an uploaded PDF"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_digest(source):
+    """SHA-256 of a resume given as a file path or as the PDF bytes held in memory"""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    return file_digest(source)
+
+
+class ResumeCache:
+    """Persistent cache of extracted resume text, validity and SBERT embeddings.
+
+    Entries are keyed by the SHA-256 of the PDF bytes and live in a local SQLite
+    file shared by every worker process. Embeddings are stored as float32 blobs
+    tagged with the model that produced them. Once the stored text and vectors
+    exceed ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or DEFAULT_RESUME_CACHE_PATH
+        self.max_bytes = max_bytes or int(DEFAULT_RESUME_CACHE_MAX_MB * 1024 * 1024)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS resumes (
+                sha256 TEXT PRIMARY KEY,
+                text TEXT,
+                valid INTEGER NOT NULL,
+                embedding BLOB,
+                embedding_model TEXT,
+                size INTEGER NOT NULL,
+                used_at REAL NOT NULL
+            )
+        """)
+        self._connect().execute("CREATE INDEX IF NOT EXISTS idx_resumes_used_at ON resumes (used_at)")
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def _touch(self, digests):
+        if digests:
+            placeholders = ', '.join('?' * len(digests))
+            self._connect().execute(f"UPDATE resumes SET used_at = ? WHERE sha256 IN ({placeholders})",
+                                    (time.time(), *digests))
+
+    def _select(self, columns, digests):
+        digests = list(dict.fromkeys(d for d in digests if d))
+        if not digests:
+            return []
+        placeholders = ', '.join('?' * len(digests))
+        return self._connect().execute(
+            f"SELECT sha256, {columns} FROM resumes WHERE sha256 IN ({placeholders})", digests).fetchall()
+
+    def get_texts(self, digests):
+        """Get {digest: text} for known PDFs; text is None for a PDF already judged invalid"""
+        rows = self._select("text, valid", digests)
+        found = {digest: text if valid else None for digest, text, valid in rows}
+        self._touch(list(found))
+        self._count(len(found), len(set(digests)) - len(found))
+        return found
+
+    def put_text(self, digest, text):
+        """Store the extraction verdict for a PDF"""
+        size = len(text.encode()) if text else 0
+        self._connect().execute("""
+            INSERT INTO resumes (sha256, text, valid, size, used_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(sha256) DO UPDATE SET text = excluded.text, valid = excluded.valid,
+                embedding = NULL, embedding_model = NULL, size = excluded.size, used_at = excluded.used_at
+        """, (digest, text, 1 if text else 0, size, time.time()))
+        self._evict()
+
+    def get_embeddings(self, digests, model_name):
+        """Get {digest: float32 vector} for resumes embedded by model_name"""
+        rows = self._select("embedding, embedding_model", digests)
+        found = {digest: np.frombuffer(blob, dtype=np.float32)
+                 for digest, blob, model in rows if blob is not None and model == model_name}
+        self._touch(list(found))
+        self._count(len(found), len(set(d for d in digests if d)) - len(found))
+        return found
+
+    def put_embeddings(self, embeddings, model_name):
+        """Store {digest: vector} embeddings for resumes whose text is cached"""
+        now = time.time()
+        rows = []
+        for digest, vector in embeddings.items():
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((blob, model_name, len(blob), now, digest))
+        self._connect().executemany("""
+            UPDATE resumes SET embedding = ?, embedding_model = ?,
+                size = COALESCE(length(CAST(text AS BLOB)), 0) + ?, used_at = ?
+            WHERE sha256 = ?
+        """, rows)
+        self._evict()
+
+    def _evict(self):
+        # Keep the most recently used entries whose sizes add up to max_bytes
+        self._connect().execute("""
+            DELETE FROM resumes WHERE sha256 IN (
+                SELECT sha256 FROM (
+                    SELECT sha256, SUM(size) OVER (ORDER BY used_at DESC, sha256) AS running FROM resumes
+                ) WHERE running > ?
+            )
+        """, (self.max_bytes,))
+
+    def stats(self):
+        entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM resumes").fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses,
+                    'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0}
+
+
+_resume_cache = None
+_resume_cache_lock = threading.Lock()
+
+
+def get_resume_cache():
+    """Return the process-wide resume cache, or None when RESUME_CACHE_PATH is set empty"""
+    global _resume_cache
+    if not DEFAULT_RESUME_CACHE_PATH:
+        return None
+    with _resume_cache_lock:
+        if _resume_cache is None:
+            _resume_cache = ResumeCache()
+        return _resume_cache
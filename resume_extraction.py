@@ -0,0 +1,262 @@
+import io
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from resume_cache import source_digest
+
+try:
+    import fitz
+    PDF_DEPENDENCIES_AVAILABLE = True
+except ImportError:
+    PDF_DEPENDENCIES_AVAILABLE = False
+
+try:
+    from pdfminer.high_level import extract_text
+    PDFMINER_AVAILABLE = True
+except ImportError:
+    PDFMINER_AVAILABLE = False
+
+# Resumes containing an image larger than this many pixels are rejected (scanned or designed CVs)
+MIN_IMAGE_PIXEL_AREA = 10000
+# Shorter extractions are not usable resumes
+MIN_RESUME_CHARS = 100
+# Retry with pdfminer when PyMuPDF finds too little text (slower, better on some layouts)
+PDFMINER_FALLBACK = os.getenv('RESUME_PDFMINER_FALLBACK', 'false').lower() == 'true'
+
+# Seconds one PDF may take before it is reported as invalid
+DEFAULT_EXTRACT_TIMEOUT = float(os.getenv('RESUME_EXTRACT_TIMEOUT', 30))
+DEFAULT_EXTRACT_WORKERS = int(os.getenv('RESUME_EXTRACT_WORKERS', os.cpu_count() or 1))
+# Pools are created (and retired pools replaced) from request threads, so never fork the
+# multithreaded app itself: forkserver workers fork from a clean single-threaded server
+DEFAULT_START_METHOD = os.getenv('RESUME_EXTRACT_START_METHOD',
+                                 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+# Extra time the parent waits for a batch beyond the per-file timeouts
+DEADLINE_GRACE = 5.0
+
+
+def _has_large_image(page, min_pixel_area, seen):
+    # get_images reports each image's stored width and height, so nothing is decoded
+    for img in page.get_images(full=True):
+        xref, width, height = img[0], img[2], img[3]
+        if xref in seen:
+            continue
+        seen.add(xref)
+        if width * height > min_pixel_area:
+            return True
+    return False
+
+
+def open_pdf(source):
+    """Open a PDF from a path, or straight from bytes for uploads kept in memory"""
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def describe_source(source):
+    if isinstance(source, (bytes, bytearray)):
+        return f"<{len(source)} byte upload>"
+    return os.path.basename(source)
+
+
+def pdf_contains_large_images(pdf_path, min_pixel_area=MIN_IMAGE_PIXEL_AREA):
+    if not PDF_DEPENDENCIES_AVAILABLE:
+        raise Exception("AI dependencies not available")
+    with open_pdf(pdf_path) as doc:
+        seen = set()
+        return any(_has_large_image(page, min_pixel_area, seen) for page in doc)
+
+
+def extract_resume_text(pdf_path, min_pixel_area=MIN_IMAGE_PIXEL_AREA, pdfminer_fallback=None):
+    """Open the PDF once, rejecting it on the first large image and collecting page text otherwise.
+
+    pdf_path may also be the PDF's bytes.
+    """
+    if not PDF_DEPENDENCIES_AVAILABLE:
+        raise Exception("AI dependencies not available")
+    pages = []
+    with open_pdf(pdf_path) as doc:
+        seen = set()
+        for page in doc:
+            if _has_large_image(page, min_pixel_area, seen):
+                return None
+            pages.append(page.get_text("text"))
+    text = "".join(pages).strip()
+
+    if pdfminer_fallback is None:
+        pdfminer_fallback = PDFMINER_FALLBACK
+    if len(text) <= MIN_RESUME_CHARS and pdfminer_fallback and PDFMINER_AVAILABLE:
+        text = extract_text(io.BytesIO(pdf_path) if isinstance(pdf_path, (bytes, bytearray)) else pdf_path).strip()
+    return text if len(text) > MIN_RESUME_CHARS else None
+
+
+class ExtractionTimeout(Exception):
+    """Raised inside a worker when one PDF runs past its timeout"""
+
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+
+def _extract_with_timeout(extractor, pdf_path, timeout):
+    """Run in a worker process and return (text, completed).
+
+    A PDF that fails or runs too long counts as invalid, but is not completed so
+    its verdict is not cached.
+    """
+    use_alarm = hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extractor(pdf_path), True
+    except ExtractionTimeout:
+        print(f"Resume extraction timed out after {timeout:.0f}s: {describe_source(pdf_path)}")
+        return None, False
+    except Exception as e:
+        print(f"Error extracting resume {describe_source(pdf_path)}: {e}")
+        return None, False
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ExtractionPool:
+    """Process pool that extracts resume text on every core.
+
+    Each file gets ``timeout`` seconds inside its worker. As a backstop for parsers
+    stuck in native code, the parent gives each batch enough rounds of ``timeout``
+    for its own files and the ones already queued ahead of it; files still running
+    after that are reported as invalid. The pool with the stuck worker is retired:
+    new batches go to a fresh pool, and the old one is terminated once the last
+    batch using it has returned.
+    """
+
+    def __init__(self, workers=None, timeout=None, start_method=None):
+        self.workers = max(1, workers or DEFAULT_EXTRACT_WORKERS)
+        self.timeout = timeout or DEFAULT_EXTRACT_TIMEOUT
+        self.start_method = start_method or DEFAULT_START_METHOD
+        self._pool = None
+        # Batches and files in flight per pool, retired pools included
+        self._usage = {}
+        self._lock = threading.Lock()
+
+    def _current_pool(self):
+        # Called with self._lock held
+        if self._pool is None:
+            context = multiprocessing.get_context(self.start_method)
+            if self.start_method == 'forkserver':
+                # Workers fork with the PDF libraries already imported
+                context.set_forkserver_preload([__name__])
+            self._pool = context.Pool(self.workers)
+            self._usage[self._pool] = [0, 0]
+        return self._pool
+
+    def _acquire(self, files):
+        """Check out the current pool for a batch; returns the pool and the files queued ahead"""
+        with self._lock:
+            pool = self._current_pool()
+            usage = self._usage[pool]
+            queued = usage[1]
+            usage[0] += 1
+            usage[1] += files
+        return pool, queued
+
+    def _release(self, pool, files, stuck):
+        with self._lock:
+            if stuck and self._pool is pool:
+                self._pool = None
+            usage = self._usage[pool]
+            usage[0] -= 1
+            usage[1] -= files
+            retired = self._pool is not pool and usage[0] == 0
+            if retired:
+                del self._usage[pool]
+        if retired:
+            pool.terminate()
+
+    def start(self):
+        """Start the worker processes now instead of on the first upload"""
+        with self._lock:
+            self._current_pool()
+
+    def map(self, pdf_paths, extractor=extract_resume_text):
+        """Extract text from every PDF, returning text or None per file in the same order"""
+        return [text for text, _ in self.map_with_status(pdf_paths, extractor)]
+
+    def map_with_status(self, pdf_paths, extractor=extract_resume_text):
+        """Like map, but returns (text, completed) pairs; completed is False for errors and timeouts"""
+        pdf_paths = list(pdf_paths)
+        if not pdf_paths:
+            return []
+
+        pool, queued = self._acquire(len(pdf_paths))
+        results, stuck = [], False
+        try:
+            pending = [pool.apply_async(_extract_with_timeout, (extractor, path, self.timeout)) for path in pdf_paths]
+            rounds = math.ceil((queued + len(pdf_paths)) / self.workers)
+            deadline = time.monotonic() + rounds * self.timeout + DEADLINE_GRACE
+            for path, result in zip(pdf_paths, pending):
+                try:
+                    results.append(result.get(max(0.0, deadline - time.monotonic())))
+                except multiprocessing.TimeoutError:
+                    print(f"Resume extraction did not finish in time: {describe_source(path)}")
+                    results.append((None, False))
+                    stuck = True
+        finally:
+            self._release(pool, len(pdf_paths), stuck)
+        return results
+
+    def close(self):
+        with self._lock:
+            pools, self._pool, self._usage = list(self._usage), None, {}
+        for pool in pools:
+            pool.terminate()
+
+
+_extraction_pool = None
+_extraction_pool_pid = None
+_extraction_pool_lock = threading.Lock()
+
+
+def get_extraction_pool():
+    """Return the process-wide extraction pool, creating it on first use"""
+    global _extraction_pool, _extraction_pool_pid
+    with _extraction_pool_lock:
+        if _extraction_pool is None or _extraction_pool_pid != os.getpid():
+            _extraction_pool = ExtractionPool()
+            _extraction_pool_pid = os.getpid()
+        return _extraction_pool
+
+
+def extract_resume_texts(pdf_paths):
+    """Extract all uploaded resumes in parallel, in upload order"""
+    return get_extraction_pool().map(pdf_paths)
+
+
+def extract_resumes(pdf_paths, cache=None):
+    """Return (sha256, text) per PDF in upload order.
+
+    Each PDF is a path or, for small uploads kept in memory, its bytes. PDFs
+    whose bytes were seen before are answered from the cache; only new ones
+    are parsed, each distinct file once.
+    """
+    pdf_paths = list(pdf_paths)
+    digests = [source_digest(path) for path in pdf_paths]
+    texts = cache.get_texts(digests) if cache is not None else {}
+
+    todo = {}
+    for digest, path in zip(digests, pdf_paths):
+        if digest not in texts:
+            todo.setdefault(digest, path)
+    results = get_extraction_pool().map_with_status(todo.values())
+    for digest, (text, completed) in zip(todo, results):
+        texts[digest] = text
+        if completed and cache is not None:
+            cache.put_text(digest, text)
+    return [(digest, texts[digest]) for digest in digests]
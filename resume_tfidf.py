@@ -0,0 +1,195 @@
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+
+import numpy as np
+
+try:
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+except ImportError:
+    ENGLISH_STOP_WORDS = frozenset("""
+        a about above after again against all also am an and any are as at be because been before being below
+        between both but by can cannot could did do does doing down during each few for from further had has
+        have having he her here hers herself him himself his how i if in into is it its itself just me more
+        most my myself no nor not now of off on once only or other our ours ourselves out over own same she
+        should so some such than that the their theirs them themselves then there these they this those
+        through to too under until up very was we were what when where which while who whom why will with
+        would you your yours yourself yourselves
+    """.split())
+
+DEFAULT_TFIDF_MODEL_PATH = os.getenv('TFIDF_MODEL_PATH', os.path.join('instance', 'tfidf.db'))
+# IDF weights are recomputed once the corpus has grown by this fraction
+DEFAULT_TFIDF_REFRESH_RATIO = float(os.getenv('TFIDF_REFRESH_RATIO', 0.05))
+# Below this many resumes every new one refreshes the IDF weights
+MIN_STABLE_CORPUS = 1000
+
+# Same tokens as scikit-learn's TfidfVectorizer defaults
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in ENGLISH_STOP_WORDS]
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class TfidfModel:
+    """Corpus-level TF-IDF over every resume the ATS has seen.
+
+    Each resume is tokenized once; its term counts are stored in a local
+    SQLite file shared by the worker processes and its L2-normalized TF-IDF
+    vector is cached until the IDF weights change. Document frequencies are
+    updated as resumes arrive, and the IDF weights are refreshed when the
+    corpus has grown by ``refresh_ratio``, so scoring a request only
+    vectorizes the job description. IDF is smoothed as in scikit-learn:
+    ln((1 + n) / (1 + df)) + 1. Job description terms that no resume contains
+    still count toward its norm, as they did when the description was fitted
+    together with the resumes, which keeps scores on the same scale.
+    """
+
+    def __init__(self, path=None, refresh_ratio=None):
+        self.path = DEFAULT_TFIDF_MODEL_PATH if path is None else path
+        self.refresh_ratio = DEFAULT_TFIDF_REFRESH_RATIO if refresh_ratio is None else refresh_ratio
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._vocabulary = {}
+        self._df = []
+        self._docs = {}
+        self._last_row = 0
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._idf_docs = 0
+        self._generation = 0
+        self._vectors = {}
+        if self.path:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._connect().execute("""
+                CREATE TABLE IF NOT EXISTS docs (
+                    id INTEGER PRIMARY KEY,
+                    key TEXT UNIQUE NOT NULL,
+                    counts TEXT NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _index(self, key, counts):
+        ids = []
+        for term in counts:
+            term_id = self._vocabulary.get(term)
+            if term_id is None:
+                term_id = self._vocabulary[term] = len(self._df)
+                self._df.append(0)
+            self._df[term_id] += 1
+            ids.append(term_id)
+        self._docs[key] = (np.array(ids, dtype=np.int64), np.array(list(counts.values()), dtype=np.float32))
+
+    def _sync(self):
+        """Pick up resumes other worker processes added"""
+        if not self.path:
+            return
+        rows = self._connect().execute("SELECT id, key, counts FROM docs WHERE id > ? ORDER BY id",
+                                       (self._last_row,)).fetchall()
+        for row_id, key, counts in rows:
+            if key not in self._docs:
+                self._index(key, json.loads(counts))
+            self._last_row = row_id
+
+    def add(self, texts):
+        """Add resumes to the corpus, tokenizing only ones not seen before; returns their keys"""
+        keys = [text_key(text) for text in texts]
+        with self._lock:
+            self._sync()
+            new = {}
+            for key, text in zip(keys, texts):
+                if key not in self._docs and key not in new:
+                    new[key] = Counter(tokenize(text))
+            if new and self.path:
+                self._connect().executemany("INSERT OR IGNORE INTO docs (key, counts) VALUES (?, ?)",
+                                            [(key, json.dumps(counts)) for key, counts in new.items()])
+            for key, counts in new.items():
+                self._index(key, counts)
+        return keys
+
+    def _refresh(self):
+        n = len(self._docs)
+        if n == self._idf_docs:
+            return
+        if self._idf_docs >= MIN_STABLE_CORPUS and n <= self._idf_docs * (1 + self.refresh_ratio):
+            return
+        df = np.array(self._df, dtype=np.float64)
+        self._idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+        self._idf_docs = n
+        self._generation += 1
+        self._vectors = {}
+
+    def _term_idf(self, ids, idf, unseen):
+        # Terms that arrived after the last refresh are weighted as if no resume had them
+        weights = np.full(len(ids), unseen, dtype=np.float32)
+        known = ids < len(idf)
+        weights[known] = idf[ids[known]]
+        return weights
+
+    def _vector(self, key, idf, unseen, generation):
+        cached = self._vectors.get(key)
+        if cached is not None and cached[0] == generation:
+            return cached[1], cached[2]
+        ids, counts = self._docs[key]
+        weights = counts * self._term_idf(ids, idf, unseen)
+        norm = float(np.linalg.norm(weights))
+        if norm:
+            weights /= norm
+        self._vectors[key] = (generation, ids, weights)
+        return ids, weights
+
+    def similarities(self, resume_texts, job_description):
+        """Percent cosine similarity of each resume to the job description"""
+        keys = self.add(list(resume_texts))
+        with self._lock:
+            self._refresh()
+            idf, generation, vocabulary_size = self._idf, self._generation, len(self._df)
+            unseen = math.log(1 + self._idf_docs) + 1
+            vectors = [self._vector(key, idf, unseen, generation) for key in keys]
+            query_terms = Counter(tokenize(job_description))
+            query_ids = np.array([self._vocabulary.get(term, -1) for term in query_terms], dtype=np.int64)
+
+        counts = np.array(list(query_terms.values()), dtype=np.float32)
+        known = query_ids >= 0
+        weights = counts * unseen
+        weights[known] = counts[known] * self._term_idf(query_ids[known], idf, unseen)
+        norm = float(np.linalg.norm(weights))
+        query = np.zeros(vocabulary_size, dtype=np.float32)
+        if norm:
+            query[query_ids[known]] = weights[known] / norm
+        return [round(float(query[ids] @ doc_weights) * 100, 2) for ids, doc_weights in vectors]
+
+    def stats(self):
+        with self._lock:
+            return {'documents': len(self._docs), 'terms': len(self._df),
+                    'idf_documents': self._idf_docs, 'generation': self._generation}
+
+
+_tfidf_model = None
+_tfidf_model_lock = threading.Lock()
+
+
+def get_tfidf_model():
+    """Return the process-wide TF-IDF model, kept in memory only when TFIDF_MODEL_PATH is set empty"""
+    global _tfidf_model
+    with _tfidf_model_lock:
+        if _tfidf_model is None:
+            _tfidf_model = TfidfModel()
+        return _tfidf_model
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+
+# Uploads up to this size are kept in memory and handed to PyMuPDF as bytes
+DEFAULT_IN_MEMORY_MAX_BYTES = int(float(os.getenv('RESUME_IN_MEMORY_MAX_KB', 512)) * 1024)
+# Parent directory for spool directories (default: the system temp dir)
+DEFAULT_SPOOL_DIR = os.getenv('RESUME_SPOOL_DIR') or None
+
+COPY_CHUNK_BYTES = 64 * 1024
+
+
+def spool_upload(upload, path):
+    """Stream an uploaded file to path in chunks and return the bytes written"""
+    stream = upload.stream
+    written = 0
+    with open(path, 'wb') as f:
+        for chunk in iter(lambda: stream.read(COPY_CHUNK_BYTES), b''):
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+class UploadSpool:
+    """One request's uploaded resumes, removed when the request is done.
+
+    Small PDFs are read into memory; larger ones are streamed into uniquely
+    named files in a private spool directory. ``add`` returns what the
+    extraction functions accept: the bytes or the spooled path.
+    """
+
+    def __init__(self, directory=None, in_memory_max=None):
+        self.in_memory_max = DEFAULT_IN_MEMORY_MAX_BYTES if in_memory_max is None else in_memory_max
+        self._parent = directory or DEFAULT_SPOOL_DIR
+        self.path = None
+        self._count = 0
+
+    def add(self, upload):
+        stream = upload.stream
+        head = stream.read(self.in_memory_max + 1)
+        if len(head) <= self.in_memory_max:
+            return head
+
+        if self.path is None:
+            if self._parent:
+                os.makedirs(self._parent, exist_ok=True)
+            self.path = tempfile.mkdtemp(prefix='resumes-', dir=self._parent)
+        # Named by position: client filenames may collide or contain path separators
+        path = os.path.join(self.path, f"{self._count}.pdf")
+        self._count += 1
+        with open(path, 'wb') as f:
+            f.write(head)
+            shutil.copyfileobj(stream, f, COPY_CHUNK_BYTES)
+        return path
+
+    def close(self):
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
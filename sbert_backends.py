@@ -0,0 +1,147 @@
+import json
+import os
+
+import numpy as np
+
+SBERT_BACKENDS = ('torch', 'int8', 'onnx', 'onnx-int8')
+DEFAULT_SBERT_BACKEND = os.getenv('SBERT_BACKEND', 'torch').lower()
+DEFAULT_ONNX_DIR = os.getenv('SBERT_ONNX_DIR', os.path.join('instance', 'onnx'))
+
+# Largest accepted difference from the fp32 torch model, in score percentage points,
+# for the same resume and job description (checked by benchmark_sbert_backends.py)
+SCORE_TOLERANCE = {'torch': 0.0, 'onnx': 0.1, 'int8': 2.0, 'onnx-int8': 2.0}
+
+
+def embedding_model_name(model_name, backend):
+    """Name stored with cached embeddings, so vectors from different backends are never mixed"""
+    return model_name if backend == 'torch' else f"{model_name}:{backend}"
+
+
+def load_sbert_model(model_name, backend=None):
+    """Load a SentenceTransformer for CPU inference with the configured backend.
+
+    torch is the full-precision model. int8 applies PyTorch dynamic int8
+    quantization to its Linear layers. onnx and onnx-int8 export the
+    transformer to ONNX once (under SBERT_ONNX_DIR) and run it with ONNX
+    Runtime, the latter with int8 weights. Once exported they load only the
+    tokenizer and the ONNX file, without torch.
+    """
+    backend = (backend or DEFAULT_SBERT_BACKEND).lower()
+    if backend not in SBERT_BACKENDS:
+        raise ValueError(f"Unknown SBERT backend '{backend}', expected one of {', '.join(SBERT_BACKENDS)}")
+    if backend in ('onnx', 'onnx-int8'):
+        encoder = OnnxSentenceEncoder.from_export(model_name, quantize=backend == 'onnx-int8')
+        if encoder is not None:
+            return encoder
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name, device='cpu')
+    if backend == 'torch':
+        return model
+    if backend == 'int8':
+        import torch
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return OnnxSentenceEncoder.from_sentence_transformer(model, model_name, quantize=backend == 'onnx-int8')
+
+
+def onnx_export_dir(model_name, directory=None):
+    return os.path.join(directory or DEFAULT_ONNX_DIR, model_name.replace('/', '_'))
+
+
+def export_onnx(model, path):
+    """Export a SentenceTransformer's transformer module to ONNX with dynamic batch and length"""
+    import torch
+    transformer = model[0].auto_model.eval()
+    sample = model.tokenizer(["export"], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic = {0: 'batch', 1: 'sequence'}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(transformer, tuple(sample[name] for name in input_names), temp_path,
+                          input_names=input_names, output_names=['last_hidden_state'],
+                          dynamic_axes={name: dynamic for name in input_names + ['last_hidden_state']},
+                          opset_version=14)
+    os.replace(temp_path, path)
+
+
+class OnnxSentenceEncoder:
+    """Mean-pooled sentence embeddings from an ONNX export of a SentenceTransformer.
+
+    Implements the part of SentenceTransformer.encode the ATS uses, so it can
+    stand in for the model in ats_scoring.
+    """
+
+    def __init__(self, session, tokenizer, max_seq_length):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+        self.input_names = [i.name for i in session.get_inputs()]
+
+    @classmethod
+    def load(cls, model_path, tokenizer, max_seq_length, threads=None):
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        session = onnxruntime.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        return cls(session, tokenizer, max_seq_length)
+
+    @classmethod
+    def from_export(cls, model_name, quantize=False, directory=None):
+        """Load an earlier export with its saved tokenizer, without torch; None if there is none yet"""
+        directory = onnx_export_dir(model_name, directory)
+        path = os.path.join(directory, 'model.onnx')
+        settings_path = os.path.join(directory, 'encoder.json')
+        # encoder.json is written last, so an export without it is incomplete
+        if not os.path.exists(path) or not os.path.exists(settings_path):
+            return None
+        with open(settings_path) as f:
+            settings = json.load(f)
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(directory)
+        if quantize:
+            quantized_path = os.path.join(directory, 'model.int8.onnx')
+            if not os.path.exists(quantized_path):
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+                temp_path = f"{quantized_path}.{os.getpid()}.tmp"
+                quantize_dynamic(path, temp_path, weight_type=QuantType.QInt8)
+                os.replace(temp_path, quantized_path)
+            path = quantized_path
+        return cls.load(path, tokenizer, settings['max_seq_length'])
+
+    @classmethod
+    def from_sentence_transformer(cls, model, model_name, quantize=False, directory=None):
+        if not getattr(model[1], 'pooling_mode_mean_tokens', False):
+            raise ValueError("The ONNX backend supports mean-pooled models only")
+        directory = onnx_export_dir(model_name, directory)
+        path = os.path.join(directory, 'model.onnx')
+        if not os.path.exists(path):
+            export_onnx(model, path)
+        settings_path = os.path.join(directory, 'encoder.json')
+        if not os.path.exists(settings_path):
+            model.tokenizer.save_pretrained(directory)
+            temp_path = f"{settings_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump({'model_name': model_name, 'max_seq_length': model.max_seq_length}, f)
+            os.replace(temp_path, settings_path)
+        return cls.from_export(model_name, quantize, directory)
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        sentences = list(sentences)
+        if not sentences:
+            return np.empty((0, 0), dtype=np.float32)
+        # Longest first, as SentenceTransformer does, so each batch pads to similar lengths
+        order = sorted(range(len(sentences)), key=lambda i: -len(sentences[i]))
+        embeddings = [None] * len(sentences)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            features = self.tokenizer([sentences[i] for i in batch], padding=True, truncation=True,
+                                      max_length=self.max_seq_length, return_tensors='np')
+            inputs = {name: np.asarray(features[name], dtype=np.int64) for name in self.input_names}
+            token_embeddings = self.session.run(None, inputs)[0]
+            mask = np.asarray(features['attention_mask'], dtype=np.float32)[..., None]
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            for i, vector in zip(batch, pooled):
+                embeddings[i] = vector
+        return np.vstack(embeddings).astype(np.float32)
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A requirements-minimal.txt install has no numpy; None in sys.modules makes its import fail
+SCRIPT = """
+import sys
+sys.modules['numpy'] = None
+import app
+assert not app.AI_DEPENDENCIES_AVAILABLE
+assert not app.ats_initialized and not app.rag_initialized
+client = app.app.test_client()
+with client.session_transaction() as session:
+    session['user'] = 'admin@example.com'
+    session['role'] = 'admin'
+assert client.get('/api/jobs/1/candidates').status_code == 503
+assert client.get('/admin/rag-cache-stats').status_code == 503
+print('started without AI')
+"""
+
+
+def test_app_starts_without_numpy():
+    """Test that the app still imports, with AI features disabled, when numpy is missing"""
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=ROOT, capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    assert "started without AI" in result.stdout
+    assert "AI features will be disabled" in result.stdout
@@ -0,0 +1,141 @@
+import io
+import time
+
+from ats_jobs import AtsJobQueue, JobStore, job_status, process_job
+
+
+class Upload:
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+
+def fake_extract(paths):
+    texts = [open(path).read() for path in paths]
+    return [(text, text if text.startswith("cv") else None) for text in texts]
+
+
+def fake_sbert(texts, job_description, keys, filenames):
+    return [float(len(text)) for text in texts]
+
+
+def fake_tfidf(texts, job_description):
+    return [50.0 for _ in texts]
+
+
+def make_job(store, tmp_path, contents, job_id="job1"):
+    files = []
+    for position, content in enumerate(contents):
+        path = tmp_path / f"{position}.pdf"
+        path.write_text(content)
+        files.append((f"resume{position}.pdf", str(path)))
+    return store.create_job(job_id, "user@example.com", "python developer", 40, files)
+
+
+def wait_for(queue, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_job_reports_progress_and_results(tmp_path):
+    """Test that files are scored chunk by chunk and reported in the API result format"""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    make_job(store, tmp_path, ["cv " + "a" * 40, "scan", "cv " + "b" * 20, "cv " + "c" * 60])
+    chunks = []
+
+    def extract(paths):
+        chunks.append(len(paths))
+        return fake_extract(paths)
+
+    process_job(store, "job1", extract, fake_sbert, fake_tfidf, chunk_size=2)
+    status = job_status(store.get_job("job1"))
+
+    assert chunks == [2, 2]
+    assert status["status"] == "done"
+    assert status["progress"] == 100.0
+    assert [row["Label"] for row in status["results"]] == ["Selected", "Rejected", "Selected", "Invalid_Resume"]
+    assert status["results"][0]["Final Match Score (%)"] == round(0.2 * 50 + 0.8 * 43, 2)
+
+
+def test_partial_results_while_running(tmp_path):
+    """Test that SBERT scores of extracted files are visible before the job finishes"""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    make_job(store, tmp_path, ["cv one " * 5, "scan", "cv two " * 5, "cv three " * 5])
+    seen = []
+
+    def extract(paths):
+        seen.append(job_status(store.get_job("job1")))
+        return fake_extract(paths)
+
+    process_job(store, "job1", extract, fake_sbert, fake_tfidf, chunk_size=2)
+
+    partial = seen[1]
+    assert partial["processed"] == 2
+    assert [row["Label"] for row in partial["results"]] == ["Pending", "Invalid_Resume"]
+    assert partial["results"][0]["SBERT Score (%)"] == 35.0
+
+
+def test_too_few_valid_resumes_fails_the_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    make_job(store, tmp_path, ["cv one", "scan", "scan"])
+
+    process_job(store, "job1", fake_extract, fake_sbert, fake_tfidf)
+
+    job = store.get_job("job1")
+    assert job["status"] == "failed"
+    assert job["error"] == "Not enough valid resumes after filtering."
+
+
+def test_queue_runs_submitted_jobs_and_cleans_up(tmp_path):
+    """Test that submit returns at once and the worker thread finishes the job"""
+    queue = AtsJobQueue(fake_extract, fake_sbert, fake_tfidf, store=JobStore(str(tmp_path / "jobs.db")),
+                        upload_dir=str(tmp_path / "uploads"))
+    try:
+        uploads = [("same.pdf", Upload(b"cv " + bytes([65 + i]) * 30)) for i in range(3)]
+        job_id = queue.submit("user@example.com", "python developer", 10, uploads)
+        job = wait_for(queue, job_id)
+    finally:
+        queue.stop()
+
+    assert job["status"] == "done"
+    assert [f["filename"] for f in job["files"]] == ["same.pdf"] * 3
+    assert not (tmp_path / "uploads" / job_id).exists()
+
+
+def test_abandoned_job_is_resumed_after_restart(tmp_path):
+    """Test that a job left running by a dead worker is picked up and not re-extracted"""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    make_job(store, tmp_path, ["cv " + "a" * 30, "cv " + "b" * 30, "cv " + "c" * 30])
+    assert store.claim("job1", "dead-worker", stale_after=60)
+    store.update_files("job1", [("valid", "cv", 33.0, 0)])
+    store._connect().execute("UPDATE jobs SET heartbeat = 0")
+    extracted = []
+
+    def extract(paths):
+        extracted.extend(paths)
+        return fake_extract(paths)
+
+    queue = AtsJobQueue(extract, fake_sbert, fake_tfidf, store=store, upload_dir=str(tmp_path / "uploads"),
+                        stale_after=1)
+    queue.start()
+    try:
+        job = wait_for(queue, "job1")
+    finally:
+        queue.stop()
+
+    assert job["status"] == "done"
+    assert job["worker"] == queue.worker_id
+    # The finished file is only read back for its text; the others are extracted once
+    assert sorted(extracted) == sorted(str(tmp_path / f"{i}.pdf") for i in range(3))
+
+
+def test_running_job_is_not_stolen(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    make_job(store, tmp_path, ["cv one"])
+    assert store.claim("job1", "worker-a", stale_after=60)
+    assert not store.claim("job1", "worker-b", stale_after=60)
+    assert store.claimable(stale_after=60) == []
@@ -0,0 +1,96 @@
+import numpy as np
+from ats_scoring import compute_sbert_similarities, resume_vector_name, split_windows
+
+
+class FakeModel:
+    """Bag-of-letters encoder that records every encode call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        self.calls.append((list(texts), batch_size))
+        return np.array([[text.count(letter) for letter in "abcdefghij"] for text in texts], dtype=np.float32)
+
+
+def reference_score(model, resume, job):
+    a, b = model.encode([resume, job])
+    return round(float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b))) * 100, 2)
+
+
+def test_job_description_is_encoded_once():
+    """Test that a batch of resumes costs one job encode and one batched resume encode"""
+    model = FakeModel()
+    resumes = ["abc", "bcd", "hij", "aaa"]
+
+    compute_sbert_similarities(model, resumes, "abcd", batch_size=2)
+
+    assert model.calls == [(["abcd"], 32), (resumes, 2)]
+
+
+def test_batch_scores_match_pairwise_cosine():
+    """Test that the matrix-vector scores equal the old one-pair-at-a-time scores"""
+    model = FakeModel()
+    resumes = ["abc", "bcd", "hij", "aaa", "jjj"]
+
+    scores = compute_sbert_similarities(model, resumes, "abcd")
+
+    assert scores == [reference_score(FakeModel(), resume, "abcd") for resume in resumes]
+    assert compute_sbert_similarities(model, [], "abcd") == []
+
+
+LONG_RESUME = " ".join(["aaa"] * 300 + ["jjj"] * 300)
+
+
+def test_long_resume_is_split_into_overlapping_windows():
+    windows = split_windows(LONG_RESUME, window=200, overlap=40)
+
+    assert [len(w.split()) for w in windows] == [150, 150, 150, 150, 120]
+    # Neighbouring windows share 30 words
+    assert windows[0].split()[-30:] == windows[1].split()[:30]
+    assert split_windows("aaa bbb", window=200) == ["aaa bbb"]
+
+
+def test_windows_of_all_resumes_are_encoded_in_one_batch():
+    """Test that chunking makes one resume encode call and scores by the best window"""
+    model = FakeModel()
+    resumes = [LONG_RESUME, "abc", "jjj"]
+
+    scores = compute_sbert_similarities(model, resumes, "jjj", chunking=True)
+    truncated = compute_sbert_similarities(FakeModel(), [LONG_RESUME[:800]], "jjj")
+
+    windows = model.calls[1][0]
+    assert len(model.calls) == 2
+    assert len(windows) == len(split_windows(LONG_RESUME)) + 2
+    assert scores[0] == 100.0 and truncated == [0.0]
+    assert scores[1:] == compute_sbert_similarities(FakeModel(), resumes[1:], "jjj")
+
+
+def test_mean_pooling_averages_windows():
+    model = FakeModel()
+    windows = split_windows(LONG_RESUME)
+    expected = np.mean([compute_sbert_similarities(FakeModel(), [w], "jjj")[0] for w in windows])
+
+    score = compute_sbert_similarities(model, [LONG_RESUME], "jjj", chunking=True, pooling="mean")[0]
+
+    assert abs(score - expected) < 0.01
+
+
+def test_window_embeddings_are_cached_per_resume(tmp_path):
+    from resume_cache import ResumeCache
+    cache = ResumeCache(str(tmp_path / "cache.db"))
+    cache.put_text("long", LONG_RESUME)
+    model = FakeModel()
+
+    first = compute_sbert_similarities(model, [LONG_RESUME], "jjj", embedding_cache=cache, keys=["long"],
+                                       model_name="fake", chunking=True)
+    second = compute_sbert_similarities(model, [LONG_RESUME], "jjj", embedding_cache=cache, keys=["long"],
+                                        model_name="fake", chunking=True)
+
+    assert first == second
+    assert len(model.calls) == 3
+
+
+def test_window_and_single_pass_vectors_have_separate_names():
+    assert resume_vector_name("all-MiniLM-L6-v2", chunking=False) == "all-MiniLM-L6-v2"
+    assert resume_vector_name("all-MiniLM-L6-v2", chunking=True) == "all-MiniLM-L6-v2:windows"
@@ -0,0 +1,66 @@
+import numpy as np
+
+from ats_scoring import normalize_rows
+from candidate_index import CandidateIndex
+
+
+def vectors(*rows):
+    return normalize_rows(np.array(rows, dtype=np.float32))
+
+
+def test_search_returns_closest_candidates_first(tmp_path):
+    index = CandidateIndex(str(tmp_path))
+    index.add(["a", "b", "c"], vectors([1, 0, 0], [0, 1, 0], [1, 1, 0]), ["a.pdf", "b.pdf", "c.pdf"], "mini")
+
+    results = index.search(vectors([1, 0.1, 0])[0], k=2)
+
+    assert [r["filename"] for r in results] == ["a.pdf", "c.pdf"]
+    assert results[0]["score"] > results[1]["score"]
+
+
+def test_index_is_reloaded_from_disk(tmp_path):
+    """Test that a new process sees the vectors through the memory map"""
+    CandidateIndex(str(tmp_path)).add(["a", "b"], vectors([1, 0], [0, 1]), ["a.pdf", "b.pdf"], "mini")
+
+    index = CandidateIndex(str(tmp_path))
+
+    assert len(index) == 2
+    assert isinstance(index._matrix, np.memmap)
+    assert index.search(vectors([0, 1])[0], k=1)[0]["digest"] == "b"
+
+
+def test_incremental_add_and_delete(tmp_path):
+    """Test that re-adding a resume does not grow the index and deleted ones disappear"""
+    index = CandidateIndex(str(tmp_path))
+    other = CandidateIndex(str(tmp_path))
+    index.add(["a", "b", "c", "d"], vectors([1, 0], [0, 1], [1, 1], [1, 2]), ["a", "b", "c", "d"], "mini")
+
+    assert index.add(["a", "e"], vectors([1, 0], [2, 1]), ["renamed.pdf", "e"], "mini") == 1
+    assert index.delete(["b", "missing"]) == 1
+
+    assert len(other) == 4
+    assert "b" not in other
+    assert other.stats()["rows"] == 5
+    assert [r["digest"] for r in other.search(vectors([0, 1])[0], k=10)] == ["d", "c", "e", "a"]
+    assert other.search(vectors([1, 0])[0], k=1)[0]["filename"] == "renamed.pdf"
+
+
+def test_many_deletes_compact_the_vector_file(tmp_path):
+    index = CandidateIndex(str(tmp_path))
+    index.add(["a", "b", "c", "d"], vectors([1, 0], [0, 1], [1, 1], [1, 2]), ["a", "b", "c", "d"], "mini")
+
+    index.delete(["a", "b"])
+
+    assert index.stats()["rows"] == 2
+    assert (tmp_path / "vectors.f32").stat().st_size == 2 * 2 * 4
+    assert [r["digest"] for r in index.search(vectors([1, 1])[0])] == ["c", "d"]
+
+
+def test_other_model_resets_the_index(tmp_path):
+    """Test that vectors from different models are never compared"""
+    index = CandidateIndex(str(tmp_path))
+    index.add(["a"], vectors([1, 0]), ["a.pdf"], "mini")
+    index.add(["b"], vectors([0, 1, 0]), ["b.pdf"], "mpnet")
+
+    assert index.search(vectors([0, 1, 0])[0], model_name="mini") == []
+    assert [r["digest"] for r in index.search(vectors([0, 1, 0])[0], model_name="mpnet")] == ["b"]
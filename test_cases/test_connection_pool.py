@@ -0,0 +1,85 @@
+import threading
+import time
+import pytest
+from connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_reuses_released_connections():
+    """Test that a released connection is handed out again instead of reconnecting"""
+    created = []
+    pool = ConnectionPool(lambda: created.append(FakeConnection()) or created[-1], size=2)
+
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+
+    assert first is second
+    assert len(created) == 1
+
+
+def test_pool_times_out_when_exhausted():
+    """Test that checkout fails with a timeout once every connection is borrowed"""
+    pool = ConnectionPool(FakeConnection, size=1, timeout=0.05)
+    pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiting_borrower_gets_returned_connection():
+    """Test that a blocked borrower is woken up when a connection is released"""
+    pool = ConnectionPool(FakeConnection, size=1, timeout=2)
+    held = pool.acquire()
+    result = {}
+
+    waiter = threading.Thread(target=lambda: result.update(conn=pool.acquire()))
+    waiter.start()
+    # Release only once the borrower is blocked, otherwise it may never have to wait
+    deadline = time.monotonic() + 2
+    while pool.stats()["waiting"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    pool.release(held)
+    waiter.join(timeout=2)
+
+    assert result["conn"] is held
+    assert pool.stats()["waits"] == 1
+
+
+def test_health_check_replaces_dead_connection():
+    """Test that a dropped idle connection is discarded on borrow"""
+    pool = ConnectionPool(FakeConnection, size=1)
+    dead = pool.acquire()
+    pool.release(dead)
+    dead.connected = False
+
+    fresh = pool.acquire()
+
+    assert fresh is not dead
+    assert dead.closed
+    assert pool.stats()["health_check_failures"] == 1
+
+
+def test_stats_report_saturation():
+    """Test that pool stats track in-use and peak counts"""
+    pool = ConnectionPool(FakeConnection, size=4)
+    conns = [pool.acquire() for _ in range(3)]
+    pool.release(conns.pop())
+
+    stats = pool.stats()
+    assert stats["in_use"] == 2
+    assert stats["peak_in_use"] == 3
+    assert stats["idle"] == 1
+    assert stats["utilization"] == 0.5
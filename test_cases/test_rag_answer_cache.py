@@ -0,0 +1,91 @@
+import time
+
+from rag_answer_cache import AnswerCache, knowledge_version, normalize_question
+from rag_index import HashingEmbeddings, RagIndex, build_index
+
+EMBED = HashingEmbeddings(dim=64).embed_query
+
+
+def test_normalized_question_hits_without_embedding(tmp_path):
+    cache = AnswerCache(str(tmp_path / "answers.db"))
+    cache.put("How do I set up email on my phone?", "Add an Exchange account.", "v1")
+
+    def fail(question):
+        raise AssertionError("an exact hit should not embed the question")
+
+    assert normalize_question("  how do I set up EMAIL on my phone ") == "how do i set up email on my phone"
+    assert cache.get("how do i set up email on my phone", "v1", fail) == ("Add an Exchange account.", None)
+
+
+def test_similar_question_hits_above_threshold(tmp_path):
+    cache = AnswerCache(str(tmp_path / "answers.db"), threshold=0.9)
+    question = "how do I set up company email on my phone"
+    cache.put(question, "Add an Exchange account.", "v1", EMBED(question))
+    other_worker = AnswerCache(str(tmp_path / "answers.db"), threshold=0.9)
+
+    answer, _ = other_worker.get("how do I set up the company email on my phone", "v1", EMBED)
+
+    assert answer == "Add an Exchange account."
+    assert other_worker.get("how do I reset my PIN", "v1", EMBED)[0] is None
+    assert other_worker.stats() == {"entries": 1, "lookups": 2, "hits": 1, "exact_hits": 0,
+                                    "semantic_hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_answers_expire_and_follow_the_knowledge_version(tmp_path):
+    cache = AnswerCache(str(tmp_path / "answers.db"), ttl_hours=1)
+    cache.put("reset my pin", "Use the sign-in screen.", "v1", EMBED("reset my pin"))
+
+    assert cache.get("reset my pin", "v2", EMBED)[0] is None
+    assert cache.stats()["entries"] == 0
+
+    cache.put("reset my pin", "Use the sign-in screen.", "v2")
+    cache._connect().execute("UPDATE answers SET created_at = ?", (time.time() - 7200,))
+    assert cache.get("reset my pin", "v2")[0] is None
+
+
+def test_knowledge_version_changes_with_rag_csv_and_rebuilds(tmp_path):
+    csv_path = tmp_path / "rag.csv"
+    csv_path.write_text("ki_topic,ki_text,sample_question,sample_ground_truth\nVPN,Install the VPN client.,,\n")
+    embeddings = HashingEmbeddings(dim=64)
+    build_index(embeddings, embeddings.name, str(csv_path), str(tmp_path / "index"))
+    index = RagIndex.load(str(tmp_path / "index"))
+    before = knowledge_version(index, str(csv_path))
+
+    csv_path.write_text("ki_topic,ki_text,sample_question,sample_ground_truth\nVPN,Install the new VPN client.,,\n")
+    edited = knowledge_version(index, str(csv_path))
+    build_index(embeddings, embeddings.name, str(csv_path), str(tmp_path / "index"))
+    rebuilt = knowledge_version(RagIndex.load(str(tmp_path / "index")), str(csv_path))
+
+    assert len({before, edited, rebuilt}) == 3
+
+
+def test_follow_up_questions_skip_the_cache(app, monkeypatch, tmp_path):
+    import app as app_module
+    from rag_memory import ConversationMemory
+
+    cache = AnswerCache(str(tmp_path / "answers.db"))
+    memory = ConversationMemory(str(tmp_path / "conversations.db"))
+    embedded = []
+
+    class Embeddings:
+        def embed_query(self, question):
+            embedded.append(question)
+            return EMBED(question)
+
+    monkeypatch.setattr(app_module, "ANSWER_CACHE_ENABLED", True)
+    monkeypatch.setattr(app_module, "get_answer_cache", lambda: cache)
+    monkeypatch.setattr(app_module, "get_conversation_memory", lambda summarize: memory)
+    monkeypatch.setattr(app_module, "knowledge_version", lambda index, csv_path: "v1")
+    monkeypatch.setattr(app_module, "rag_index", None, raising=False)
+    monkeypatch.setattr(app_module, "answer_embeddings", Embeddings(), raising=False)
+    monkeypatch.setattr(app_module, "qa_chain", lambda inputs: {"answer": f"about {inputs['question']}"},
+                        raising=False)
+
+    with app.test_request_context():
+        assert app_module.answer_rag_question("how do I reset my PIN") == ("about how do I reset my PIN", False)
+        assert app_module.answer_rag_question("and on the phone?") == ("about and on the phone?", False)
+
+    # Only the first question of the conversation was looked up, embedded and cached
+    assert embedded == ["how do I reset my PIN"]
+    assert cache.stats()["lookups"] == 1
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from rag_hybrid import Bm25Index, CrossEncoderReranker, HybridRetriever, reciprocal_rank_fusion
+from rag_index import Chunk
+
+
+class Index:
+    def __init__(self, texts):
+        self.chunks = [Chunk(str(i), text, {'row': i}) for i, text in enumerate(texts)]
+
+
+class ReverseModel:
+    """Cross-encoder stand-in that prefers shorter chunks"""
+
+    def predict(self, pairs, show_progress_bar=False):
+        return [-len(text) for _, text in pairs]
+
+
+INDEX = Index([
+    "Enroll your phone in MDM before adding the Exchange account.",
+    "The VPN client uses SSL/TLS certificates issued by IT.",
+    "Reset your PIN from the sign-in screen.",
+    "Webex meetings support video and audio for many participants.",
+])
+
+
+def test_bm25_matches_exact_product_terms():
+    results = Bm25Index(INDEX.chunks).search("Which TLS version does the VPN use?", k=4)
+
+    assert [chunk.id for chunk, _ in results] == ["1"]
+
+
+def test_rrf_rewards_chunks_ranked_by_both_stages():
+    a, b, c = INDEX.chunks[:3]
+
+    fused = reciprocal_rank_fusion([[a, b], [c, b]])
+
+    assert [chunk.id for chunk, _ in fused] == [b.id, a.id, c.id]
+
+
+def test_hybrid_fuses_dense_and_lexical_hits():
+    retriever = HybridRetriever(INDEX, lambda query, k: [INDEX.chunks[3], INDEX.chunks[0]], rerank=False)
+    timings = {}
+
+    results = retriever.retrieve("MDM enrollment", 2, timings)
+    retriever.close()
+
+    assert [chunk.id for chunk, _ in results] == ["0", "3"]
+    assert {"bm25", "dense", "fusion", "total"} <= set(timings)
+
+
+def test_slow_dense_search_is_dropped_after_the_budget():
+    def slow_dense(query, k):
+        time.sleep(0.5)
+        return [INDEX.chunks[3]]
+
+    retriever = HybridRetriever(INDEX, slow_dense, rerank=False, budget_ms=20)
+    timings = {}
+
+    results = retriever.retrieve("reset PIN", 4, timings)
+    retriever.close()
+
+    assert [chunk.id for chunk, _ in results] == ["2"]
+    assert "dense_skipped" in timings
+    assert timings["total"] < 400
+
+
+def test_busy_dense_workers_are_not_queued_behind():
+    release, calls = threading.Event(), []
+
+    def stuck_dense(query, k):
+        calls.append(query)
+        release.wait(5)
+        return [INDEX.chunks[3]]
+
+    retriever = HybridRetriever(INDEX, stuck_dense, rerank=False, budget_ms=20, dense_workers=1)
+    try:
+        retriever.retrieve("reset PIN", 4)
+        timings = {}
+        results = retriever.retrieve("reset PIN again", 4, timings)
+    finally:
+        release.set()
+        retriever.close()
+
+    # The second question found the only dense worker busy and used the BM25 hits alone
+    assert calls == ["reset PIN"]
+    assert [chunk.id for chunk, _ in results] == ["2"]
+    assert "dense_skipped" in timings
+
+
+def test_rerank_runs_only_when_it_fits_the_budget():
+    reranker = CrossEncoderReranker(ReverseModel())
+    retriever = HybridRetriever(INDEX, None, reranker=reranker, rerank=True, budget_ms=1000)
+
+    results = retriever.retrieve("VPN or PIN", 2)
+    assert [chunk.id for chunk, _ in results] == ["2", "1"]
+
+    reranker.ms_per_pair = 10000
+    timings = {}
+    retriever.retrieve("VPN or PIN", 2, timings)
+    assert "rerank_skipped" in timings
+
+
+def test_a_retrieval_stage_is_required():
+    with pytest.raises(ValueError):
+        HybridRetriever(INDEX, None, bm25=False)
@@ -0,0 +1,95 @@
+import csv
+
+import pytest
+
+from rag_index import HashingEmbeddings, RagIndex, azure_document_key, build_index, split_text, sync_azure_search
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    def __init__(self):
+        super().__init__(dim=64)
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return super().embed_documents(texts)
+
+
+class FakeSearchClient:
+    def __init__(self, keys=()):
+        self.docs = {key: {} for key in keys}
+
+    def search(self, search_text, select):
+        return [{"id": key} for key in self.docs]
+
+    def upload_documents(self, documents):
+        self.docs.update((doc["id"], doc) for doc in documents)
+
+    def delete_documents(self, documents):
+        for doc in documents:
+            del self.docs[doc["id"]]
+
+
+def write_csv(path, articles):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ki_topic", "ki_text", "sample_question", "sample_ground_truth"])
+        for topic, text in articles:
+            writer.writerow([topic, text, "", ""])
+    return str(path)
+
+
+ARTICLES = [
+    ("Email on Android", "Open Settings.\n\nAdd an Exchange account with your company email."),
+    ("VPN", "Install the VPN client.\n\nSign in with SSL/TLS certificates."),
+]
+
+
+def test_split_text_merges_paragraphs_with_overlap():
+    paragraphs = ["a" * 300, "b" * 300, "c" * 300, "d" * 50]
+
+    chunks = split_text("\n\n".join(paragraphs), chunk_size=700, chunk_overlap=310)
+
+    assert chunks == ["a" * 300 + "\n\n" + "b" * 300, "b" * 300 + "\n\n" + "c" * 300 + "\n\n" + "d" * 50]
+
+
+def test_rebuild_embeds_only_new_or_changed_chunks(tmp_path):
+    csv_path = write_csv(tmp_path / "rag.csv", ARTICLES)
+    embeddings = CountingEmbeddings()
+    build_index(embeddings, embeddings.name, csv_path, str(tmp_path / "index"))
+
+    write_csv(tmp_path / "rag.csv", [ARTICLES[0], ("VPN", "Install the new VPN client."), ("MDM", "Enroll in MDM.")])
+    embeddings.embedded = []
+    index, stats = build_index(embeddings, embeddings.name, csv_path, str(tmp_path / "index"))
+
+    assert stats == {"chunks": 3, "embedded": 2, "reused": 1, "removed": 1}
+    assert embeddings.embedded == ["Topic: VPN\nInstall the new VPN client.", "Topic: MDM\nEnroll in MDM."]
+    assert not index.is_stale(csv_path)
+
+
+def test_app_attaches_to_saved_index(tmp_path):
+    """Test that a load reads the saved vectors and answers queries without embedding documents"""
+    csv_path = write_csv(tmp_path / "rag.csv", ARTICLES)
+    embeddings = CountingEmbeddings()
+    build_index(embeddings, embeddings.name, csv_path, str(tmp_path / "index"))
+
+    index = RagIndex.load(str(tmp_path / "index"))
+    chunk, _ = index.search(embeddings.embed_query("exchange email account"), k=1)[0]
+
+    assert chunk.metadata == {"topic": "Email on Android", "row": 0}
+    assert RagIndex.load(str(tmp_path / "missing")) is None
+    write_csv(tmp_path / "rag.csv", ARTICLES[:1])
+    assert index.is_stale(csv_path)
+
+
+def test_azure_search_is_synced_to_the_build(tmp_path):
+    pytest.importorskip("langchain_community")
+    csv_path = write_csv(tmp_path / "rag.csv", ARTICLES)
+    embeddings = HashingEmbeddings(dim=64)
+    index, _ = build_index(embeddings, embeddings.name, csv_path, str(tmp_path / "index"))
+    keep = azure_document_key(index.chunks[0].id)
+    client = FakeSearchClient(keys=[keep, "old-random-uuid"])
+
+    assert sync_azure_search(client, index) == (1, 1)
+    assert set(client.docs) == {azure_document_key(chunk.id) for chunk in index.chunks}
+    assert sync_azure_search(client, index) == (0, 0)
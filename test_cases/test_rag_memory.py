@@ -0,0 +1,76 @@
+import threading
+import time
+
+from rag_memory import SUMMARY_QUESTION, ConversationMemory
+
+
+def test_conversations_are_kept_per_session(tmp_path):
+    memory = ConversationMemory(str(tmp_path / "memory.db"))
+    memory.append("alice", "How do I set up email?", "Add an Exchange account.")
+    memory.append("bob", "How do I reset my PIN?", "Use the sign-in screen.")
+
+    other_worker = ConversationMemory(str(tmp_path / "memory.db"))
+
+    assert other_worker.history("alice") == [("How do I set up email?", "Add an Exchange account.")]
+    assert other_worker.history("bob") == [("How do I reset my PIN?", "Use the sign-in screen.")]
+    assert other_worker.history("carol") == []
+
+
+def test_old_turns_are_compacted_into_a_summary(tmp_path):
+    calls = []
+
+    def summarize(summary, turns):
+        calls.append(turns)
+        return summary + " " + " ".join(question for question, _ in turns)
+
+    memory = ConversationMemory(str(tmp_path / "memory.db"), max_turns=3, max_tokens=10000, summarize=summarize)
+    for i in range(5):
+        memory.append("alice", f"q{i}", f"a{i}")
+    memory.close()
+
+    # Compaction runs in the background, so the two old turns may be folded in one call or two
+    assert [turn for turns in calls for turn in turns] == [("q0", "a0"), ("q1", "a1")]
+    assert memory.history("alice") == [(SUMMARY_QUESTION, "q0 q1"), ("q2", "a2"), ("q3", "a3"), ("q4", "a4")]
+
+
+def test_compaction_runs_after_append_returns(tmp_path):
+    """Test that the summarizer's LLM call is not made while answering the question"""
+    started, release = threading.Event(), threading.Event()
+
+    def summarize(summary, turns):
+        started.set()
+        release.wait(5)
+        return "summary"
+
+    memory = ConversationMemory(str(tmp_path / "memory.db"), max_turns=1, max_tokens=10000, summarize=summarize)
+    memory.append("alice", "q0", "a0")
+    memory.append("alice", "q1", "a1")
+
+    assert started.wait(5)
+    assert memory.history("alice") == [("q0", "a0"), ("q1", "a1")]
+    release.set()
+    memory.close()
+    assert memory.history("alice") == [(SUMMARY_QUESTION, "summary"), ("q1", "a1")]
+
+
+def test_token_budget_compacts_to_half(tmp_path):
+    """Test that long answers are folded in one go and the summary falls back without a summarizer"""
+    memory = ConversationMemory(str(tmp_path / "memory.db"), max_turns=10, max_tokens=100)
+    for i in range(4):
+        memory.append("alice", f"question {i}", "x" * 100)
+    memory.close()
+
+    history = memory.history("alice")
+
+    assert history[0] == (SUMMARY_QUESTION, "Q: question 0\nQ: question 1\nQ: question 2")
+    assert history[1:] == [("question 3", "x" * 100)]
+
+
+def test_idle_conversations_expire(tmp_path):
+    memory = ConversationMemory(str(tmp_path / "memory.db"), ttl_hours=1)
+    memory.append("alice", "q", "a")
+    memory._connect().execute("UPDATE conversations SET updated_at = ?", (time.time() - 7200,))
+
+    assert memory.history("alice") == []
+    memory.append("alice", "new question", "new answer")
+    assert memory.history("alice") == [("new question", "new answer")]
@@ -0,0 +1,56 @@
+import threading
+
+import numpy as np
+import pytest
+
+from rag_index import HashingEmbeddings, RagIndex, build_index
+from rag_retriever import LocalVectorStore, query_embeddings
+
+
+def build(tmp_path):
+    csv_path = tmp_path / "rag.csv"
+    csv_path.write_text(
+        "ki_topic,ki_text,sample_question,sample_ground_truth\n"
+        "Email,Add an Exchange account for company email on your phone.,,\n"
+        "VPN,Install the VPN client and sign in from home.,,\n"
+        "Webex,Start a Webex meeting with video and audio.,,\n"
+    )
+    embeddings = HashingEmbeddings(dim=64)
+    build_index(embeddings, embeddings.name, str(csv_path), str(tmp_path / "index"))
+    return RagIndex.load(str(tmp_path / "index"))
+
+
+def test_local_store_returns_closest_chunks(tmp_path):
+    store = LocalVectorStore(build(tmp_path), ann=False)
+    embeddings = query_embeddings(store.index.embedding_name)
+
+    results = store.search(embeddings.embed_query("how do I work from home over vpn"), k=2)
+
+    assert [chunk.metadata["topic"] for chunk, _ in results][0] == "VPN"
+    assert results[0][1] > results[1][1]
+
+
+def test_store_is_shared_across_threads(tmp_path):
+    store = LocalVectorStore(build(tmp_path), ann=False)
+    query = HashingEmbeddings(dim=64).embed_query("webex meeting video")
+    topics = []
+
+    threads = [threading.Thread(target=lambda: topics.append(store.search(query, k=1)[0][0].metadata["topic"]))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert topics == ["Webex"] * 8
+
+
+def test_hnsw_graph_matches_exact_search(tmp_path):
+    pytest.importorskip("hnswlib")
+    index = build(tmp_path)
+    exact = LocalVectorStore(index, ann=False)
+    graph = LocalVectorStore(index, ann=True, ann_min_rows=0)
+
+    for row in range(len(index.chunks)):
+        query = np.asarray(index.vectors[row])
+        assert [c.id for c, _ in graph.search(query, k=3)] == [c.id for c, _ in exact.search(query, k=3)]
@@ -0,0 +1,65 @@
+import numpy as np
+
+import resume_extraction
+from ats_scoring import compute_sbert_similarities
+from resume_cache import ResumeCache, file_digest
+
+
+class CountingModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        self.encoded.extend(texts)
+        return np.array([[len(text), text.count("a"), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_text_and_verdicts_are_cached_by_pdf_bytes(tmp_path, monkeypatch):
+    """Test that a re-uploaded PDF is not parsed again, whatever its filename"""
+    parsed = []
+    monkeypatch.setattr(resume_extraction, "extract_resume_text",
+                        lambda path: parsed.append(path) or ("text of " + open(path).read() if "cv" in open(path).read() else None))
+    monkeypatch.setattr(resume_extraction.ExtractionPool, "map_with_status",
+                        lambda self, paths, extractor=None: [(resume_extraction.extract_resume_text(p), True) for p in paths])
+    cache = ResumeCache(str(tmp_path / "cache.db"))
+    first, second, scan = tmp_path / "a.pdf", tmp_path / "b.pdf", tmp_path / "scan.pdf"
+    first.write_text("cv one")
+    second.write_text("cv one")
+    scan.write_text("scanned image")
+
+    results = resume_extraction.extract_resumes([str(first), str(second), str(scan)], cache)
+    again = resume_extraction.extract_resumes([str(second), str(scan)], cache)
+
+    assert [text for _, text in results] == ["text of cv one", "text of cv one", None]
+    assert again == results[1:]
+    assert parsed == [str(first), str(scan)]
+    assert results[0][0] == file_digest(str(first))
+
+
+def test_embeddings_are_reused_per_model(tmp_path):
+    """Test that cached embeddings skip encoding and are tied to the model that made them"""
+    cache = ResumeCache(str(tmp_path / "cache.db"))
+    for key in ("k1", "k2"):
+        cache.put_text(key, "resume " + key)
+    model = CountingModel()
+    texts, keys = ["resume k1", "resume k2"], ["k1", "k2"]
+
+    first = compute_sbert_similarities(model, texts, "job", embedding_cache=cache, keys=keys, model_name="mini")
+    second = compute_sbert_similarities(model, texts, "job", embedding_cache=cache, keys=keys, model_name="mini")
+    compute_sbert_similarities(model, texts, "job", embedding_cache=cache, keys=keys, model_name="other")
+
+    assert first == second
+    assert model.encoded == ["job", "resume k1", "resume k2", "job", "job", "resume k1", "resume k2"]
+    assert cache.get_embeddings(["k1"], "other")["k1"].dtype == np.float32
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Test that the cache stays under its byte budget by dropping the oldest entries"""
+    cache = ResumeCache(str(tmp_path / "cache.db"), max_bytes=350)
+    for key in ("old", "mid", "new"):
+        cache.put_text(key, "x" * 100)
+    cache.get_texts(["old"])
+    cache.put_text("newest", "x" * 100)
+
+    assert set(cache.get_texts(["old", "mid", "new", "newest"])) == {"old", "new", "newest"}
+    assert cache.stats()["bytes"] <= 350
@@ -0,0 +1,193 @@
+import io
+import os
+import signal
+import threading
+import time
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+import resume_extraction
+from resume_extraction import ExtractionPool
+from resume_uploads import UploadSpool
+
+
+def fake_extract(pdf_path):
+    if "corrupt" in pdf_path:
+        raise ValueError("cannot open broken document")
+    if "slow" in pdf_path:
+        time.sleep(10)
+    if "long" in pdf_path:
+        time.sleep(0.3)
+    if "hung" in pdf_path:
+        # Native code that never returns to the interpreter ignores the alarm too
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        time.sleep(10)
+    return f"text of {os.path.basename(pdf_path)}"
+
+
+# Stands in for the app's locks (DB pool, SQLite caches) held by other request threads
+request_lock = threading.Lock()
+
+
+def report_request_lock(pdf_path):
+    return "held" if request_lock.locked() else "free"
+
+
+def test_results_come_back_in_upload_order():
+    """Test that parallel extraction keeps the upload order"""
+    pool = ExtractionPool(workers=3, timeout=5, start_method="fork")
+    paths = [f"/uploads/resume_{i}.pdf" for i in range(8)]
+
+    try:
+        results = pool.map(paths, extractor=fake_extract)
+    finally:
+        pool.close()
+
+    assert results == [f"text of resume_{i}.pdf" for i in range(8)]
+
+
+def test_workers_do_not_inherit_locks_held_by_request_threads():
+    """Test that a pool created from a request thread does not fork the app's held locks"""
+    pool = ExtractionPool(workers=2, timeout=5)
+    results = []
+
+    def upload():
+        results.extend(pool.map(["/uploads/resume.pdf"], extractor=report_request_lock))
+
+    request_lock.acquire()
+    try:
+        thread = threading.Thread(target=upload)
+        thread.start()
+        thread.join(30)
+    finally:
+        request_lock.release()
+        pool.close()
+
+    assert pool.start_method != "fork"
+    assert results == ["free"]
+
+
+def test_failing_and_slow_files_are_invalid():
+    """Test that a corrupt or slow PDF is reported as invalid without failing the batch"""
+    pool = ExtractionPool(workers=2, timeout=0.5, start_method="fork")
+    started = time.monotonic()
+
+    try:
+        results = pool.map(["a.pdf", "corrupt.pdf", "slow.pdf", "b.pdf"], extractor=fake_extract)
+    finally:
+        pool.close()
+
+    assert results == ["text of a.pdf", None, None, "text of b.pdf"]
+    assert time.monotonic() - started < 5
+
+
+def test_hung_worker_is_abandoned(monkeypatch):
+    """Test that the parent deadline gives up on a worker that ignores its timeout"""
+    monkeypatch.setattr(resume_extraction, "DEADLINE_GRACE", 0.5)
+    pool = ExtractionPool(workers=2, timeout=0.5, start_method="fork")
+    started = time.monotonic()
+
+    try:
+        results = pool.map(["a.pdf", "hung.pdf"], extractor=fake_extract)
+        assert results == ["text of a.pdf", None]
+        assert time.monotonic() - started < 5
+        # A fresh pool replaces the one with the stuck worker
+        assert pool.map(["c.pdf"], extractor=fake_extract) == ["text of c.pdf"]
+    finally:
+        pool.close()
+
+
+def test_stuck_batch_does_not_cut_short_another_batch(monkeypatch):
+    """Test that a batch sharing the pool with a hung one still gets all of its results"""
+    monkeypatch.setattr(resume_extraction, "DEADLINE_GRACE", 0.5)
+    pool = ExtractionPool(workers=2, timeout=0.5, start_method="fork")
+    results = {}
+
+    def run(name, paths):
+        results[name] = pool.map(paths, extractor=fake_extract)
+
+    try:
+        hung = threading.Thread(target=run, args=("hung", ["hung.pdf"]))
+        hung.start()
+        time.sleep(0.2)
+        # Only one worker is free, so this outlasts the hung batch's deadline
+        run("other", [f"long_{i}.pdf" for i in range(4)])
+        hung.join()
+    finally:
+        pool.close()
+
+    assert results["hung"] == [None]
+    assert results["other"] == [f"text of long_{i}.pdf" for i in range(4)]
+
+
+def make_pdf(path, pages, image_size=None, image_page=0):
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    for number, text in enumerate(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), text)
+        if image_size and number == image_page:
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, *image_size), False)
+            pixmap.clear_with(200)
+            page.insert_image(fitz.Rect(50, 600, 150, 700), pixmap=pixmap)
+    doc.save(str(path))
+    return str(path)
+
+
+RESUME = "Senior Python developer with ten years of Flask, MySQL and Azure experience. " * 3
+
+
+def test_single_pass_extracts_text_from_every_page(tmp_path):
+    """Test that text from all pages is returned when no large image is present"""
+    pdf = make_pdf(tmp_path / "resume.pdf", [RESUME, "Education: BSc Computer Science"], image_size=(50, 50))
+
+    text = resume_extraction.extract_resume_text(pdf)
+
+    assert "Flask, MySQL and Azure" in text
+    assert "Education: BSc Computer Science" in text
+
+
+def test_large_image_rejects_resume(tmp_path):
+    """Test that a large image on any page marks the resume invalid"""
+    pdf = make_pdf(tmp_path / "scan.pdf", [RESUME, RESUME], image_size=(400, 400), image_page=1)
+
+    assert resume_extraction.extract_resume_text(pdf) is None
+    assert resume_extraction.pdf_contains_large_images(pdf)
+
+
+def test_pdfminer_fallback_is_opt_in(tmp_path, monkeypatch):
+    """Test that pdfminer only runs for short PyMuPDF output when the fallback is enabled"""
+    pdf = make_pdf(tmp_path / "short.pdf", ["Too short"])
+    calls = []
+    monkeypatch.setattr(resume_extraction, "PDFMINER_AVAILABLE", True)
+    monkeypatch.setattr(resume_extraction, "extract_text", lambda path: calls.append(path) or RESUME, raising=False)
+
+    assert resume_extraction.extract_resume_text(pdf) is None
+    assert calls == []
+    assert resume_extraction.extract_resume_text(pdf, pdfminer_fallback=True) == RESUME.strip()
+    assert calls == [pdf]
+
+
+def test_in_memory_pdf_is_parsed_from_bytes(tmp_path):
+    """Test that an upload held in memory gives the same result as the file"""
+    pdf = make_pdf(tmp_path / "resume.pdf", [RESUME])
+    with open(pdf, "rb") as f:
+        data = f.read()
+
+    assert resume_extraction.extract_resume_text(data) == resume_extraction.extract_resume_text(pdf)
+
+
+def test_upload_spool_keeps_small_files_in_memory(tmp_path):
+    """Test that only large uploads are spooled, under unique names, and removed on close"""
+    uploads = [FileStorage(io.BytesIO(data), filename="resume.pdf") for data in (b"small", b"x" * 100, b"y" * 100)]
+
+    with UploadSpool(directory=str(tmp_path), in_memory_max=10) as spool:
+        small, first, second = [spool.add(upload) for upload in uploads]
+        assert small == b"small"
+        assert first != second
+        assert open(first, "rb").read() == b"x" * 100
+        assert open(second, "rb").read() == b"y" * 100
+
+    assert not os.path.exists(first)
+    assert os.listdir(tmp_path) == []
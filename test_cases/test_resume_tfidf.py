@@ -0,0 +1,92 @@
+import math
+import threading
+from collections import Counter
+
+from resume_tfidf import TfidfModel, tokenize
+
+RESUMES = [
+    "Python developer building Flask APIs on Azure with MySQL",
+    "Registered nurse with ICU and emergency care experience",
+    "Data engineer: Python, Spark, Azure data pipelines",
+]
+JOB = "Senior Python developer for Flask and Azure services"
+
+
+def reference_scores(corpus, resumes, job_description):
+    """Plain dense TF-IDF with smoothed IDF fitted on the corpus"""
+    docs = [Counter(tokenize(text)) for text in corpus]
+    n = len(docs)
+
+    def vector(counts):
+        weights = {term: count * (math.log((1 + n) / (1 + sum(term in d for d in docs))) + 1)
+                   for term, count in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / norm for term, w in weights.items()}
+
+    query = vector(Counter(tokenize(job_description)))
+    return [round(sum(w * query.get(t, 0.0) for t, w in vector(Counter(tokenize(text))).items()) * 100, 2)
+            for text in resumes]
+
+
+def test_scores_match_dense_tfidf(tmp_path):
+    model = TfidfModel(str(tmp_path / "tfidf.db"))
+
+    scores = model.similarities(RESUMES, JOB)
+
+    assert scores == reference_scores(RESUMES, RESUMES, JOB)
+    assert scores[0] > scores[2] > scores[1] == 0.0
+
+
+def test_corpus_persists_across_processes(tmp_path):
+    """Test that another worker sees the resumes already added and scores with their IDF"""
+    TfidfModel(str(tmp_path / "tfidf.db")).add(RESUMES)
+    other = TfidfModel(str(tmp_path / "tfidf.db"))
+
+    scores = other.similarities(RESUMES[:1], JOB)
+
+    assert other.stats()["documents"] == 3
+    assert scores == reference_scores(RESUMES, RESUMES[:1], JOB)
+
+
+def test_resumes_are_tokenized_once(tmp_path, monkeypatch):
+    import resume_tfidf
+    calls = []
+    monkeypatch.setattr(resume_tfidf, "tokenize", lambda text: calls.append(text) or tokenize(text))
+    model = TfidfModel(str(tmp_path / "tfidf.db"))
+
+    model.similarities(RESUMES, JOB)
+    model.similarities(RESUMES, "Nurse for the emergency department")
+
+    assert calls == RESUMES + [JOB, "Nurse for the emergency department"]
+
+
+def test_idf_refresh_is_deferred_for_large_corpora(tmp_path, monkeypatch):
+    """Test that IDF weights are only recomputed once the corpus grows by the refresh ratio"""
+    import resume_tfidf
+    monkeypatch.setattr(resume_tfidf, "MIN_STABLE_CORPUS", 2)
+    model = TfidfModel("", refresh_ratio=0.5)
+    model.similarities(RESUMES[:2], JOB)
+    generation = model.stats()["generation"]
+
+    model.similarities(RESUMES, JOB)
+    assert model.stats()["generation"] == generation
+    model.similarities(["Java developer with Spring"], JOB)
+    assert model.stats()["generation"] == generation + 1
+
+
+def test_concurrent_scoring(tmp_path):
+    model = TfidfModel(str(tmp_path / "tfidf.db"))
+    expected = TfidfModel("").similarities(RESUMES, JOB)
+    results = []
+
+    def score():
+        results.append(model.similarities(RESUMES, JOB))
+
+    threads = [threading.Thread(target=score) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [expected] * 8
+    assert model.stats()["documents"] == 3
@@ -0,0 +1,74 @@
+import sys
+
+import numpy as np
+import pytest
+
+import sbert_backends
+from sbert_backends import OnnxSentenceEncoder, embedding_model_name, load_sbert_model
+
+
+class Input:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeTokenizer:
+    """One token per word, padded to the longest sentence in the batch"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, sentences, padding, truncation, max_length, return_tensors):
+        self.batches.append(list(sentences))
+        lengths = [min(len(s.split()), max_length) for s in sentences]
+        width = max(lengths)
+        ids = np.array([[len(w) for w in s.split()[:width]] + [0] * (width - n) for s, n in zip(sentences, lengths)])
+        mask = np.array([[1] * n + [0] * (width - n) for n in lengths])
+        return {"input_ids": ids, "attention_mask": mask}
+
+
+class FakeSession:
+    """Token embedding = [word length, 1]"""
+
+    def get_inputs(self):
+        return [Input("input_ids"), Input("attention_mask")]
+
+    def run(self, outputs, inputs):
+        ids = inputs["input_ids"].astype(np.float32)
+        return [np.stack([ids, np.ones_like(ids)], axis=-1)]
+
+
+def test_onnx_encoder_mean_pools_over_real_tokens():
+    """Test that padding is excluded from pooling and results keep the input order"""
+    tokenizer = FakeTokenizer()
+    encoder = OnnxSentenceEncoder(FakeSession(), tokenizer, max_seq_length=3)
+
+    embeddings = encoder.encode(["ab", "abcd ab abcd abcd", "abc a"], batch_size=2)
+
+    assert tokenizer.batches == [["abcd ab abcd abcd", "abc a"], ["ab"]]
+    np.testing.assert_allclose(embeddings, [[2, 1], [10 / 3, 1], [2, 1]])
+
+
+def test_backends_have_separate_embedding_names():
+    assert embedding_model_name("all-MiniLM-L6-v2", "torch") == "all-MiniLM-L6-v2"
+    assert embedding_model_name("all-MiniLM-L6-v2", "onnx-int8") == "all-MiniLM-L6-v2:onnx-int8"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        load_sbert_model("all-MiniLM-L6-v2", "tensorrt")
+
+
+def test_onnx_backend_loads_an_existing_export_without_torch(monkeypatch, tmp_path):
+    loaded = []
+
+    def from_export(model_name, quantize=False, directory=None):
+        loaded.append((model_name, quantize))
+        return "encoder"
+
+    assert OnnxSentenceEncoder.from_export("all-MiniLM-L6-v2", directory=str(tmp_path)) is None
+    monkeypatch.setattr(sbert_backends.OnnxSentenceEncoder, "from_export", from_export)
+    monkeypatch.setitem(sys.modules, "sentence_transformers", None)
+
+    assert load_sbert_model("all-MiniLM-L6-v2", "onnx-int8") == "encoder"
+    assert loaded == [("all-MiniLM-L6-v2", True)]